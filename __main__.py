@@ -16,10 +16,18 @@ In addition, you should have the following subfolders
     Sounds        (sound effects for the game)
     Images        (image files to use in the game)
 
-Moving any of these folders or files will prevent the game from working properly"""
+Moving any of these folders or files will prevent the game from working properly
+
+With the option --headless, games are played without a window instead (see
+simulate.py), and breakout.py (with Kivy) is never imported."""
+import sys
 from constants import *
-from breakout import *
 
 # Application code
 if __name__ == '__main__':
-    Breakout(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    if '--headless' in sys.argv[1:]:
+        import simulate
+        simulate.main(sys.argv[1:])
+    else:
+        from breakout import *
+        Breakout(width=GAME_WIDTH,height=GAME_HEIGHT).run()
@@ -0,0 +1,229 @@
+# batchplay.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Batched subcontroller module for Breakout
+
+This module contains BatchPlay, which plays many independent games of Breakout at once,
+in lockstep.  It is for balance testing with thousands of games, where making one Play
+per game and moving it on its own costs far more in Python than in arithmetic.
+
+The games are kept as stacked NumPy arrays, one row per game, and every physics tick
+moves all of them with the same few array operations.  The rules are exactly those of
+Play (without continuous collision): a game of BatchPlay with a given seed and input
+plays the same as a Play with that seed and input, as simulate.py drives it.
+
+Like Play, this module does not import game2d, and it only uses models.py through
+getters and module functions."""
+import random
+import numpy as np
+from constants import *
+from models import *
+
+
+class BatchPlay(object):
+    """An instance controls many games of breakout at once.
+
+    Game g has a row in each of the arrays below. Every game has room for as
+    many balls as are served at once in its level (the slots); a slot is only
+    in play from its serve until the ball goes offscreen.  Once a game is
+    finished (won, lost, or at the tick limit) it is masked out: its paddle
+    and balls no longer move and its counts no longer change.
+
+    A lost ball is served again at once, as in simulate.py, rather than after
+    a key press as in Breakout.
+
+    INSTANCE ATTRIBUTES:
+        _level  [int, either 1 or 2]: level of every game
+        _speeds [nonempty list of floats > 0]: the speed multipliers of the
+                balls served at once (one per slot), as in Play
+        _vxrange [tuple of two floats]: the range of the horizontal serve
+                speed, as in Play
+        _limit  [int > 0]: the most ticks a game may last
+        _rngs   [list of random.Random]: the random numbers of each game, seeded
+                as in Play, used for every serve
+        _field  [BrickFieldBatch]: the bricks of every game
+        _px     [float array]: the x coordinate of the center of each paddle
+        _bx, _by   [2D float arrays]: the center of the ball in each slot
+        _bvx, _bvy [2D float arrays]: the velocity of the ball in each slot
+        _bspeed [2D float array]: the speed multiplier of the ball in each slot
+        _inplay [2D bool array]: True for each slot with a ball in play
+        _radius [float > 0]: the radius of every ball
+        _tries  [int array]: the number of tries left in each game
+        _ticks  [int array]: the number of ticks each game has been played
+        _done   [bool array]: True for each game that is finished
+    """
+
+    def getGames(self):
+        return len(self._rngs)
+    def getLevel(self):
+        return self._level
+    def getField(self):
+        return self._field
+    def getRadius(self):
+        return self._radius
+    def getTries(self):
+        return self._tries
+    def getTicks(self):
+        return self._ticks
+    def getBrickCounts(self):
+        return self._field.getAliveCounts()
+    def getDone(self):
+        return self._done
+    def isFinished(self):
+        return bool(self._done.all())
+    def getPaddlePositions(self):
+        return self._px
+    def getBallPositions(self):
+        """Returns: the arrays (xs,ys,inplay) of the balls in every slot, one
+        row per game; a slot only holds a ball where inplay is True.
+        They are the games' own arrays, so they must not be changed."""
+        return (self._bx,self._by,self._inplay)
+    def getBallVelocities(self):
+        """Returns: the arrays (vxs,vys,speeds) of the velocities and speed
+        multipliers of the balls in every slot, as in getBallPositions.
+        They are the games' own arrays, so they must not be changed."""
+        return (self._bvx,self._bvy,self._bspeed)
+
+    def __init__(self,level,seeds,limit=SIMULATION_TICK_LIMIT,speeds=None,
+                 vxrange=(SERVE_VX_MIN,SERVE_VX_MAX)):
+        """Initializer to create the paddles and bricks of every game and serve
+        the first balls.
+
+        Parameter: level
+        Precondition: Must be an int (either 1 or 2).
+
+        Parameter: seeds
+        Precondition: Must be a nonempty list of ints >= 0, the seed of each
+            game (this also sets the number of games)
+
+        Parameter: limit
+        Precondition: Must be an int > 0, the most ticks a game may last
+
+        Parameter: speeds, vxrange
+        Precondition: Must be as in the initializer of Play"""
+        if speeds is None:
+            speeds = SERVE_SPEEDS[level-1]
+        games = len(seeds)
+        slots = len(speeds)
+        self._level = level
+        self._speeds = list(speeds)
+        self._vxrange = tuple(vxrange)
+        self._limit = limit
+        self._rngs = [random.Random(seed) for seed in seeds]
+        self._field = BrickFieldBatch(games,BRICK_ROWS,BRICKS_IN_ROW)
+        self._px = np.zeros(games)+Paddle(GAME_WIDTH/2.0).getX()
+        self._bx = np.zeros((games,slots))
+        self._by = np.zeros((games,slots))
+        self._bvx = np.zeros((games,slots))
+        self._bvy = np.zeros((games,slots))
+        self._bspeed = np.zeros((games,slots))
+        self._inplay = np.zeros((games,slots),dtype=bool)
+        self._radius = BALL_DIAMETER/2.0
+        self._tries = np.zeros(games,dtype=int)+3
+        self._ticks = np.zeros(games,dtype=int)
+        self._done = np.zeros(games,dtype=bool)
+        self.serveBalls(np.arange(games))
+
+    def step(self,input):
+        """Plays one physics tick of every game that is not finished.
+
+        The paddles move, then the balls, and then the tick is ended (see
+        endTick).
+
+        Parameter: input
+        Precondition: must be a controller as in controllers.py, whose
+            is_key_down returns a bool or a bool array with one entry per game"""
+        self.updatePaddles(input)
+        input.tick()
+        self.updateBalls()
+        self.endTick()
+
+    def endTick(self):
+        """Ends a physics tick: every game that lost its last ball but has
+        tries left is served again, and games that are won, lost or at the
+        tick limit are marked finished."""
+        self.serveBalls(np.flatnonzero(~self._done & ~self._inplay.any(axis=1)
+                                       & (self._tries > 0)))
+        self._ticks += ~self._done
+        self._done |= ((self._tries == 0) | (self._field.getAliveCounts() == 0)
+                       | (self._ticks >= self._limit))
+
+    def updatePaddles(self,input):
+        """Moves every paddle -12 if the left key is pressed in its game and
+        +12 if the right key is, without going offscreen, as Play.updatePaddle.
+
+        Parameter: input
+        Precondition: must be a controller as in step"""
+        da = (np.where(input.is_key_down('right'),12,0)
+              - np.where(input.is_key_down('left'),12,0))
+        px = np.minimum(np.maximum(self._px+da,PADDLE_WIDTH/2.0),
+                        GAME_WIDTH-PADDLE_WIDTH/2.0)
+        self._px = np.where(self._done,self._px,px)
+
+    def updateBalls(self):
+        """Moves every ball in play, in every game that is not finished.
+
+        The rules, and their order, are those of Play._updateAllBalls: the
+        walls, then the paddle of the ball's game, then the bricks of the ball's
+        game; bricks hit by any ball are removed after every ball has moved.
+        Then balls that went offscreen are taken out of play as in
+        Play._checkLostBall: every other ball in that game speeds up to
+        BALL_SPEEDUP, and a game with no ball left loses a try."""
+        active = np.flatnonzero((self._inplay & ~self._done[:,np.newaxis]).ravel())
+        if active.size == 0:
+            return
+        r = self._radius
+        games = active // self._inplay.shape[1]
+        x = self._bx.ravel()[active]
+        y = self._by.ravel()[active]
+        side = (x+r >= GAME_WIDTH) | (x-r <= 0)
+        vx = self._bvx.ravel()[active]
+        vy = self._bvy.ravel()[active]
+        vx = np.where(side,-vx,vx)
+        vy = np.where(~side & (y+r >= GAME_HEIGHT),-vy,vy)
+
+        paddley = PADDLE_OFFSET+PADDLE_HEIGHT/2.0
+        px = self._px[games]
+        hit,nx,ny,depth = circleRectContacts(x,y,r,px-PADDLE_WIDTH/2.0,
+                                             paddley-PADDLE_HEIGHT/2.0,
+                                             px+PADDLE_WIDTH/2.0,
+                                             paddley+PADDLE_HEIGHT/2.0)
+        balls = np.flatnonzero(hit)
+        x,y,vx,vy = bounceMany(x,y,vx,vy,balls,nx[balls],ny[balls],depth[balls])
+        balls,ids,nx,ny,depth = self._field.findContactsMany(games,x,y,r)
+        x,y,vx,vy = bounceMany(x,y,vx,vy,balls,nx,ny,depth)
+        speed = self._bspeed.ravel()[active]
+        self._bx.ravel()[active] = x + vx*speed
+        self._by.ravel()[active] = y + vy*speed
+        self._bvx.ravel()[active] = vx
+        self._bvy.ravel()[active] = vy
+        self._field.killMany(games[balls],ids)
+        self._checkLostBalls()
+
+    def _checkLostBalls(self):
+        """Helper method to take the balls that went offscreen out of play,
+        with the rules of Play._checkLostBall for each game."""
+        lost = self._inplay & ~self._done[:,np.newaxis] & ~(self._by+self._radius > 0)
+        games = lost.any(axis=1)
+        if not games.any():
+            return
+        self._inplay &= ~lost
+        self._bspeed[games] = BALL_SPEEDUP
+        empty = games & ~self._inplay.any(axis=1)
+        self._tries -= empty
+
+    def serveBalls(self,games):
+        """Serves new balls in the given games, one for each speed in
+        _speeds, as Play.serveBall does.
+
+        Parameter: games
+        Precondition: must be an int array of games with no ball in play"""
+        for g in games:
+            for k, speed in enumerate(self._speeds):
+                ball = Ball(self._rngs[g],speed,self._vxrange[0],self._vxrange[1])
+                self._bx[g,k] = ball.getX()
+                self._by[g,k] = ball.getY()
+                self._bvx[g,k] = ball.getxvel()
+                self._bvy[g,k] = ball.getyvel()
+                self._bspeed[g,k] = ball.getSpeed()
+                self._inplay[g,k] = True
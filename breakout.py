@@ -8,9 +8,21 @@ need for any any need for additional classes in this module.  If you need more c
 99% of the time they belong in either the play module or the models module. If you 
 are ensure about where a new class should go, 
 post a question on Piazza."""
+import random
+import struct
 from constants import *
 from game2d import *
 from play import *
+from sprites import *
+from controllers import *
+from recording import *
+from session import *
+from replay import *
+
+
+#: the layout of the start of a snapshot of Breakout: the score of each of the
+#: 5 games of the level on the scoreboard, or -1 if it is not over
+BREAKOUT_SNAPSHOT = struct.Struct('<5i')
 
 
 class Breakout(GameApp):
@@ -28,8 +40,9 @@ class Breakout(GameApp):
     Any initialization should be done in the start method.
     
     The primary purpose of this class is managing the game state: when is the 
-    game started, paused, completed, etc. It keeps track of that in an attribute
-    called _state.
+    game started, paused, completed, etc. The rules for that are played by a
+    Session (which does not need a window), and this class shows them: it
+    keeps a copy of the state of the session in an attribute called _state.
     
     INSTANCE ATTRIBUTES:
         view    [Immutable instance of GView; it is inherited from GameApp]:
@@ -38,27 +51,29 @@ class Breakout(GameApp):
                 the user input, used to control the paddle and change state
         _state  [one of STATE_INACTIVE, STATE_COUNTDOWN, STATE_PAUSED, STATE_ACTIVE]:
                 the current state of the game represented a value from constants.py
+        _session [Session]: the whole run, which plays every tick
         _game   [Play, or None if there is no game currently active]: 
-                the controller for a single game, which manages the paddle, ball, and bricks
+                the controller for a single game, which manages the paddle, ball,
+                and bricks; it is the game of _session
+        _sprites [PlaySprites, or None if _game is None]:
+                draws _game, which does not draw itself
         _mssg   [GLabel, or None if there is no message to display]
                 the currently active message
+        _keys   [GInput, or AutopilotController if AUTOPILOT is True, or
+                ReplayInput if REPLAY_FILE is not None]:
+                what is asked about keys, to move the paddle and change state;
+                it is input unless the game plays itself or is a replay
     
     STATE SPECIFIC INVARIANTS: 
         Attribute _game is only None if _state is STATE_INACTIVE.
         Attribute _mssg is only None if  _state is STATE_ACTIVE or STATE_COUNTDOWN.
-        Attribute _gamenum is less than or equal to 5
-        Attribute _done is only not None if _state is STATE_COMPLETE and _gamenum==5
-        Attribute _scoredict is empty if _gamenum = 0
+        Attribute _done is only not None if _state is STATE_COMPLETE and the session has
+            finished 5 games of the level
+        Attribute _scoredict is empty if no game of the level is over
         Attribute _score is only None if _state is STATE_INACTIVE, STATE_COUNTDOWN,
             STATE_LEVEL2, or STATE_NEWGAME
-        Attribute _timer is only 0 if it is the first countdown of the round
-        Attribute _scoreboard has GLabels of text='' if _gamenum = 0
+        Attribute _scoreboard has GLabels of text='' if no game of the level is over
     
-    _last_keys  [GPoint, None if mouse not down last frame]:
-                   last position clicked
-    _timer      [int]
-                keeps track of how many animation frames pass after
-                game enters STATE_COUNTDOWN
     _score      [int, or None if STATE_INACTIVE or STATE_NEWGAME]
                 keeps track of how many bricks have been hit in one game
     _scoredict  [dictionary; starts off empty, max length of 5]
@@ -69,11 +84,22 @@ class Breakout(GameApp):
     _done       [GLabel, or None if not on last try]
                 after 5 tries, this message is displayed to indicate
                 that the user should close the window
-    _gamenum    [int;<=5]
-                keeps track of how many games have been played so far    
-    _levelinput [int, either 1 or 2]
-                keeps track of the level that needs to be inputed into Play
-                either Level 1 or Level 2
+    _accumulator [float >= 0]
+                game time in seconds that has passed but has not been simulated yet
+    _timescale  [float > 0]
+                how many seconds of game time pass in each real second; it
+                starts at TIME_SCALE and is stepped through TIME_SCALES with
+                the TIME_SCALE_KEYS
+    _scalekeys  [int >= 0]
+                the number of TIME_SCALE_KEYS that were held last frame
+    _scalelabel [GLabel]
+                shows _timescale when it is not 1
+    _recorder   [InputRecorder, or None if RECORD_FILE is None]
+                records the input of every tick, so the run can be played again
+    _seed       [int >= 0]
+                the seed of the whole run (and of _session), RANDOM_SEED if it
+                was given on the command line (or the seed of the replay); it is
+                shown on the welcome screen
     """
 
     def start(self):
@@ -86,12 +112,10 @@ class Breakout(GameApp):
         This method should make sure that all of the attributes satisfy the given 
         invariants. When done, it sets the _state to STATE_INACTIVE and create a message 
         (in attribute _mssg) saying that the user should press to play a game."""
-        self._last_keys = 0
         self._game = None
-        self._timer = 0
+        self._sprites = None
         self._score = None
         self._scoredict = {}
-        self._gamenum = 0
         self._done = None
         self._scoreboard = [GLabel(text='',left=50,y=GAME_HEIGHT/2-120,
                                    linecolor = colormodel.RED, font_name='arcade'),
@@ -103,12 +127,34 @@ class Breakout(GameApp):
                                    linecolor = colormodel.GREEN,font_name='arcade'),
                             GLabel(text='',left=50,y=GAME_HEIGHT/2 - 240,
                                    linecolor = colormodel.CYAN, font_name='arcade')]
+        # start is called again while inactive, so only seed the run once
+        if getattr(self,'_session',None) is None:
+            self._seed = RANDOM_SEED
+            if self._seed is None:
+                self._seed = random.SystemRandom().getrandbits(32)
+            self._keys = AutopilotController(None) if AUTOPILOT else self.input
+            continuous = CONTINUOUS_COLLISION
+            if REPLAY_FILE is not None:
+                recording = loadRecording(REPLAY_FILE)
+                self._seed = recording.getSeed()
+                continuous = recording.isContinuous()
+                self._keys = ReplayInput(recording)
+            self._session = Session(self._seed,continuous)
+            self._timescale = TIME_SCALE
+            self._scalekeys = 0
+            self._scalelabel = GLabel(text='',left=10,y=GAME_HEIGHT-25,
+                                      linecolor=colormodel.GRAY,font_name='arcade')
+            self._showTimeScale()
+            self._recorder = None
+            if RECORD_FILE is not None:
+                self._recorder = InputRecorder(open(RECORD_FILE,'wb'),self._seed)
         self._state = STATE_INACTIVE
         self._mssg = GLabel(text=str('Welcome to Breakout!\n'
-                            'Press any key to play Level 1'),
+                            'Press any key to play Level 1\n'
+                            'Seed: '+str(self._seed)),
                             x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
                             font_name='arcade')
-        self._levelinput = 1
+        self._accumulator = 0.0
     
     def update(self,dt):
         """Animates a single frame in the game.
@@ -168,14 +214,158 @@ class Breakout(GameApp):
         STATE_COMPLETE in the previous frame, 5 game rounds have been played,
         and a key has been pressed.
         
+        The game runs at a fixed rate of PHYSICS_RATE ticks per second of game
+        time, no matter how often Kivy calls this method. The time dt, times
+        the time scale, is added to _accumulator, and one tick (see _tick) is
+        run for each whole PHYSICS_TICK in it, so a frame may run zero, one or
+        several ticks; the game is still only drawn once. At most
+        MAX_TICKS_PER_FRAME ticks (times the time scale, if it is more than 1)
+        are run in one frame; if that is not enough to catch up, the rest of
+        the time is dropped.
+        
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         
         **Citation: This organization idea is copied from Walter White's lecture
         code in 'state.py', finished November 17, 2015.
         """
+        self._checkTimeScale()
+        self._accumulator += dt*self._timescale
+        limit = int(MAX_TICKS_PER_FRAME*max(self._timescale,1))
+        ticks = 0
+        while self._accumulator >= PHYSICS_TICK and ticks < limit:
+            self._accumulator -= PHYSICS_TICK
+            if self._sprites is not None:
+                self._sprites.keep()
+            self._tick()
+            ticks += 1
+        if self._accumulator >= PHYSICS_TICK:
+            self._accumulator = 0.0
+    
+    def on_stop(self):
+        """Writes the rest of the recording, if there is one, when the window
+        is closed."""
+        if getattr(self,'_recorder',None) is not None:
+            self._recorder.close()
+    
+    def snapshot(self):
+        """Returns: the state of the whole run as a bytes string, which
+        restore puts back exactly.
 
-        self._determineState()
+        It is the scoreboard (BREAKOUT_SNAPSHOT) and then the snapshot of
+        _session (see Session.snapshot), so it takes a few microseconds.
+        The time scale is not part of it, and neither are the messages,
+        since restore can show them again from the state."""
+        scores = [int(self._scoredict.get(x,-1)) for x in range(1,6)]
+        return BREAKOUT_SNAPSHOT.pack(*scores)+self._session.snapshot()
+    
+    def restore(self,data):
+        """Puts back the state of the run from a snapshot, so that it goes
+        on exactly as the run it was taken from, and shows it. The autopilot
+        or replay, if it has the keys, moves to the tick of the snapshot too
+        (but a recording in progress does not know about the jump).
+        
+        Raises ValueError if data is not a whole snapshot of a run with as
+        many rows and columns of bricks.
+        
+        Parameter: data
+        Precondition: Must be a bytes string, as returned by snapshot"""
+        if len(data) < BREAKOUT_SNAPSHOT.size:
+            raise ValueError('snapshot is too short')
+        scores = BREAKOUT_SNAPSHOT.unpack_from(data)
+        self._session.restore(data[BREAKOUT_SNAPSHOT.size:])
+        if self._session.getGame() is not self._game:
+            self._game = self._session.getGame()
+            self._sprites = None if self._game is None else PlaySprites(self._game)
+        elif self._sprites is not None:
+            self._sprites.keep()
+        if isinstance(self._keys,AutopilotController):
+            self._keys.setGame(self._game)
+        if self._keys is not self.input:
+            self._keys.setTick(self._session.getTicks())
+        self._state = self._session.getState()
+        if self._state == STATE_INACTIVE:
+            self.start()
+            return
+        self._scoredict = {}
+        for x in range(5):
+            self._scoreboard[x].text = ''
+            if scores[x] >= 0:
+                self._scoredict[x+1] = str(scores[x])
+                self._scoreboard[x].text = str('Try: '+str(x+1)+' ....... Points: '
+                                               +str(scores[x]))
+        self._showState()
+    
+    def _showState(self):
+        """Helper method for restore that puts up the messages and score of
+        the state, as the helper for the state would have left them at the
+        last tick."""
+        self._mssg = None
+        self._done = None
+        self._score = None
+        if self._game is not None and self._state != STATE_LEVEL2:
+            self._score = GLabel(text='',x=GAME_WIDTH/2,y=GAME_HEIGHT-25,
+                                 linecolor=colormodel.GRAY, font_name='arcade')
+            self._updateScore()
+        if self._state == STATE_COUNTDOWN:
+            if self._session.getTimer() < 180:
+                self._mssg = GLabel(text='',x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
+                                    font_name='arcade')
+            self._countdown()
+        elif self._state == STATE_ACTIVE:
+            self._active()
+        elif self._state == STATE_PAUSED:
+            self._paused()
+        elif self._state == STATE_COMPLETE:
+            self._complete()
+        elif self._state == STATE_LEVEL2:
+            self._mssg = GLabel(text='',x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
+                                font_name='arcade')
+            self._level2()
+    
+    def _checkTimeScale(self):
+        """Helper method for update that steps the time scale down or up
+        through TIME_SCALES when one of the TIME_SCALE_KEYS is pressed. These
+        keys are always read from the keyboard, even on autopilot."""
+        down = [k for k in TIME_SCALE_KEYS if self.input.is_key_down(k)]
+        if len(down) > 0 and self._scalekeys == 0:
+            if TIME_SCALE_KEYS[0] in down:
+                scales = [x for x in TIME_SCALES if x < self._timescale]
+                if len(scales) > 0:
+                    self._timescale = scales[-1]
+            else:
+                scales = [x for x in TIME_SCALES if x > self._timescale]
+                if len(scales) > 0:
+                    self._timescale = scales[0]
+            self._showTimeScale()
+        self._scalekeys = len(down)
+    
+    def _showTimeScale(self):
+        """Helper method to put the time scale in _scalelabel, or nothing at
+        normal speed."""
+        if self._timescale == 1:
+            self._scalelabel.text = ''
+        else:
+            self._scalelabel.text = '%gx' % self._timescale
+    
+    def _tick(self):
+        """Helper method for update that advances the game by one physics tick.
+        The session plays the tick (see Session.tick), and then the helper for
+        the state it was played in updates the messages and sprites (and the
+        autopilot or replay moves on, if it has the keys). The time scale keys
+        do not count as keys held. The input of the tick is recorded, if there is a
+        recording, before the session uses it."""
+        count = self._keys.key_count
+        if self._keys is self.input:
+            count -= self._scalekeys
+        if self._recorder is not None:
+            self._recorder.record(packKeys(self._keys,count,self.input))
+        last = self._state
+        self._state = self._session.tick(self._keys,count)
+        self._game = self._session.getGame()
+        if self._state == STATE_COUNTDOWN and last != STATE_COUNTDOWN:
+            # the message of STATE_PAUSED goes once a key is pressed
+            self._mssg = None
         if self._state == STATE_INACTIVE:
             self.start()
         elif self._state == STATE_NEWGAME:
@@ -194,75 +384,31 @@ class Breakout(GameApp):
             self._active2()
         elif self._state == STATE_PAUSED2:
             self._paused2()
+        self._state = self._session.getState()
+        if self._keys is not self.input:
+            self._keys.tick()
          
     def draw(self):
         """Draws the game objects to the view.
-        Draws _mssg, _score, _game, _scoreboard, _done.
+        Draws _mssg, _score, _game, _scoreboard, _done, and the time scale.
         """
         if self._mssg is not None:
             self._mssg.draw(self.view)
         if (self._score is not None):
             self._score.draw(self.view)
         if self._state not in [STATE_INACTIVE,STATE_COMPLETE, STATE_LEVEL2]:
-            self._game.draw(self.view)
+            alpha = 1.0
+            if self._timescale < 1:
+                alpha = min(self._accumulator/PHYSICS_TICK,1.0)
+            self._sprites.draw(self.view,alpha)
         if (self._state is STATE_COMPLETE) and (len(self._scoredict) != 0):
             for x in self._scoreboard:
                 x.draw(self.view)
         if self._done is not None:
             self._done.draw(self.view)
+        if self._scalelabel.text != '':
+            self._scalelabel.draw(self.view)
         
-    def _determineState(self):
-        """Helper method for update that changes the state if necessary.
-        If state is INACTIVE and a key is pressed, it moves to NEWGAME.
-        If state is ACTIVE, ball goes off screen, and there are tries left,
-            it moves to PAUSED.
-        If state is PAUSED and a key is pressed, it moves to COUNTDOWN.
-        If state is ACTIVE, ball goes off screen, and there are no tries
-            left, state goes to COMPLETE.
-        If state is ACTIVE and all the bricks are eliminated, it moves to
-            state COMPLETE.
-        If state is COMPLETE, a key is pressed, and the player has not
-            yet reached the limit of 5 games, it moves to NEWGAME.
-        If state is COMPLETE, a key is pressed, and the player has
-             reached the limit of 5 games, it moves to LEVEL2.
-        If state is LEVEL2 and a key is pressed, the state moves to NEWGAME.
-        ***Citation: Understanding of key count and state change was
-        taken from looking at Walter White's lecture
-        code in 'state.py', finished November 17, 2015."""
-        curr_keys = self.input.key_count
-        change = curr_keys > 0 and self._last_keys == 0
-        if change and (self._state == STATE_INACTIVE):
-            self._state = STATE_NEWGAME
-        self._last_keys= curr_keys
-        if self._state == STATE_ACTIVE:
-            if (self._game.getStatus() == 'oops') and (self._game.getTries() != 0):
-                self._state = STATE_PAUSED
-                self._game.setStatus(None)
-            elif (self._game.getStatus() == 'oops') and (self._game.getTries() == 0):
-                self._gamenum += 1
-                self._state = STATE_COMPLETE
-        elif self._state == STATE_COMPLETE and change:
-            self._helpcompletechange()
-        elif self._state == STATE_LEVEL2 and change:
-            self._state = STATE_NEWGAME
-        if self._state == STATE_PAUSED and change:
-            self._mssg = None
-            self._state = STATE_COUNTDOWN
-        if self._state == STATE_ACTIVE and self._game.getBrickLength() == 0:
-            self._gamenum += 1
-            self._state = STATE_COMPLETE
-
-    def _helpcompletechange(self):
-        """Helper method for _determineState. Only called if
-        self._state is STATE_COMPLETE and change."""
-        if self._gamenum <5:
-            self._state = STATE_NEWGAME
-        elif self._gamenum == 5:
-            if self._levelinput == 1:
-                self._state = STATE_LEVEL2
-            else:
-                self._state = STATE_INACTIVE
-    
     def _updateScore(self):
         """Helper method for COUNTDOWN and ACTIVE to display how many
         bricks a player has eliminated. For instance, if 1 brick is
@@ -281,13 +427,14 @@ class Breakout(GameApp):
     def _newgame(self):
         """Helper method for operations of _state STATE_NEWGAME.
         Only called when game is in this state.
-        Creates GUIs of Play() and displays them on the screen.
-        Only lasts one animation frame."""
+        Creates GUIs of the new Play of the session and displays them on the
+        screen. Only lasts one animation frame."""
         self._done = None
         if self._mssg is not None:
             self._mssg.text = ''
-        self._game = Play(self._levelinput)
-        self._state = STATE_COUNTDOWN
+        self._sprites = PlaySprites(self._game)
+        if isinstance(self._keys,AutopilotController):
+            self._keys.setGame(self._game)
         
     def _countdown(self):
         """Helper method for operations of _state STATE_COUNTDOWN.
@@ -295,45 +442,41 @@ class Breakout(GameApp):
         If this is the first countdown of the game round, there are
         GLabels counting 3-2-1 until state is switched.
         If this is not the first countdown, state moves to ACTIVE.
-        Timer keeps track of animation frames, which change 60 times
-        per second. So after 60 animation frames, 1 second has passed.
-        There is a gap between number changes of 3-2-1.
+        The timer of the session keeps track of physics ticks, which happen
+        PHYSICS_RATE (60) times per second. So after 60 ticks, 1 second has
+        passed. There is a gap between number changes of 3-2-1.
         The paddle can be moved in this state so the players can orient
-        themselves, but there is no ball."""
+        themselves, but there is no ball (the session moves the paddle and
+        serves the ball)."""
         self._done = None
         if self._mssg is not None:
             self._mssg.text = ''
         self._updateScore()
-        self._timer += 1
-        self._game.updatePaddle(self.input)
-        if 0 <= self._timer < 60-WAIT_TIME:
+        timer = self._session.getTimer()
+        if 0 <= timer < 60-WAIT_TIME:
            self._mssg = GLabel(text='3',x=GAME_WIDTH/2,
                                y=GAME_HEIGHT/2, font_name='arcade')
-        if 60-WAIT_TIME <= self._timer < 60+WAIT_TIME:
+        if 60-WAIT_TIME <= timer < 60+WAIT_TIME:
            self._mssg.text = ''
-        if 60+WAIT_TIME <= self._timer < 120-WAIT_TIME:
+        if 60+WAIT_TIME <= timer < 120-WAIT_TIME:
             self._mssg.text = '2'
-        if 120-WAIT_TIME <= self._timer < 120+WAIT_TIME:
+        if 120-WAIT_TIME <= timer < 120+WAIT_TIME:
             self._mssg.text = ''
-        if 120+WAIT_TIME <= self._timer < 180:
+        if 120+WAIT_TIME <= timer < 180:
             self._mssg.text = '1'
-        if self._timer == 180:
+        if timer == 180:
             self._mssg = None
-        if self._timer > 180:
-            self._game.serveBall()
-            self._state = STATE_ACTIVE
             
     def _active(self):
         """Helper method when _state is STATE_ACTIVE.
         Only called when in this state.
         Allows the player to move the paddle to hit the ball and
         (hopefully) bounce the ball onto the bricks.
-        As each brick is hit, the score is updated to reflect the change."""
+        As each brick is hit, the score is updated to reflect the change.
+        The session moves the paddle and ball."""
         self._done = None
         self._mssg = None
         self._updateScore()
-        self._game.updatePaddle(self.input)
-        self._game.updateBall()
         
     def _paused(self):
         """Helper method when _state is STATE_PAUSED.
@@ -372,14 +515,12 @@ class Breakout(GameApp):
         
     def _level2(self):
         """Helper method to display message moving player onto level 2.
-        Also resets score dictionary, game number, and timer."""
+        Also resets score dictionary (the session resets the game number
+        and timer)."""
         self._mssg.text = str('LEVEL 2\n\nTwo balls will be served.\nPress'+
                 ' any key if you dare.')
         self._done = None
-        self._levelinput = 2
         self._scoredict = {}
-        self._gamenum = 0
-        self._timer = 0
         for x in range(0,5):
             self._scoreboard[x].text = ''
         self._score = None
@@ -393,29 +534,30 @@ class Breakout(GameApp):
         number of the game/turn just used.
         Score are listed in chronological order with colors
         matching brick colors of active state."""
+        gamenum = self._session.getGameNumber()
+        level = self._session.getLevel()
         self._mssg = GLabel(text='',x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
                                 font_name='arcade')
-        if self._gamenum < 5:
+        if gamenum < 5:
             self._mssg.text = str('Congratulations! You win!\nPress'+
                                       ' any key to play again\n\nScoreboard:')
-        self._scoredict[self._gamenum] = str(self._game.getStoredBricks())
+        self._scoredict[gamenum] = str(self._game.getStoredBricks())
         for x in sorted(self._scoredict):
-            self._scoreboard[self._gamenum - 1].text = str('Try: '
+            self._scoreboard[gamenum - 1].text = str('Try: '
                                 +str(x)+' ....... Points: '
                                 +str(self._scoredict[x]))
-        if self._gamenum == 5 and self._levelinput == 1:
+        if gamenum == 5 and level == 1:
             self._done = GLabel(
                 text='Can you handle LEVEL 2?\nP'+
                 'ress any key to continue',
                 x=GAME_WIDTH/2, y = GAME_HEIGHT/2,
                 font_name='arcade')
-        elif (self._gamenum == 5) and (self._levelinput ==2):
+        elif (gamenum == 5) and (level ==2):
             self._mssg = None
             self._done = GLabel(
                 text = str('To go back to Level 1,\npress any key.'),
                 x=GAME_WIDTH/2, y = GAME_HEIGHT/2,
                 font_name='arcade')
-            self._timer = 0
             
             
     
@@ -429,29 +571,30 @@ class Breakout(GameApp):
         matching brick colors of active state.
         This is used in instance of the player
         not eliminating all the bricks, but running out of tries."""
+        gamenum = self._session.getGameNumber()
+        level = self._session.getLevel()
         self._mssg = GLabel(text='',x=GAME_WIDTH/2,y=GAME_HEIGHT/2,
                                 font_name='arcade')
-        if self._gamenum < 5:
+        if gamenum < 5:
             self._mssg.text = str('LOSER\nPress any'+
                                       ' key to play again\n\nScoreboard:')
-        self._scoredict[self._gamenum] = str(
+        self._scoredict[gamenum] = str(
                 self._game.getStoredBricks() - self._game.getBrickLength())
         for x in sorted(self._scoredict):
-            self._scoreboard[self._gamenum - 1].text = str('Try: '
+            self._scoreboard[gamenum - 1].text = str('Try: '
                         +str(x)+' ....... Points: '
                         +str(self._scoredict[x]))
-        if (self._gamenum == 5) and (self._levelinput ==1):
+        if (gamenum == 5) and (level ==1):
             self._mssg.text = ''
             self._done = GLabel(
                 text = str('Can you handle LEVEL 2?\nP'+
                         'ress any key to continue'),
                     x=GAME_WIDTH/2, y = GAME_HEIGHT/2,
                     font_name='arcade')
-        elif (self._gamenum == 5) and (self._levelinput ==2):
+        elif (gamenum == 5) and (level ==2):
             self._mssg = None
             self._done = GLabel(
                 text = str('To go back to Level 1,\npress any key.'),
                 x=GAME_WIDTH/2, y = GAME_HEIGHT/2,
                 font_name='arcade')
-            self._timer = 0
     
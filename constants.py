@@ -54,6 +54,15 @@ BRICK_COLORS   = [colormodel.RED, colormodel.RED,colormodel.ORANGE,colormodel.OR
 
 #: the diameter of the ball in pixels
 BALL_DIAMETER = 18
+#: the speed multipliers of the balls served in each level (Level 1 first).
+#: In Level 2 two balls are served, one 1.25 times and one 2 times slower.
+SERVE_SPEEDS  = [[1.0], [1/1.25, 1/2.0]]
+#: the speed multiplier of every ball still in play once a ball is lost
+BALL_SPEEDUP  = 1.0
+#: the range of the horizontal speed of a served ball (its direction, left or
+#: right, is picked at random too)
+SERVE_VX_MIN  = 1.0
+SERVE_VX_MAX  = 5.0
 
 
 ######### GAME CONSTANTS #########
@@ -85,12 +94,69 @@ if you start the game typing
     
 Python puts ['breakout.py', '3', '4'] into sys.argv. Below, we 
 take advantage of this fact to change the constants BRICKS_IN_ROW
-and BRICK_ROWS"""
+and BRICK_ROWS.
+
+The option --seed N may come before or after them, as in
+
+    python breakout.py 3 4 --seed 12345
+
+and sets RANDOM_SEED, so that the game serves the same balls every time.
+The option --autopilot sets AUTOPILOT, so that the computer plays the game, and
+the option --timescale X sets TIME_SCALE, so that it runs X times as fast, and
+the option --record FILE sets RECORD_FILE, so that the input is recorded to FILE, and
+the option --replay FILE sets REPLAY_FILE, so that the run recorded in FILE is shown."""
+
+#: the seed for every random number in the game, so that a run can be
+#: repeated exactly; None picks one when the game starts (it is shown then)
+RANDOM_SEED = None
+#: whether the paddle is moved by an AutopilotController instead of the keyboard
+AUTOPILOT = False
+#: how fast the game runs when it starts, as a multiple of real time
+TIME_SCALE = 1.0
+#: the file the input of the run is recorded to (see recording.py), or None
+RECORD_FILE = None
+#: the file of a recorded run to play instead of reading the keyboard, or None
+REPLAY_FILE = None
+
+_arguments = [] if sys.argv is None else list(sys.argv[1:])
+try:
+    if '--seed' in _arguments:
+        _pos = _arguments.index('--seed')
+        _seed = int(_arguments[_pos+1])
+        del _arguments[_pos:_pos+2]
+        if _seed >= 0:
+            RANDOM_SEED = _seed
+except: # Leave the seed alone
+    pass
+
+if '--autopilot' in _arguments:
+    _arguments.remove('--autopilot')
+    AUTOPILOT = True
+
+try:
+    if '--timescale' in _arguments:
+        _pos = _arguments.index('--timescale')
+        _scale = float(_arguments[_pos+1])
+        del _arguments[_pos:_pos+2]
+        if _scale > 0:
+            TIME_SCALE = _scale
+except: # Leave the time scale alone
+    pass
+
+if '--record' in _arguments[:-1]:
+    _pos = _arguments.index('--record')
+    RECORD_FILE = _arguments[_pos+1]
+    del _arguments[_pos:_pos+2]
+
+if '--replay' in _arguments[:-1]:
+    _pos = _arguments.index('--replay')
+    REPLAY_FILE = _arguments[_pos+1]
+    del _arguments[_pos:_pos+2]
 
 try:
-   if (not sys.argv is None and len(sys.argv) == 3):
-        bs_in_row  = int(sys.argv[1])
-        brick_rows = int(sys.argv[2])
+   if (len(_arguments) == 2):
+        bs_in_row  = int(_arguments[0])
+        brick_rows = int(_arguments[1])
         if (bs_in_row > 0 and brick_rows > 0):
             # ALTER THE CONSTANTS
             BRICKS_IN_ROW  = bs_in_row
@@ -104,3 +170,66 @@ except: # Leave the contants alone
 
 #: time to wait between putting up numbers of countdown
 WAIT_TIME = 7
+#: whether a new Play sweeps balls along their move each frame so that fast
+#: balls cannot pass through bricks or the paddle (continuous collision)
+CONTINUOUS_COLLISION = False
+#: the most impacts handled for one ball in one frame of continuous collision
+MAX_IMPACTS = 8
+#: the fewest balls that are moved all at once with NumPy; fewer balls are
+#: moved one at a time, which is faster for so few
+VECTOR_MIN_BALLS = 8
+#: the number of physics ticks per second; ball and paddle speeds are per tick
+PHYSICS_RATE = 60
+#: the length of one physics tick in seconds
+PHYSICS_TICK = 1.0/PHYSICS_RATE
+#: the most physics ticks run for one rendered frame; any time beyond that is
+#: dropped so that one slow frame cannot make every later frame slower
+MAX_TICKS_PER_FRAME = 5
+#: how far (in pixels) the ball may be from the center of the paddle before
+#: a computer controller moves the paddle toward it
+TRACK_DEADBAND = 6
+#: the most physics ticks a simulated game may last (10 minutes at 60 Hz);
+#: a game that reaches it ends as unfinished
+SIMULATION_TICK_LIMIT = 36000
+#: how many physics ticks an AutopilotController waits between key presses,
+#: which move the game on from the screens that wait for one (2 seconds)
+AUTOPILOT_PRESS_TICKS = 2*PHYSICS_RATE
+#: the most contacts, and the most physics ticks ahead, that Play.raycast
+#: looks for when it is not told otherwise
+RAYCAST_EVENTS = 16
+RAYCAST_TICKS = 10*PHYSICS_RATE
+#: the longest loop, in physics ticks, that soak.py looks for (1 minute), and
+#: the grid (in pixels) it rounds the positions of the balls and paddle to
+SOAK_WINDOW = 60*PHYSICS_RATE
+SOAK_QUANTUM = 1.0
+#: the time scales the keys step through, slow motion below 1 and fast
+#: forward above it; in fast forward several ticks run in each frame (at most
+#: MAX_TICKS_PER_FRAME times the scale), but the game is still drawn once
+TIME_SCALES = [0.125, 0.25, 0.5, 1.0, 2.0, 4.0, 16.0, 64.0]
+#: the keys that step down and up through TIME_SCALES; they do not count as
+#: the key press that moves the game on from a message
+TIME_SCALE_KEYS = ['-', '=']
+#: how many physics ticks a ReplayPlayer plays between copies of the session it
+#: can seek back to (5 seconds); a seek never plays more ticks than this
+REPLAY_CHECKPOINT_TICKS = 5*PHYSICS_RATE
+#: in a match of netplay.py, every NETPLAY_ATTACK bricks a player breaks brings
+#: back a brick on the board of the other player
+NETPLAY_ATTACK = 3
+#: the most ticks netplay.py plays ahead of the last tick whose input from the
+#: other player has arrived (200 ms); past that it waits, and a late input
+#: makes it play at most this many ticks again
+NETPLAY_ROLLBACK_TICKS = 12
+#: the UDP port of the first player of netplay.py (the second uses the next one)
+NETPLAY_PORT = 7460
+#: how long, in seconds, netplay.py keeps answering the other player after it has
+#: played every tick, so that the other player can finish too
+NETPLAY_LINGER = 2.0
+#: the UDP port of the game server of server.py
+SERVER_PORT = 7470
+#: how many ticks of states server.py keeps for each client (2 seconds); a
+#: client that has not acknowledged any of them gets a whole state again
+SERVER_HISTORY_TICKS = 2*PHYSICS_RATE
+#: server.py sends positions in 1/SERVER_POSITION_SCALE of a pixel
+SERVER_POSITION_SCALE = 16
+#: how long, in seconds, server.py keeps a client it does not hear from
+SERVER_TIMEOUT = 3.0
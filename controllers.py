@@ -0,0 +1,320 @@
+# controllers.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Paddle controllers for Breakout
+
+Play.updatePaddle only asks its input whether the 'left' and 'right' keys are down.
+The classes in this module answer that question without a keyboard, so a game can be
+played by the computer, for example by the headless runner in simulate.py.
+
+Each controller has the method is_key_down(key), like the GInput of game2d, and
+the method tick(), which is called once per physics tick after the paddle moves.
+A controller for a BatchPlay answers for every game at once, with a bool array.
+
+AutopilotController also has the attribute key_count of GInput, so Breakout can use
+it in place of the keyboard for a game that plays itself (python breakout.py --autopilot)."""
+import numpy as np
+from constants import *
+
+
+def predictCrossing(x,y,vx,vy,r,line):
+    """Returns: the tuple (t,cross) of the ticks until a ball comes down to
+    the height line, and the x coordinate of its center when it does.
+
+    The walls are unfolded: a ball that bounces off a side wall moves on in a
+    mirror image of the game, so its path is a straight line until it comes
+    down.  A ball going up first comes back down from the top wall.  t is inf
+    (and cross is x) for a ball that is already below line.  Bricks are not
+    counted, so a ball that hits one comes down somewhere else.
+
+    Parameter: x, y
+    Precondition: Must be floats, the center of the ball
+
+    Parameter: vx, vy
+    Precondition: Must be floats, the distance the ball moves in a tick (its
+        velocity times its speed multiplier); vy is not 0
+
+    Parameter: r
+    Precondition: Must be a float > 0, the radius of the ball
+
+    Parameter: line
+    Precondition: Must be a float, the height of the ball's center when it
+        touches the top of the paddle"""
+    if vy < 0:
+        fall = y-line
+    else:
+        fall = 2*(GAME_HEIGHT-r)-y-line
+    if fall < 0:
+        return (float('inf'),x)
+    t = fall/abs(vy)
+    width = GAME_WIDTH-2*r
+    fold = (x-r+vx*t) % (2*width)
+    if fold > width:
+        fold = 2*width-fold
+    return (t,r+fold)
+
+
+def predictCrossings(x,y,vx,vy,r,line):
+    """Returns: the arrays (t,cross) of predictCrossing for many balls at once.
+
+    Parameter: x, y, vx, vy
+    Precondition: Must be float arrays of the same shape, as in predictCrossing
+
+    Parameter: r, line
+    Precondition: Must be as in predictCrossing"""
+    fall = np.where(vy < 0,y-line,2*(GAME_HEIGHT-r)-y-line)
+    t = np.where(fall >= 0,fall/np.maximum(np.abs(vy),1e-9),np.inf)
+    width = GAME_WIDTH-2*r
+    fold = np.mod(x-r+vx*np.where(fall >= 0,t,0.0),2*width)
+    cross = r+np.where(fold > width,2*width-fold,fold)
+    return (t,cross)
+
+
+class ScriptedController(object):
+    """An instance presses keys from a fixed script, one step per physics tick.
+
+    When the script runs out it starts over, so the paddle keeps moving for
+    as long as the game lasts.
+
+    INSTANCE ATTRIBUTES:
+        _script [nonempty list of strings]: the keys held at each tick; each
+                string is 'left', 'right', or '' for no key
+        _step   [int >= 0]: the position in _script of the current tick
+    """
+
+    def __init__(self,game,script=None):
+        """Initializer to make a controller for a game.
+
+        Parameter: game
+        Precondition: Must be a Play (it is not used; every controller takes one)
+
+        Parameter: script
+        Precondition: Must be a nonempty list of 'left', 'right' or '', or None
+            to sweep the paddle across the screen and back"""
+        if script is None:
+            sweep = int(GAME_WIDTH/12)
+            script = ['left']*sweep+['right']*sweep
+        self._script = script
+        self._step = 0
+
+    def is_key_down(self,key):
+        """Returns: True if key is held at this tick of the script.
+
+        Parameter: key
+        Precondition: Must be a string"""
+        return self._script[self._step] == key
+
+    def tick(self):
+        """Moves on to the next step of the script."""
+        self._step = (self._step+1) % len(self._script)
+
+
+class TrackingController(object):
+    """An instance moves the paddle under the lowest ball in play.
+
+    The paddle only moves when the ball is more than TRACK_DEADBAND away
+    from its center, so it does not shake from side to side.
+
+    INSTANCE ATTRIBUTES:
+        _game [Play]: the game whose paddle is controlled
+    """
+
+    def __init__(self,game):
+        """Initializer to make a controller for a game.
+
+        Parameter: game
+        Precondition: Must be a Play"""
+        self._game = game
+
+    def is_key_down(self,key):
+        """Returns: True if the paddle should move in the direction of key.
+
+        Parameter: key
+        Precondition: Must be a string"""
+        xs, ys = self._game.getBallPositions()
+        if xs.size == 0:
+            return False
+        diff = xs.item(ys.argmin())-self._game.getPaddle().getX()
+        if key == 'left':
+            return diff < -TRACK_DEADBAND
+        if key == 'right':
+            return diff > TRACK_DEADBAND
+        return False
+
+    def tick(self):
+        """Does nothing; the controller only looks at the game."""
+        pass
+
+
+class BatchTrackingController(object):
+    """An instance moves the paddle of every game of a BatchPlay under the
+    lowest ball in play in that game.
+
+    This is TrackingController for many games at once, so each game of the
+    batch moves its paddle exactly as a TrackingController would.
+
+    INSTANCE ATTRIBUTES:
+        _batch [BatchPlay]: the games whose paddles are controlled
+    """
+
+    def __init__(self,batch):
+        """Initializer to make a controller for a batch of games.
+
+        Parameter: batch
+        Precondition: Must be a BatchPlay"""
+        self._batch = batch
+
+    def is_key_down(self,key):
+        """Returns: bool array, True for each game whose paddle should move in
+        the direction of key.
+
+        Parameter: key
+        Precondition: Must be a string"""
+        xs, ys, inplay = self._batch.getBallPositions()
+        lowest = np.where(inplay,ys,np.inf).argmin(axis=1)
+        x = xs[np.arange(xs.shape[0]),lowest]
+        diff = np.where(inplay.any(axis=1),x-self._batch.getPaddlePositions(),0.0)
+        if key == 'left':
+            return diff < -TRACK_DEADBAND
+        if key == 'right':
+            return diff > TRACK_DEADBAND
+        return np.zeros(xs.shape[0],dtype=bool)
+
+    def tick(self):
+        """Does nothing; the controller only looks at the games."""
+        pass
+
+
+class AutopilotController(object):
+    """An instance moves the paddle to where the next ball will come down.
+
+    The ball that reaches the paddle first is followed, and the place where it
+    crosses the top of the paddle is worked out with predictCrossing (once a
+    tick), so the paddle gets there early instead of chasing the ball.  The
+    paddle only moves when that place is more than TRACK_DEADBAND away from its
+    center.
+
+    It can also stand in for the keyboard in Breakout, which needs a key press
+    to serve and to go on from the pause and level screens: every
+    AUTOPILOT_PRESS_TICKS ticks, key_count is 1 for one tick.
+
+    INSTANCE ATTRIBUTES:
+        key_count [int, 0 or 1]: the number of keys "held" this tick, as in GInput
+        _game     [Play, or None if there is no game]: the game whose paddle is
+                  controlled
+        _ticks    [int >= 0]: the number of ticks since the last key press
+        _target   [float, or None if not yet worked out this tick]: the x
+                  coordinate the paddle is moving to (it stays where it is
+                  if the target is its own center)
+    """
+
+    def setGame(self,game):
+        self._game = game
+        self._target = None
+
+    def __init__(self,game):
+        """Initializer to make a controller for a game.
+
+        Parameter: game
+        Precondition: Must be a Play, or None (until setGame is called)"""
+        self._game = game
+        self._ticks = 0
+        self._target = None
+        self.key_count = 0
+
+    def setTick(self,tick):
+        """Moves to the given tick, as if tick had been called that many times
+        since this controller was made (as Breakout does once a tick), for
+        example when a snapshot of the game is restored.
+
+        Parameter: tick
+        Precondition: Must be an int >= 0"""
+        self._target = None
+        self._ticks = tick % AUTOPILOT_PRESS_TICKS
+        self.key_count = 1 if self._ticks == 0 and tick > 0 else 0
+
+    def is_key_down(self,key):
+        """Returns: True if the paddle should move in the direction of key.
+
+        Parameter: key
+        Precondition: Must be a string"""
+        if self._game is None:
+            return False
+        if self._target is None:
+            self._target = self._findTarget()
+        diff = self._target-self._game.getPaddle().getX()
+        if key == 'left':
+            return diff < -TRACK_DEADBAND
+        if key == 'right':
+            return diff > TRACK_DEADBAND
+        return False
+
+    def _findTarget(self):
+        """Returns: the x coordinate where the first ball to come down will
+        cross the top of the paddle, or the center of the paddle if no ball
+        will."""
+        paddle = self._game.getPaddle()
+        r = self._game.getRadius()
+        line = paddle.getTop()+r
+        xs, ys = self._game.getBallPositions()
+        vxs, vys, speeds = self._game.getBallVelocities()
+        best = (float('inf'),paddle.getX())
+        for x, y, vx, vy, speed in zip(xs.tolist(),ys.tolist(),vxs.tolist(),
+                                       vys.tolist(),speeds.tolist()):
+            crossing = predictCrossing(x,y,vx*speed,vy*speed,r,line)
+            # only the time counts: a ball that never comes down is (inf,x),
+            # and must not win a tie with the paddle on its x
+            if crossing[0] < best[0]:
+                best = crossing
+        return best[1]
+
+    def tick(self):
+        """Moves on to the next tick, pressing a key if it is time to."""
+        self._target = None
+        self._ticks = (self._ticks+1) % AUTOPILOT_PRESS_TICKS
+        self.key_count = 1 if self._ticks == 0 else 0
+
+
+class BatchAutopilotController(object):
+    """An instance moves the paddle of every game of a BatchPlay to where the
+    next ball of that game will come down.
+
+    This is AutopilotController for many games at once, so each game of the
+    batch moves its paddle exactly as an AutopilotController would.
+
+    INSTANCE ATTRIBUTES:
+        _batch [BatchPlay]: the games whose paddles are controlled
+    """
+
+    def __init__(self,batch):
+        """Initializer to make a controller for a batch of games.
+
+        Parameter: batch
+        Precondition: Must be a BatchPlay"""
+        self._batch = batch
+
+    def is_key_down(self,key):
+        """Returns: bool array, True for each game whose paddle should move in
+        the direction of key.
+
+        Parameter: key
+        Precondition: Must be a string"""
+        xs, ys, inplay = self._batch.getBallPositions()
+        vxs, vys, speeds = self._batch.getBallVelocities()
+        r = self._batch.getRadius()
+        line = PADDLE_OFFSET+PADDLE_HEIGHT+r
+        t, cross = predictCrossings(xs,ys,vxs*speeds,vys*speeds,r,line)
+        t = np.where(inplay,t,np.inf)
+        first = t.argmin(axis=1)
+        games = np.arange(xs.shape[0])
+        diff = np.where(np.isfinite(t[games,first]),
+                        cross[games,first]-self._batch.getPaddlePositions(),0.0)
+        if key == 'left':
+            return diff < -TRACK_DEADBAND
+        if key == 'right':
+            return diff > TRACK_DEADBAND
+        return np.zeros(xs.shape[0],dtype=bool)
+
+    def tick(self):
+        """Does nothing; the controller only looks at the games."""
+        pass
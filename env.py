@@ -0,0 +1,470 @@
+# env.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Training environment for Breakout
+
+This module wraps a Play in the reset/step interface used to train game playing agents:
+reset starts a new game and returns what the agent sees (the observation), and step
+plays one physics tick with the agent's action and returns the observation, the reward
+(the bricks broken in that tick), whether the game is over, and a dictionary of extra
+information.  There is no window and no Kivy Clock, so the games run as fast as Play
+can move them.
+
+An action is a position in ACTIONS: 0 holds no key, 1 holds 'left' and 2 holds 'right'.
+As in simulate.py, a lost ball is served again at once.
+
+The observation is a float array, overwritten by every reset and step (copy it to keep
+it).  Entry 0 is the x coordinate of the paddle.  Then each ball that can be served at
+once has 5 entries: 1 if it is in play (0 otherwise, with the rest 0 too), its x and y
+coordinates, and how far it moves in x and y in one tick.  If the environment was made
+with bricks=True, the observation ends with one entry per brick: 1 if it is still alive
+and 0 if it is not.
+
+VecEnv steps many environments at once in worker processes.  The observations, rewards
+and other results are written by the workers straight into arrays in shared memory,
+so nothing but a short command and its answer goes through the pipes."""
+import random
+import traceback
+import multiprocessing
+import numpy as np
+from constants import *
+from play import *
+
+
+#: the key held for each action: none, left, right
+ACTIONS = ['','left','right']
+
+
+class ActionInput(object):
+    """An instance is the input of a BreakoutEnv for Play.updatePaddle.
+
+    It answers is_key_down like the GInput of game2d, for the one key that
+    the agent's action holds down.
+
+    INSTANCE ATTRIBUTES:
+        _key [string]: the key held down, one of ACTIONS ('' for none)
+    """
+
+    def setAction(self,action):
+        """Holds down the key of an action.
+
+        Parameter: action
+        Precondition: Must be an int, a position in ACTIONS"""
+        self._key = ACTIONS[action]
+
+    def __init__(self):
+        """Initializer with no key held down."""
+        self._key = ''
+
+    def is_key_down(self,key):
+        """Returns: True if key is the key held down.
+
+        Parameter: key
+        Precondition: Must be a string"""
+        return key == self._key
+
+
+class BreakoutEnv(object):
+    """An instance is a Breakout environment for training an agent.
+
+    Each reset makes a new Play and serves, and each step is one physics tick.
+    A game is over when it is won, when it runs out of tries, or when it has
+    lasted limit ticks (then info['truncated'] is True).
+
+    INSTANCE ATTRIBUTES:
+        _level   [int, either 1 or 2]: the level of every game
+        _limit   [int > 0]: the most ticks in one game
+        _bricks  [bool]: whether the observation ends with the brick mask
+        _continuous [bool]: passed to each Play
+        _speeds  [list of floats > 0, or None]: passed to each Play
+        _vxrange [tuple of two floats]: passed to each Play
+        _slots   [int > 0]: the number of balls served at once
+        _rng     [random.Random]: picks the seed of a game when reset is not
+                given one
+        _input   [ActionInput]: the input of _game
+        _obs     [float array]: the observation
+        _game    [Play, or None before the first reset]: the game being played
+        _ticks   [int >= 0]: the ticks played in _game
+        _left    [int >= 0]: the bricks left in _game after the last tick
+        _done    [bool]: True if _game is over
+    """
+
+    def getLevel(self):
+        return self._level
+    def getGame(self):
+        return self._game
+    def getObservationSize(self):
+        return self._obs.size
+    def getActionCount(self):
+        return len(ACTIONS)
+    def isDone(self):
+        return self._done
+
+    def __init__(self,level=1,seed=None,limit=SIMULATION_TICK_LIMIT,bricks=False,
+                 continuous=CONTINUOUS_COLLISION,speeds=None,
+                 vxrange=(SERVE_VX_MIN,SERVE_VX_MAX),out=None):
+        """Initializer to make an environment; call reset to start a game.
+
+        Parameter: level
+        Precondition: Must be an int (either 1 or 2)
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, or None to pick one at random; it
+            picks the seeds of the games that reset is not given one for
+
+        Parameter: limit
+        Precondition: Must be an int > 0, the most ticks in one game
+
+        Parameter: bricks
+        Precondition: Must be a bool, True to add the brick mask to the
+            observation
+
+        Parameter: continuous, speeds, vxrange
+        Precondition: Must be as in the initializer of Play
+
+        Parameter: out
+        Precondition: Must be None, or a float array of the size of the
+            observation, to write the observations into (for sharing them)"""
+        if speeds is None:
+            speeds = SERVE_SPEEDS[level-1]
+        self._level = level
+        self._limit = limit
+        self._bricks = bricks
+        self._continuous = continuous
+        self._speeds = list(speeds)
+        self._vxrange = tuple(vxrange)
+        self._slots = len(self._speeds)
+        self._rng = random.Random(seed)
+        self._input = ActionInput()
+        size = 1+5*self._slots
+        if bricks:
+            size += BRICK_ROWS*BRICKS_IN_ROW
+        if out is None:
+            out = np.zeros(size)
+        assert out.shape == (size,), 'out must be a float array of size %d' % size
+        self._obs = out
+        self._game = None
+        self._ticks = 0
+        self._left = 0
+        self._done = True
+
+    def reset(self,seed=None):
+        """Returns: the observation of a new game, with its balls served.
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, the seed of the Play, or None to
+            take the next seed of _rng"""
+        if seed is None:
+            seed = self._rng.getrandbits(32)
+        self._game = Play(self._level,self._continuous,seed,self._speeds,self._vxrange)
+        self._game.serveBall()
+        self._ticks = 0
+        self._left = self._game.getBrickLength()
+        self._done = False
+        self._observe()
+        return self._obs
+
+    def step(self,action):
+        """Returns: the tuple (observation,reward,done,info) after one physics
+        tick with the given action.
+
+        The reward is the number of bricks broken in the tick.  The dictionary
+        info has the tries and bricks left ('tries', 'bricks'), the ticks
+        played ('ticks'), whether a try was lost in this tick ('lost'), and
+        whether the game was stopped at the tick limit ('truncated').
+
+        Parameter: action
+        Precondition: Must be an int, a position in ACTIONS, and the game must
+            not be over (call reset first)"""
+        assert not self._done, 'the game is over; call reset'
+        game = self._game
+        self._input.setAction(action)
+        game.updatePaddle(self._input)
+        game.updateBall()
+        lost = game.getStatus() == 'oops'
+        if lost:
+            game.setStatus(None)
+            if game.getTries() > 0:
+                game.serveBall()
+        self._ticks += 1
+        left = game.getBrickLength()
+        reward = self._left-left
+        self._left = left
+        tries = game.getTries()
+        truncated = self._ticks >= self._limit and left > 0 and tries > 0
+        self._done = left == 0 or tries == 0 or truncated
+        self._observe()
+        return (self._obs,reward,self._done,{'tries': tries, 'bricks': left,
+                                             'ticks': self._ticks, 'lost': lost,
+                                             'truncated': truncated})
+
+    def _observe(self):
+        """Helper method to write the state of _game into the observation."""
+        obs = self._obs
+        game = self._game
+        obs[0] = game.getPaddle().getX()
+        xs, ys = game.getBallPositions()
+        vxs, vys, speeds = game.getBallVelocities()
+        end = 1+5*self._slots
+        k = 1
+        # Plain floats and one write per entry are the fastest for so few balls
+        for (x,y,vx,vy,speed) in zip(xs.tolist(),ys.tolist(),vxs.tolist(),
+                                     vys.tolist(),speeds.tolist()):
+            if k == end:
+                break
+            obs[k] = 1.0
+            obs[k+1] = x
+            obs[k+2] = y
+            obs[k+3] = vx*speed
+            obs[k+4] = vy*speed
+            k += 5
+        if k < end:
+            obs[k:end] = 0.0
+        if self._bricks:
+            obs[1+5*self._slots:] = game.getField().getAliveMask()
+
+
+class VecEnv(object):
+    """An instance is many BreakoutEnvs, stepped together in worker processes.
+
+    Each worker owns a run of the environments.  Every array below is in
+    shared memory: the parent writes the actions, sends each worker the
+    command 'step', and the workers step their environments and write the
+    results in place (each environment writes its observations directly into
+    its row of _obs).  Pipes only carry the commands and the answers.
+
+    An environment whose game is over is reset at once: its row of _obs then
+    holds the first observation of the next game, and the last observation of
+    the game that ended is in its row of _final.
+
+    INSTANCE ATTRIBUTES:
+        _count    [int > 0]: the number of environments
+        _obs      [2D float array]: the observation of each environment
+        _final    [2D float array]: the last observation of each environment's
+                latest finished game
+        _rewards  [float array]: the reward of each environment in the last step
+        _dones    [bool array]: True for each environment whose game ended in
+                the last step
+        _truncated [bool array]: True for each environment whose game was
+                stopped at the tick limit in the last step, rather than over
+        _lost     [bool array]: True for each environment that lost a try in
+                the last step
+        _tries    [int array]: the tries left in each environment's game
+        _bricks   [int array]: the bricks left in each environment's game
+        _actions  [int array]: the action of each environment for the next step
+        _pipes    [list of Connections]: the parent end of each worker's pipe
+        _workers  [list of Processes]: the worker processes
+        _closed   [bool]: True once the workers have been stopped
+    """
+
+    def getCount(self):
+        return self._count
+    def getObservationSize(self):
+        return self._obs.shape[1]
+    def getActionCount(self):
+        return len(ACTIONS)
+
+    def __init__(self,count,level=1,seed=None,workers=None,limit=SIMULATION_TICK_LIMIT,
+                 bricks=False,continuous=CONTINUOUS_COLLISION,speeds=None,
+                 vxrange=(SERVE_VX_MIN,SERVE_VX_MAX)):
+        """Initializer to start the workers and make the environments; call
+        reset to start the games.
+
+        Parameter: count
+        Precondition: Must be an int > 0, the number of environments
+
+        Parameter: level
+        Precondition: Must be an int (either 1 or 2)
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, or None to pick one at random; the
+            environments get their own seeds from it
+
+        Parameter: workers
+        Precondition: Must be an int > 0, the number of worker processes, or
+            None for one per CPU (but no more than count)
+
+        Parameter: limit, bricks, continuous, speeds, vxrange
+        Precondition: Must be as in the initializer of BreakoutEnv"""
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        workers = max(min(workers,count),1)
+        size = BreakoutEnv(level,0,limit,bricks,continuous,speeds,
+                           vxrange).getObservationSize()
+        shared = {'obs': multiprocessing.RawArray('d',count*size),
+                  'final': multiprocessing.RawArray('d',count*size),
+                  'rewards': multiprocessing.RawArray('d',count),
+                  'dones': multiprocessing.RawArray('b',count),
+                  'truncated': multiprocessing.RawArray('b',count),
+                  'lost': multiprocessing.RawArray('b',count),
+                  'tries': multiprocessing.RawArray('i',count),
+                  'bricks': multiprocessing.RawArray('i',count),
+                  'actions': multiprocessing.RawArray('i',count)}
+        self._count = count
+        self._closed = False
+        self._obs, self._final, self._rewards, self._dones, self._truncated, \
+            self._lost, self._tries, self._bricks, self._actions = \
+            _sharedArrays(shared,count,size)
+        rng = random.Random(seed)
+        config = (level,limit,bricks,continuous,speeds,vxrange)
+        self._pipes = []
+        self._workers = []
+        for w in range(workers):
+            first = w*count//workers
+            last = (w+1)*count//workers
+            seeds = [rng.getrandbits(32) for k in range(first,last)]
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_work,
+                                             args=(child,shared,count,size,first,
+                                                   seeds,config))
+            worker.daemon = True
+            worker.start()
+            child.close()
+            self._pipes.append(parent)
+            self._workers.append(worker)
+
+    def reset(self,seeds=None):
+        """Returns: the array of the first observation of every environment,
+        after starting a new game in each.
+
+        The array is shared with the workers and overwritten by every step
+        (copy it to keep it).
+
+        Parameter: seeds
+        Precondition: Must be None, or a list of count ints >= 0, the seed of
+            each environment's game (by default each takes the next seed of
+            its own random numbers)"""
+        for w in range(len(self._pipes)):
+            self._pipes[w].send(('reset',seeds))
+        self._wait()
+        return self._obs
+
+    def step(self,actions):
+        """Returns: the tuple (observations,rewards,dones,info) after one tick
+        of every environment with the given actions.
+
+        These are arrays with one row per environment, shared with the workers
+        and overwritten by the next step (copy them to keep them).  The
+        dictionary info has the arrays of the tries and bricks left ('tries',
+        'bricks'), the last observation of the games that ended ('final'),
+        whether each game was stopped at the tick limit rather than over
+        ('truncated'), and whether each lost a try ('lost'), as in the info
+        of BreakoutEnv.step.
+
+        Parameter: actions
+        Precondition: Must be a list or array of count ints, positions in
+            ACTIONS"""
+        self._actions[:] = actions
+        for w in range(len(self._pipes)):
+            self._pipes[w].send(('step',None))
+        self._wait()
+        return (self._obs,self._rewards,self._dones,
+                {'tries': self._tries, 'bricks': self._bricks, 'final': self._final,
+                 'truncated': self._truncated, 'lost': self._lost})
+
+    def close(self):
+        """Stops the worker processes.  The environments cannot be used after."""
+        if self._closed:
+            return
+        self._closed = True
+        for pipe in self._pipes:
+            try:
+                pipe.send(('close',None))
+            except (IOError,OSError):
+                pass
+        for worker in self._workers:
+            worker.join()
+
+    def _wait(self):
+        """Helper method to wait for every worker to answer its command.
+
+        A worker that failed answers with its traceback, which is raised here
+        as a RuntimeError."""
+        errors = []
+        for pipe in self._pipes:
+            answer = pipe.recv()
+            if answer is not None:
+                errors.append(answer)
+        if len(errors) > 0:
+            raise RuntimeError('a VecEnv worker failed:\n'+errors[0])
+
+
+def _sharedArrays(shared,count,size):
+    """Returns: the NumPy arrays (obs,final,rewards,dones,truncated,lost,tries,
+    bricks,actions) over the shared memory of a VecEnv, without copying it.
+
+    Parameter: shared
+    Precondition: Must be the dictionary of RawArrays made by VecEnv
+
+    Parameter: count, size
+    Precondition: Must be ints > 0, the number of environments and the size of
+        an observation"""
+    return (np.frombuffer(shared['obs'],dtype=np.float64).reshape(count,size),
+            np.frombuffer(shared['final'],dtype=np.float64).reshape(count,size),
+            np.frombuffer(shared['rewards'],dtype=np.float64),
+            np.frombuffer(shared['dones'],dtype=np.int8).view(bool),
+            np.frombuffer(shared['truncated'],dtype=np.int8).view(bool),
+            np.frombuffer(shared['lost'],dtype=np.int8).view(bool),
+            np.frombuffer(shared['tries'],dtype=np.intc),
+            np.frombuffer(shared['bricks'],dtype=np.intc),
+            np.frombuffer(shared['actions'],dtype=np.intc))
+
+
+def _work(pipe,shared,count,size,first,seeds,config):
+    """The loop of a VecEnv worker process: it makes its environments and then
+    runs the commands from the pipe until 'close'.
+
+    Parameter: pipe
+    Precondition: Must be the worker's end of its pipe
+
+    Parameter: shared, count, size
+    Precondition: Must be as in _sharedArrays
+
+    Parameter: first
+    Precondition: Must be an int >= 0, the index of the worker's first
+        environment
+
+    Parameter: seeds
+    Precondition: Must be a list of ints >= 0, the seed of each of the
+        worker's environments (this also sets how many there are)
+
+    Parameter: config
+    Precondition: Must be the tuple (level,limit,bricks,continuous,speeds,vxrange)"""
+    obs, final, rewards, dones, truncated, lost, tries, bricks, actions = \
+        _sharedArrays(shared,count,size)
+    level, limit, withbricks, continuous, speeds, vxrange = config
+    last = first+len(seeds)
+    envs = [BreakoutEnv(level,seeds[k],limit,withbricks,continuous,speeds,
+                        vxrange,obs[first+k]) for k in range(len(seeds))]
+    while True:
+        command, data = pipe.recv()
+        if command == 'close':
+            break
+        try:
+            if command == 'reset':
+                for k in range(len(envs)):
+                    envs[k].reset(None if data is None else data[first+k])
+                    dones[first+k] = False
+                    truncated[first+k] = False
+                    lost[first+k] = False
+                    rewards[first+k] = 0.0
+                    tries[first+k] = envs[k].getGame().getTries()
+                    bricks[first+k] = envs[k].getGame().getBrickLength()
+            elif command == 'step':
+                mine = actions[first:last].tolist()
+                for k in range(len(envs)):
+                    env = envs[k]
+                    o, reward, done, info = env.step(mine[k])
+                    rewards[first+k] = reward
+                    dones[first+k] = done
+                    truncated[first+k] = info['truncated']
+                    lost[first+k] = info['lost']
+                    tries[first+k] = info['tries']
+                    bricks[first+k] = info['bricks']
+                    if done:
+                        final[first+k] = o
+                        env.reset()
+            pipe.send(None)
+        except Exception:
+            pipe.send(traceback.format_exc())
+    pipe.close()
@@ -11,148 +11,835 @@ class for it.  Unless you need something special, both paddle and individual bri
 just be instances of GRectangle.  However, we do need something special: collision 
 detection.  That is why we have custom classes.
 
+None of these classes draw themselves, and this module does not import game2d, so a
+game can be simulated without Kivy or a window.  The module sprites.py draws them.
+
 You are free to add new models to this module.  You may wish to do this when you add
 new features to your game.  If you are unsure about whether to make a new class or 
 not, please ask on Piazza."""
-import random # To randomly generate the ball velocity
+import math
+import numpy as np
 from constants import *
-from game2d import *
 
 
-class Paddle(GRectangle):
+#: a float larger than any coordinate, for open intervals
+INFINITY = float('inf')
+
+
+def circleRectContact(x,y,r,left,bottom,right,top):
+    """Returns: the contact of a circle with a rectangle as a tuple
+    (nx,ny,depth), or None if they do not overlap.
+
+    The value (nx,ny) is the outward normal of the face of the rectangle that
+    the circle is touching: one of them is -1 or 1 and the other is 0.  The
+    value depth > 0 is how far the circle must move along that normal to stop
+    overlapping.  When the circle touches a corner, the face is the one the
+    circle is more in front of.
+
+    This is the innermost test of the game, so it is closed form: it clamps
+    the center to the rectangle to get the closest point, and it builds
+    nothing but the result.
+
+    Parameter x, y: The center of the circle
+    Precondition: ints or floats
+
+    Parameter r: The radius of the circle
+    Precondition: int or float > 0
+
+    Parameter left, bottom, right, top: The edges of the rectangle
+    Precondition: ints or floats with left < right and bottom < top"""
+    dx = x-(left if x < left else right if x > right else x)
+    dy = y-(bottom if y < bottom else top if y > top else y)
+    d2 = dx*dx+dy*dy
+    if d2 >= r*r:
+        return None
+    if d2 == 0:
+        # The center is inside; push out through the nearest face
+        best = x-left
+        result = (-1,0,best+r)
+        if right-x < best:
+            best = right-x
+            result = (1,0,best+r)
+        if y-bottom < best:
+            best = y-bottom
+            result = (0,-1,best+r)
+        if top-y < best:
+            result = (0,1,top-y+r)
+        return result
+    depth = r-math.sqrt(d2)
+    if abs(dx) >= abs(dy):
+        return (1 if dx > 0 else -1,0,depth)
+    return (0,1 if dy > 0 else -1,depth)
+
+
+def circleRectContacts(x,y,r,left,bottom,right,top):
+    """Returns: the contacts of many circles with rectangles, as a tuple of
+    arrays (hit,nx,ny,depth).
+
+    This is circleRectContact for arrays of circles; entry k of the result is
+    for circle k (and rectangle k, if the rectangles are arrays too).  Where
+    hit[k] is True, nx[k], ny[k] and depth[k] are exactly what
+    circleRectContact returns; elsewhere they mean nothing.
+
+    Parameter x, y: The centers of the circles
+    Precondition: float arrays of the same length
+
+    Parameter r: The radius of every circle
+    Precondition: int or float > 0
+
+    Parameter left, bottom, right, top: The edges of the rectangles
+    Precondition: floats, or float arrays the same length as x"""
+    dx = x-np.minimum(np.maximum(x,left),right)
+    dy = y-np.minimum(np.maximum(y,bottom),top)
+    d2 = dx*dx+dy*dy
+    hit = d2 < r*r
+    depth = r-np.sqrt(d2)
+    xface = np.abs(dx) >= np.abs(dy)
+    nx = np.where(xface,np.where(dx > 0,1,-1),0)
+    ny = np.where(xface,0,np.where(dy > 0,1,-1))
+    inside = d2 == 0
+    if inside.any():
+        # Centers inside; push out through the nearest face (first on ties)
+        faces = np.array(np.broadcast_arrays(x-left,right-x,y-bottom,top-y))
+        k = np.argmin(faces,axis=0)
+        nx = np.where(inside,np.array([-1,1,0,0])[k],nx)
+        ny = np.where(inside,np.array([0,0,-1,1])[k],ny)
+        depth = np.where(inside,faces[k,np.arange(k.size)]+r,depth)
+    return (hit,nx,ny,depth)
+
+
+def bounceMany(x,y,vx,vy,balls,nx,ny,depth):
+    """Returns: the new arrays (x,y,vx,vy) after circles bounce off the faces
+    they are touching.
+
+    If a circle is moving into a face, its velocity across the face is negated
+    (vx for a side, vy for the top or bottom), but each velocity is negated at
+    most once however many faces there are.  The circle is pushed out by the
+    deepest contact along each axis (the first one, on ties), so it no longer
+    overlaps.  This is how the balls bounce in Play._bounce, for every ball
+    at once.
+
+    Parameter: x, y, vx, vy
+    Precondition: must be float arrays, the positions and velocities
+
+    Parameter: balls, nx, ny, depth
+    Precondition: must be arrays of the same length, one entry per contact,
+        giving the circle, the face normal and the depth; ordered by circle"""
+    if balls.size == 0:
+        return (x,y,vx,vy)
+    xface = nx != 0
+    flip = np.zeros(x.size,dtype=bool)
+    flip[balls[xface & (vx[balls]*nx < 0)]] = True
+    vx = np.where(flip,-vx,vx)
+    flip[:] = False
+    flip[balls[~xface & (vy[balls]*ny < 0)]] = True
+    vy = np.where(flip,-vy,vy)
+    x = x+_deepest(x.size,balls[xface],nx[xface],depth[xface])
+    y = y+_deepest(x.size,balls[~xface],ny[~xface],depth[~xface])
+    return (x,y,vx,vy)
+
+
+def _deepest(n,balls,normal,depth):
+    """Returns: array of n pushes, one per circle: the normal times the depth
+    of the deepest contact of that circle (the first, on ties), or 0 if none.
+    
+    Parameter: n
+    Precondition: must be an int >= 0, the number of circles
+    
+    Parameter: balls, normal, depth
+    Precondition: must be arrays of the same length, one entry per contact;
+        ordered by circle"""
+    push = np.zeros(n)
+    if balls.size > 0:
+        order = np.lexsort((np.arange(balls.size),-depth,balls))
+        first = order[np.unique(balls[order],return_index=True)[1]]
+        push[balls[first]] = normal[first]*depth[first]
+    return push
+
+
+def sweepCircleRect(x,y,dx,dy,r,left,bottom,right,top):
+    """Returns: the first impact of a moving circle with a rectangle as a tuple
+    (t,nx,ny), or None if the circle does not reach the rectangle.
+
+    The circle starts centered at (x,y) and moves by (dx,dy).  The value t is the
+    fraction of that move, between 0 and 1, at which the circle first touches the
+    rectangle.  The value (nx,ny) is the normal of the face that was hit: one of
+    them is -1 or 1 and the other is 0.  A hit on a corner counts as a hit on the
+    face the circle is more in front of.  Touches while moving away from the
+    rectangle, or while already overlapping it, are not impacts.
+
+    The circle against the rectangle is the same as the center point against
+    the rectangle grown by r with rounded corners.  We intersect the segment with
+    the grown (square cornered) rectangle first, and only solve against the
+    corner circle when the entry point is in a corner.
+
+    Parameter x, y: The starting center of the circle
+    Precondition: ints or floats
+
+    Parameter dx, dy: The motion of the circle
+    Precondition: ints or floats
+
+    Parameter r: The radius of the circle
+    Precondition: int or float > 0
+
+    Parameter left, bottom, right, top: The edges of the rectangle
+    Precondition: ints or floats with left < right and bottom < top"""
+    if dx != 0:
+        t1 = (left-r-x)/float(dx)
+        t2 = (right+r-x)/float(dx)
+        tx0 = min(t1,t2)
+        tx1 = max(t1,t2)
+    elif left-r < x < right+r:
+        tx0 = -INFINITY
+        tx1 = INFINITY
+    else:
+        return None
+    if dy != 0:
+        t1 = (bottom-r-y)/float(dy)
+        t2 = (top+r-y)/float(dy)
+        ty0 = min(t1,t2)
+        ty1 = max(t1,t2)
+    elif bottom-r < y < top+r:
+        ty0 = -INFINITY
+        ty1 = INFINITY
+    else:
+        return None
+    t = max(tx0,ty0)
+    if t < 0 or t > 1 or t >= min(tx1,ty1):
+        return None
+    px = x+dx*t
+    py = y+dy*t
+    if tx0 > ty0:
+        if bottom <= py <= top:
+            return (t,-1 if dx > 0 else 1,0)
+    elif left <= px <= right:
+        return (t,0,-1 if dy > 0 else 1)
+    # The entry point is in a corner; solve against the corner circle
+    cx = left if px < left else right
+    cy = bottom if py < bottom else top
+    ox = x-cx
+    oy = y-cy
+    a = dx*dx+dy*dy
+    b = ox*dx+oy*dy
+    disc = b*b-a*(ox*ox+oy*oy-r*r)
+    if disc < 0:
+        return None
+    t = (-b-math.sqrt(disc))/a
+    if t < 0 or t > 1:
+        return None
+    nx = ox+dx*t
+    ny = oy+dy*t
+    if abs(nx) >= abs(ny):
+        return (t,1 if nx > 0 else -1,0)
+    return (t,0,1 if ny > 0 else -1)
+
+
+def _layout(rows,columns):
+    """Returns: the layout of a wall of bricks as the tuple
+    (cellw,cellh,origin,left,bottom,right,top).
+
+    The wall is a grid of cells cellw wide and cellh high, whose top edge is
+    at y = origin, and each brick sits inside its own cell.  The values left,
+    bottom, right and top are float arrays of the edges of the bricks, with
+    brick i in row i//columns (counted from the top) and column i%columns.
+
+    Parameter: rows
+    Precondition: int > 0
+
+    Parameter: columns
+    Precondition: int > 0"""
+    cellw = float(max(BRICK_WIDTH+BRICK_SEP_H,1))
+    cellh = float(BRICK_HEIGHT+BRICK_SEP_V)
+    origin = GAME_HEIGHT-BRICK_Y_OFFSET+BRICK_SEP_V/2.0
+    row = np.repeat(np.arange(rows),columns)
+    column = np.tile(np.arange(columns),rows)
+    left = BRICK_SEP_H/2.0 + column*cellw
+    top = GAME_HEIGHT-BRICK_Y_OFFSET - row*cellh
+    return (cellw,cellh,origin,left,top-BRICK_HEIGHT,left+BRICK_WIDTH,top)
+
+
+class Paddle(object):
     """An instance is the game paddle.
     
     This class contains a method to detect collision with the ball.
     
-    The attributes of this class are those inherited from GRectangle.
+    A Paddle does not draw itself, so that a game can run without game2d
+    (see PlaySprites in sprites.py for how it is drawn).
+    
+    INSTANCE ATTRIBUTES:
+        _x [int or float]: x coordinate of the center of the paddle
+        _y [int or float]: y coordinate of the center of the paddle
+        _width  [float > 0]: the width of the paddle, PADDLE_WIDTH
+        _height [float > 0]: the height of the paddle, PADDLE_HEIGHT
     """
     
     def getX(self):
-        return self.x
+        return self._x
     def getY(self):
-        return self.y
+        return self._y
     def setX(self,new):
-        self.x = new
+        self._x = new
+    def getWidth(self):
+        return self._width
+    def getHeight(self):
+        return self._height
+    def getTop(self):
+        return self._y+self._height/2.0
+    def getBottom(self):
+        return self._y-self._height/2.0
+    def getLeft(self):
+        return self._x-self._width/2.0
+    def getRight(self):
+        return self._x+self._width/2.0
+    def getEdges(self):
+        """Returns: the edges (left,bottom,right,top) of the paddle; this is
+        one call instead of four, for the collision tests."""
+        halfw = self._width/2.0
+        halfh = self._height/2.0
+        return (self._x-halfw,self._y-halfh,self._x+halfw,self._y+halfh)
     
     def __init__(self,xpoint):
         """Initializer to create a new Paddle"""
-        color = colormodel.BLACK
-        GRectangle.__init__(self,x=xpoint,y=PADDLE_OFFSET+PADDLE_HEIGHT/2.0,linecolor=color,
-                            fillcolor=color, width=PADDLE_WIDTH,height=PADDLE_HEIGHT)
+        self._x = xpoint
+        self._y = PADDLE_OFFSET+PADDLE_HEIGHT/2.0
+        self._width = PADDLE_WIDTH
+        self._height = PADDLE_HEIGHT
   
     def collides(self,ball):
-        """Returns: True if the ball collides with this paddle
+        """Returns: the contact (nx,ny,depth) of the ball with this paddle,
+        or None if they do not touch. See circleRectContact.
         
         Parameter ball: The ball to check
         Precondition: ball is of class Ball"""
-        r = ball.getWidth()/2.0
-        x = ball.getX()
-        y = ball.getY()
-        tl = [x-r,y+r]
-        tr = [x+r,y+r]
-        bl = [x-r,y-r]
-        br = [x+r,y-r]
-        list = [tl,tr,bl,br]
-        if ball.getyvel() <0:
-            for c in list:
-                if self.contains(c[0],c[1]):
-                    return True
-                else:
-                    return False
+        left, bottom, right, top = self.getEdges()
+        return circleRectContact(ball.getX(),ball.getY(),ball.getWidth()/2.0,
+                                 left,bottom,right,top)
+
+
+class BrickField(object):
+    """An instance is the whole wall of bricks.
+
+    Rather than keeping one GRectangle per brick, the field stores the bricks as
+    parallel NumPy arrays, one entry per brick.  Brick i is in row i//columns
+    (counted from the top) and column i%columns.  The field is laid out as a
+    uniform grid whose cells are one brick plus its separation, and each brick
+    sits inside its own cell.  Finding the bricks near a ball is therefore
+    arithmetic on the cell size followed by one vectorized comparison over the
+    few bricks in those cells.
+
+    The field does not draw itself; sprites.py makes a Brick for each brick
+    it draws, from getEdges and getColor.
+
+    INSTANCE ATTRIBUTES:
+        _rows    [int > 0]: the number of rows of bricks
+        _columns [int > 0]: the number of bricks in each row
+        _cellw   [float > 0]: width of a grid cell, BRICK_WIDTH+BRICK_SEP_H
+        _cellh   [float > 0]: height of a grid cell, BRICK_HEIGHT+BRICK_SEP_V
+        _origin  [float]: y coordinate of the top edge of the first row of cells
+        _left    [float array]: left edge of each brick
+        _right   [float array]: right edge of each brick
+        _top     [float array]: top edge of each brick
+        _bottom  [float array]: bottom edge of each brick
+        _color   [int array]: position of each brick's color in BRICK_COLORS
+        _alive   [bool array]: True for each brick that has not been hit
+        _remaining [int >= 0]: the number of True values in _alive
+        _live    [int array]: the indices of the bricks still alive, plus up to
+                _stale indices of bricks destroyed since it was last compacted
+        _stale   [int >= 0]: the number of destroyed bricks still in _live
+        _rowCount [list of ints]: the number of bricks still alive in each row
+        _colCount [list of ints]: the number of bricks still alive in each column
+        _rmin, _rmax [ints]: the first and last rows with a brick still alive
+        _cmin, _cmax [ints]: the first and last columns with a brick still alive
+                (when no bricks are left, _rmin > _rmax and _cmin > _cmax)
+
+    The rows and columns between _rmin.._rmax and _cmin.._cmax make up the
+    bounding box of the remaining bricks. Every search is clipped to it and
+    skips empty rows, so a ball away from the remaining bricks costs almost
+    nothing.
+    """
+
+    def getRows(self):
+        return self._rows
+    def getColumns(self):
+        return self._columns
+    def getCount(self):
+        return self._alive.size
+    def getAliveCount(self):
+        return self._remaining
+    def isAlive(self,i):
+        return bool(self._alive[i])
+    def getAliveMask(self):
+        """Returns: the bool array of which bricks are still alive, one entry
+        per brick.  It is the field's own array, so it must not be changed."""
+        return self._alive
+    def getEdges(self,i):
+        """Returns: the edges (left,bottom,right,top) of brick i."""
+        return (self._left.item(i),self._bottom.item(i),
+                self._right.item(i),self._top.item(i))
+    def getColor(self,i):
+        """Returns: the color of brick i, one of BRICK_COLORS."""
+        return BRICK_COLORS[self._color.item(i)]
+    def getBounds(self):
+        """Returns: the bounding box (left,bottom,right,top) of the bricks still
+        alive, or None if there are none."""
+        if self._remaining == 0:
+            return None
+        top = GAME_HEIGHT-BRICK_Y_OFFSET - self._rmin*self._cellh
+        left = BRICK_SEP_H/2.0 + self._cmin*self._cellw
+        return (left,GAME_HEIGHT-BRICK_Y_OFFSET - self._rmax*self._cellh - BRICK_HEIGHT,
+                BRICK_SEP_H/2.0 + self._cmax*self._cellw + BRICK_WIDTH,top)
+
+    def __init__(self,rows,columns):
+        """Initializer to lay out a full wall of bricks.
+
+        Parameter: rows
+        Precondition: int > 0
+
+        Parameter: columns
+        Precondition: int > 0"""
+        self._rows = rows
+        self._columns = columns
+        (self._cellw,self._cellh,self._origin,
+         self._left,self._bottom,self._right,self._top) = _layout(rows,columns)
+        self._color = (np.repeat(np.arange(rows),columns)%len(BRICK_COLORS)).astype(np.int8)
+        self._alive = np.ones(rows*columns,dtype=bool)
+        self._remaining = rows*columns
+        self._live = np.arange(rows*columns)
+        self._stale = 0
+        self._rowCount = [columns]*rows
+        self._colCount = [rows]*columns
+        self._rmin = 0
+        self._rmax = rows-1
+        self._cmin = 0
+        self._cmax = columns-1
+
+    def findHits(self,left,bottom,right,top):
+        """Returns: array of the indices of the bricks still alive that
+        overlap the given box.
+
+        Only the cells under the box and inside the bounding box of the
+        remaining bricks are examined.
+
+        Parameter left, bottom, right, top: The edges of the box
+        Precondition: ints or floats with left <= right and bottom <= top"""
+        c0 = max(int(math.floor(left/self._cellw)),self._cmin)
+        c1 = min(int(math.floor(right/self._cellw)),self._cmax)
+        r0 = max(int(math.floor((self._origin-top)/self._cellh)),self._rmin)
+        r1 = min(int(math.floor((self._origin-bottom)/self._cellh)),self._rmax)
+        if c0 > c1 or r0 > r1:
+            return np.zeros(0,dtype=int)
+        ids = (np.arange(r0,r1+1)[:,np.newaxis]*self._columns
+               + np.arange(c0,c1+1)).ravel()
+        hit = (self._alive[ids] & (self._left[ids] < right) & (self._right[ids] > left)
+               & (self._bottom[ids] < top) & (self._top[ids] > bottom))
+        return ids[hit]
+
+    def findContacts(self,x,y,r):
+        """Returns: list of the contacts of a circle with the bricks still
+        alive, each a tuple (i,nx,ny,depth) where i is the index of the brick
+        and the rest is as in circleRectContact.  The list is ordered by i.
+
+        Only the bricks in the cells under the box around the circle, inside
+        the bounding box of the remaining bricks and in rows that still have
+        bricks are tested.  This is the version for one circle; it works on plain
+        floats, since NumPy only pays off for many circles at once (see
+        findContactsMany, which gives the same contacts).
+
+        Parameter x, y: The center of the circle
+        Precondition: ints or floats
+
+        Parameter r: The radius of the circle
+        Precondition: int or float > 0"""
+        result = []
+        r0 = max(int(math.floor((self._origin-(y+r))/self._cellh)),self._rmin)
+        r1 = min(int(math.floor((self._origin-(y-r))/self._cellh)),self._rmax)
+        if r0 > r1:
+            return result
+        c0 = max(int(math.floor((x-r)/self._cellw)),self._cmin)
+        c1 = min(int(math.floor((x+r)/self._cellw)),self._cmax)
+        if c0 > c1:
+            return result
+        for row in range(r0,r1+1):
+            if self._rowCount[row] == 0:
+                continue
+            for i in range(row*self._columns+c0,row*self._columns+c1+1):
+                if self._alive[i]:
+                    contact = circleRectContact(x,y,r,self._left.item(i),
+                                                self._bottom.item(i),
+                                                self._right.item(i),self._top.item(i))
+                    if contact is not None:
+                        result.append((i,)+contact)
+        return result
+
+    def findContactsMany(self,x,y,r):
+        """Returns: the contacts of many circles with the bricks still alive,
+        as a tuple of arrays (balls,ids,nx,ny,depth).
+
+        Entry k says that circle balls[k] touches brick ids[k], with the
+        normal and depth as in circleRectContact.  The entries are ordered
+        by circle and then by brick, so for each circle they are the same, in
+        the same order, as findContacts gives.
+
+        Circles away from the bounding box of the remaining bricks are
+        dropped first.  Every other circle can only overlap a fixed number of
+        cells (it depends on r and the cell size), so the cells are looked up
+        for all of them at once, and the candidates are tested with
+        circleRectContacts.
+
+        Parameter x, y: The centers of the circles
+        Precondition: float arrays of the same length
+
+        Parameter r: The radius of every circle
+        Precondition: int or float > 0"""
+        bounds = self.getBounds()
+        if bounds is None:
+            near = np.zeros(0,dtype=int)
         else:
+            near = np.flatnonzero((x+r > bounds[0]) & (y+r > bounds[1])
+                                  & (x-r < bounds[2]) & (y-r < bounds[3]))
+        if near.size == 0:
+            empty = np.zeros(0,dtype=int)
+            return (empty,empty,empty,empty,np.zeros(0))
+        x = x[near]
+        y = y[near]
+        c0 = np.floor((x-r)/self._cellw).astype(int)
+        r0 = np.floor((self._origin-(y+r))/self._cellh).astype(int)
+        column = c0[:,np.newaxis,np.newaxis] + np.arange(int(2*r/self._cellw)+2)
+        row = (r0[:,np.newaxis,np.newaxis]
+               + np.arange(int(2*r/self._cellh)+2)[:,np.newaxis])
+        ok = ((column >= self._cmin) & (column <= self._cmax)
+              & (row >= self._rmin) & (row <= self._rmax))
+        ids = np.where(ok,row*self._columns+column,0)
+        ok &= self._alive[ids]
+        balls,k = np.nonzero(ok.reshape(x.size,-1))
+        ids = ids.reshape(x.size,-1)[balls,k]
+        hit,nx,ny,depth = circleRectContacts(x[balls],y[balls],r,self._left[ids],
+                                             self._bottom[ids],self._right[ids],
+                                             self._top[ids])
+        return (near[balls[hit]],ids[hit],nx[hit],ny[hit],depth[hit])
+
+    def sweep(self,x,y,dx,dy,r,ignore=None):
+        """Returns: the first brick hit by a moving circle as a tuple
+        (t,nx,ny,i), or None if no brick still alive is hit.
+
+        The values t, nx and ny are as in the function sweepCircleRect, and
+        i is the index of the brick.  The rows of the bounding box are walked
+        in the order the circle reaches them.  In each row, only the cells
+        under the part of the move that is level with the row (grown by r)
+        are tried, so a long move costs about as much as a short one.  A row
+        that the circle reaches no earlier than the best impact found so far
+        cannot hold an earlier one, so the walk stops there.
+
+        Parameter x, y: The starting center of the circle
+        Precondition: ints or floats
+
+        Parameter dx, dy: The motion of the circle
+        Precondition: ints or floats
+
+        Parameter r: The radius of the circle
+        Precondition: int or float > 0
+
+        Parameter ignore: Bricks to treat as destroyed, although they are alive
+        Precondition: None, or a set of brick indices"""
+        if self._remaining == 0:
+            return None
+        rows = range(self._rmin,self._rmax+1)
+        if dy > 0:
+            rows = reversed(rows)
+        best = None
+        for row in rows:
+            if self._rowCount[row] == 0:
+                continue
+            first = row*self._columns
+            bottom = self._bottom.item(first)-r
+            top = self._top.item(first)+r
+            if dy != 0:
+                t0 = (bottom-y)/float(dy)
+                t1 = (top-y)/float(dy)
+                if t0 > t1:
+                    t0, t1 = t1, t0
+            elif bottom < y < top:
+                t0 = 0.0
+                t1 = 1.0
+            else:
+                continue
+            if t0 > 1 or (best is not None and t0 >= best[0]):
+                break
+            if t1 < 0:
+                continue
+            xa = x+dx*max(t0,0.0)
+            xb = x+dx*min(t1,1.0)
+            c0 = max(int(math.floor((min(xa,xb)-r)/self._cellw)),self._cmin)
+            c1 = min(int(math.floor((max(xa,xb)+r)/self._cellw)),self._cmax)
+            for i in range(first+c0,first+c1+1):
+                if not self._alive.item(i) or (ignore is not None and i in ignore):
+                    continue
+                hit = sweepCircleRect(x,y,dx,dy,r,self._left.item(i),self._bottom.item(i),
+                                      self._right.item(i),self._top.item(i))
+                if hit is not None and (best is None or hit[0] < best[0]):
+                    best = (hit[0],hit[1],hit[2],i)
+        return best
+
+    def kill(self,i):
+        """Destroys brick i so that it is no longer hit or drawn.
+
+        Returns: True if the brick was alive, False if it was already destroyed
+        (for example by another ball in the same frame).
+
+        This only clears the alive flag and updates the counters, so it takes
+        constant time (the bounding box only shrinks, unless bricks are
+        revived, so moving its edges adds up to at most the number of rows
+        and columns over the game, plus that again for each revive).
+        The brick is dropped from _live later, in getLiveIds.
+
+        Parameter i: The brick to destroy
+        Precondition: i is an int, the index of a brick"""
+        if not self._alive[i]:
             return False
+        self._alive[i] = False
+        self._remaining -= 1
+        self._stale += 1
+        self._rowCount[i//self._columns] -= 1
+        self._colCount[i%self._columns] -= 1
+        while self._rmin <= self._rmax and self._rowCount[self._rmin] == 0:
+            self._rmin += 1
+        while self._rmax >= self._rmin and self._rowCount[self._rmax] == 0:
+            self._rmax -= 1
+        while self._cmin <= self._cmax and self._colCount[self._cmin] == 0:
+            self._cmin += 1
+        while self._cmax >= self._cmin and self._colCount[self._cmax] == 0:
+            self._cmax -= 1
+        return True
 
+    def revive(self,i):
+        """Brings brick i back, for example when the other player of a match
+        breaks bricks (see netplay.py).
 
-class Brick(GRectangle):
-    """An instance is a single brick.
-    
-    This class contains a method to detect collision with the ball.
-    
-    The attributes of this class are those inherited from GRectangle.
-    
-    Attribute:
-    _collision_status: True if there has been a collision, False otherwise
+        Returns: True if the brick was destroyed, False if it was alive.
+
+        The counters and bounding box grow to take it in, and _live is built
+        again, since it must hold the brick.
+
+        Parameter i: The brick to bring back
+        Precondition: i is an int, the index of a brick"""
+        if self._alive[i]:
+            return False
+        self._alive[i] = True
+        self._remaining += 1
+        row = i//self._columns
+        column = i%self._columns
+        self._rowCount[row] += 1
+        self._colCount[column] += 1
+        if self._remaining == 1:
+            (self._rmin,self._rmax,self._cmin,self._cmax) = (row,row,column,column)
+        else:
+            self._rmin = min(self._rmin,row)
+            self._rmax = max(self._rmax,row)
+            self._cmin = min(self._cmin,column)
+            self._cmax = max(self._cmax,column)
+        self._live = np.flatnonzero(self._alive)
+        self._stale = 0
+        return True
+
+    def setAliveMask(self,alive):
+        """Sets which bricks are alive, for example to restore a snapshot of a
+        game (see Play.restore).  Unlike kill, this can bring bricks back.
+
+        The counters, bounding box and _live are worked out again from alive,
+        which is a few vectorized passes over the bricks, unless the same
+        bricks are alive already.
+
+        Parameter alive: which bricks are alive
+        Precondition: alive is a bool array with one entry per brick"""
+        if np.array_equal(alive,self._alive):
+            return
+        self._alive = np.array(alive,dtype=bool)
+        grid = self._alive.reshape(self._rows,self._columns)
+        self._remaining = int(np.count_nonzero(self._alive))
+        self._live = np.flatnonzero(self._alive)
+        self._stale = 0
+        self._rowCount = grid.sum(axis=1).tolist()
+        self._colCount = grid.sum(axis=0).tolist()
+        rows = np.flatnonzero(grid.any(axis=1))
+        columns = np.flatnonzero(grid.any(axis=0))
+        if rows.size == 0:
+            (self._rmin,self._rmax,self._cmin,self._cmax) = (0,-1,0,-1)
+        else:
+            (self._rmin,self._rmax) = (int(rows[0]),int(rows[-1]))
+            (self._cmin,self._cmax) = (int(columns[0]),int(columns[-1]))
+
+    def getLiveIds(self):
+        """Returns: array of the indices of the bricks still alive.
+
+        The array is only rebuilt once a quarter of it is destroyed bricks, so
+        the cost is spread over the kills.  Until then it may still hold some
+        destroyed bricks, so callers must check isAlive."""
+        if self._stale*4 > self._live.size:
+            self._live = self._live[self._alive[self._live]]
+            self._stale = 0
+        return self._live
+
+
+class BrickFieldBatch(object):
+    """An instance is the walls of bricks of many games at once.
+
+    Every game has the same layout as a BrickField of the same size, and a
+    brick has the same index in every game, so the layout is kept once and
+    only which bricks are still alive is kept per game, as a row of a 2D
+    array.  The searches take arrays of balls, each with the game it is in,
+    and look up all of them at once.
+
+    INSTANCE ATTRIBUTES:
+        _games   [int > 0]: the number of games
+        _rows    [int > 0]: the number of rows of bricks
+        _columns [int > 0]: the number of bricks in each row
+        _cellw, _cellh, _origin [floats]: the grid, as in BrickField
+        _left, _bottom, _right, _top [float arrays]: the edges of each brick
+        _alive   [2D bool array]: _alive[g,i] is True if brick i of game g has
+                not been hit
+        _remaining [int array]: the number of bricks still alive in each game
+        _rowCount [2D int array]: the number of bricks still alive in each row
+                of each game
+        _lowest  [int array]: the last row of each game with a brick still
+                alive, or -1 if there are none
     """
-    
-    def getCollisionStatus(self):
-        return self._collision_status
 
-    def __init__(self,top,left,alinecolor,afillcolor):
-        """Initializer to create a new Brick.
-        
-        Parameter: top
-        Precondition: int or float 
-        
-        Parameter: left
-        Precondition: int or float
-        
-        Parameter: alinecolor
-        Precondition: must be a color from colormodel and the same
-            as 'afillcolor'
-        
-        Parameter: afillcolor
-        Precondition: must be a color from colormodel and the same
-            as 'alinecolor'"""
-        assert alinecolor == afillcolor
-        xpoint = left+BRICK_WIDTH/2.0
-        ypoint = top-BRICK_HEIGHT/2.0
-        GRectangle.__init__(self,x=xpoint,y=ypoint,linecolor=alinecolor,fillcolor=afillcolor,
-                            width=BRICK_WIDTH,height=BRICK_HEIGHT)
-        self._collision_status = False
-    
-    def brickCollides(self,ball):
-        """Returns: True if the ball collides with this brick
-        
-        Parameter ball: The ball to check
-        Precondition: ball is of class Ball"""
-        r = ball.getWidth()/2.0
-        x = ball.getX()
-        y = ball.getY()
-        tl = [x-r,y+r]
-        tr = [x+r,y+r]
-        bl = [x-r,y-r]
-        br = [x+r,y-r]
-        list = [tl,tr,bl,br]
-        for c in list:
-            if self.contains(c[0],c[1]):
-                return True
-            else:
-                return False
+    def getGames(self):
+        return self._games
+    def getCount(self):
+        return self._alive.shape[1]
+    def getAliveCounts(self):
+        """Returns: array of the number of bricks still alive in each game.
+        It is the field's own array, so it must not be changed."""
+        return self._remaining
+    def isAlive(self,g,i):
+        return bool(self._alive[g,i])
+
+    def __init__(self,games,rows,columns):
+        """Initializer to lay out a full wall of bricks for every game.
+
+        Parameter: games
+        Precondition: int > 0
 
+        Parameter: rows
+        Precondition: int > 0
 
-class Ball(GEllipse):
+        Parameter: columns
+        Precondition: int > 0"""
+        self._games = games
+        self._rows = rows
+        self._columns = columns
+        (self._cellw,self._cellh,self._origin,
+         self._left,self._bottom,self._right,self._top) = _layout(rows,columns)
+        self._alive = np.ones((games,rows*columns),dtype=bool)
+        self._remaining = np.zeros(games,dtype=int)+rows*columns
+        self._rowCount = np.zeros((games,rows),dtype=int)+columns
+        self._lowest = np.zeros(games,dtype=int)+rows-1
+
+    def findContactsMany(self,games,x,y,r):
+        """Returns: the contacts of many circles with the bricks still alive
+        in their games, as a tuple of arrays (balls,ids,nx,ny,depth).
+
+        This is BrickField.findContactsMany, with each circle in its own game:
+        entry k says that circle balls[k] touches brick ids[k] of its game,
+        and for each circle the entries are exactly those (in the same order)
+        that a BrickField with the same bricks alive gives.  Circles below the
+        lowest row with a brick alive in their game are dropped first.
+
+        Parameter games: The game of each circle
+        Precondition: int array with the same length as x
+
+        Parameter x, y: The centers of the circles
+        Precondition: float arrays of the same length
+
+        Parameter r: The radius of every circle
+        Precondition: int or float > 0"""
+        lowest = self._lowest[games]
+        near = np.flatnonzero((lowest >= 0) &
+                              (y+r > GAME_HEIGHT-BRICK_Y_OFFSET-lowest*self._cellh-BRICK_HEIGHT))
+        if near.size == 0:
+            empty = np.zeros(0,dtype=int)
+            return (empty,empty,empty,empty,np.zeros(0))
+        x = x[near]
+        y = y[near]
+        c0 = np.floor((x-r)/self._cellw).astype(int)
+        r0 = np.floor((self._origin-(y+r))/self._cellh).astype(int)
+        column = c0[:,np.newaxis,np.newaxis] + np.arange(int(2*r/self._cellw)+2)
+        row = (r0[:,np.newaxis,np.newaxis]
+               + np.arange(int(2*r/self._cellh)+2)[:,np.newaxis])
+        ok = ((column >= 0) & (column < self._columns) & (row >= 0) & (row < self._rows))
+        ids = np.where(ok,row*self._columns+column,0)
+        ok &= self._alive.ravel()[(games[near]*self._alive.shape[1])[:,np.newaxis,np.newaxis]+ids]
+        balls,k = np.nonzero(ok.reshape(x.size,-1))
+        ids = ids.reshape(x.size,-1)[balls,k]
+        hit,nx,ny,depth = circleRectContacts(x[balls],y[balls],r,self._left[ids],
+                                             self._bottom[ids],self._right[ids],
+                                             self._top[ids])
+        return (near[balls[hit]],ids[hit],nx[hit],ny[hit],depth[hit])
+
+    def killMany(self,games,ids):
+        """Destroys brick ids[k] of game games[k], for every k.
+
+        A brick may be listed more than once, or be destroyed already; it is
+        only counted once.
+
+        Parameter games: The game of each brick
+        Precondition: int array
+
+        Parameter ids: The bricks to destroy
+        Precondition: int array with the same length as games"""
+        if ids.size == 0:
+            return
+        flat = np.unique(games*self._alive.shape[1]+ids)
+        flat = flat[self._alive.ravel()[flat]]
+        if flat.size == 0:
+            return
+        self._alive.ravel()[flat] = False
+        games = flat // self._alive.shape[1]
+        np.subtract.at(self._remaining,games,1)
+        np.subtract.at(self._rowCount,(games,(flat%self._alive.shape[1])//self._columns),1)
+        changed = np.unique(games)
+        filled = self._rowCount[changed] > 0
+        self._lowest[changed] = np.where(filled.any(axis=1),
+                                         self._rows-1-np.argmax(filled[:,::-1],axis=1),-1)
+
+
+class Ball(object):
     """Instance is a game ball.
     
-    We extend GEllipse because a ball must have additional attributes for velocity.
-    This class adds this attributes and manages them.
+    A ball has a position and size like the paddle, and additional attributes
+    for velocity.  This class adds this attributes and manages them.  Like the
+    Paddle, it does not draw itself.
     
     INSTANCE ATTRIBUTES:
+        _x [int or float]: x coordinate of the center of the ball
+        _y [int or float]: y coordinate of the center of the ball
+        _width [float > 0]: the diameter of the ball, BALL_DIAMETER
         _vx [int or float]: Velocity in x direction 
         _vy [int or float]: Velocity in y direction
    
-        _checkOther [string, either 'yes' or 'no']:
-                used in Level 2 when there are two balls. If one of the balls goes
-                offscreen, but the other remains, they are turned to 'yes'.
-                Initially set to 'no'.
+        _speed [float > 0]: speed multiplier; each frame the ball moves by its
+                velocity times _speed. Used in Level 2 so that the balls are
+                served slower, and sped up when another ball goes offscreen.
     """
     
     def getX(self):
-        return self.x
+        return self._x
     def getY(self):
-        return self.y
+        return self._y
     def setX(self,new):
-        self.x = new
+        self._x = new
     def setY(self,new):
-        self.y = new
+        self._y = new
         
     def getTop(self):
-        return self.top
+        return self._y+self._width/2.0
     def getBottom(self):
-        return self.bottom
+        return self._y-self._width/2.0
     def getLeft(self):
-        return self.left
+        return self._x-self._width/2.0
     def getRight(self):
-        return self.right
+        return self._x+self._width/2.0
     
     def getxvel(self):
         return self._vx
@@ -163,22 +850,35 @@ class Ball(GEllipse):
     def setyvel(self,new):
         self._vy = new
         
-    def getCheck(self):
-        return self._checkOther
-    def setCheck(self,new):
-        self._checkOther = new
+    def getSpeed(self):
+        return self._speed
+    def setSpeed(self,new):
+        self._speed = new
         
     def getWidth(self):
-        return self.width
+        return self._width
 
-    def __init__(self):
-        """Initializer to set random velocity."""
-        color = colormodel.BLACK
-        GEllipse.__init__(self,x=GAME_WIDTH/2,y=GAME_HEIGHT/2,width=BALL_DIAMETER,
-                          height=BALL_DIAMETER,fillcolor=color,linecolor=color)
+    def __init__(self,rng,speed=1.0,vxmin=SERVE_VX_MIN,vxmax=SERVE_VX_MAX):
+        """Initializer to set random velocity.
+        
+        The velocity is drawn from rng rather than the random module, so that
+        a game seeded the same way serves the same balls.
+        
+        Parameter: rng
+        Precondition: a random.Random (or an object with the same methods)
+        
+        Parameter: speed
+        Precondition: float > 0, the speed multiplier of the ball
+        
+        Parameter: vxmin, vxmax
+        Precondition: floats with 0 <= vxmin <= vxmax, the range of the
+            horizontal speed"""
+        self._x = GAME_WIDTH/2
+        self._y = GAME_HEIGHT/2
+        self._width = BALL_DIAMETER
        
-        self._vx = random.uniform(1.0,5.0) 
-        self._vx = self._vx * random.choice([-1, 1])
+        self._vx = rng.uniform(vxmin,vxmax) 
+        self._vx = self._vx * rng.choice([-1, 1])
         self._vy = -5.0
-        self._checkOther = 'no'
+        self._speed = speed
     
@@ -0,0 +1,357 @@
+# montecarlo.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Monte Carlo runner for Breakout
+
+This module plays many seeded headless games (see simulate.py) for each of several
+serve settings, and reports how often the games are cleared, how fast balls are lost
+and how long the games last, with confidence intervals.  It is for balance studies:
+the horizontal serve speed is drawn from [SERVE_VX_MIN,SERVE_VX_MAX], and the balls
+of a level are served at the speeds in SERVE_SPEEDS, so those are the settings that
+can be varied.  For example
+
+    python montecarlo.py --games 5000 --level 2 --vx-max 3 4 5 --speed-scale 0.8 1
+
+plays 5000 games for each of the 6 combinations of the largest serve speed and a
+factor on the level's serve speeds.  Every setting plays the same seeds, so the
+settings are compared on the same serves.
+
+The games are spread over a pool of processes in chunks, and each chunk is added to
+the statistics as soon as it is done, in whatever order they finish.  Only running
+sums are kept (see RunningStats and Histogram), never the record of every game."""
+from __future__ import print_function
+import argparse
+import itertools
+import math
+import multiprocessing
+import random
+from timeit import default_timer as clock
+from constants import *
+from simulate import playGame, playBatch, CONTROLLERS, BATCH_CONTROLLERS
+
+
+#: the z value of every confidence interval (95%)
+CONFIDENCE_Z = 1.96
+#: the number of bins of the histogram of game lengths
+HISTOGRAM_BINS = 12
+#: the most '#' in one bar of a printed histogram
+HISTOGRAM_WIDTH = 40
+
+
+def wilson(successes,n,z=CONFIDENCE_Z):
+    """Returns: the Wilson score interval (low,high) of a proportion.
+
+    Unlike the usual interval p +- z*sqrt(p(1-p)/n), this one stays inside
+    [0,1] and is still good when p is near 0 or 1, as a clear rate can be.
+
+    Parameter: successes
+    Precondition: Must be an int with 0 <= successes <= n
+
+    Parameter: n
+    Precondition: Must be an int >= 0, the number of trials
+
+    Parameter: z
+    Precondition: Must be a float > 0"""
+    if n == 0:
+        return (0.0,1.0)
+    p = successes/float(n)
+    denominator = 1+z*z/n
+    center = (p+z*z/(2.0*n))/denominator
+    spread = z*math.sqrt(p*(1-p)/n+z*z/(4.0*n*n))/denominator
+    return (max(center-spread,0.0),min(center+spread,1.0))
+
+
+class RunningStats(object):
+    """An instance is the running mean and variance of a stream of numbers.
+
+    It uses Welford's method: each number updates the mean and the sum of
+    squared differences from it, which is exact enough even for millions of
+    numbers, and the numbers themselves are not kept.
+
+    INSTANCE ATTRIBUTES:
+        _count [int >= 0]: how many numbers have been added
+        _mean  [float]: their mean, 0 if there are none
+        _m2    [float >= 0]: the sum of their squared differences from _mean
+    """
+
+    def getCount(self):
+        return self._count
+    def getMean(self):
+        return self._mean
+    def getVariance(self):
+        """Returns: the sample variance, 0 if there are fewer than 2 numbers."""
+        if self._count < 2:
+            return 0.0
+        return self._m2/(self._count-1)
+    def getDeviation(self):
+        return math.sqrt(self.getVariance())
+    def getInterval(self,z=CONFIDENCE_Z):
+        """Returns: the confidence interval (low,high) of the mean."""
+        half = z*self.getDeviation()/math.sqrt(max(self._count,1))
+        return (self._mean-half,self._mean+half)
+
+    def __init__(self):
+        """Initializer to start with no numbers."""
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self,value):
+        """Adds a number to the stream.
+
+        Parameter: value
+        Precondition: Must be an int or float"""
+        self._count += 1
+        delta = value-self._mean
+        self._mean += delta/self._count
+        self._m2 += delta*(value-self._mean)
+
+
+class Histogram(object):
+    """An instance counts numbers in equal bins over a fixed range.
+
+    Numbers past either end are counted in the first or last bin.
+
+    INSTANCE ATTRIBUTES:
+        _low    [float]: the start of the first bin
+        _width  [float > 0]: the width of every bin
+        _counts [list of ints >= 0]: the count of each bin
+    """
+
+    def getCounts(self):
+        return self._counts
+    def getEdges(self,k):
+        """Returns: the range (low,high) of bin k."""
+        return (self._low+k*self._width,self._low+(k+1)*self._width)
+
+    def __init__(self,low,high,bins):
+        """Initializer to make an empty histogram.
+
+        Parameter: low, high
+        Precondition: Must be floats with low < high
+
+        Parameter: bins
+        Precondition: Must be an int > 0"""
+        self._low = low
+        self._width = (high-low)/float(bins)
+        self._counts = [0]*bins
+
+    def add(self,value):
+        """Counts a number in its bin.
+
+        Parameter: value
+        Precondition: Must be an int or float"""
+        k = int((value-self._low)//self._width)
+        self._counts[min(max(k,0),len(self._counts)-1)] += 1
+
+    def getQuantile(self,q):
+        """Returns: an estimate of the q quantile: the upper edge of the first
+        bin at which the counts so far reach q of the total.
+
+        Parameter: q
+        Precondition: Must be a float with 0 <= q <= 1"""
+        target = q*sum(self._counts)
+        seen = 0
+        for k in range(len(self._counts)):
+            seen += self._counts[k]
+            if seen >= target:
+                return self.getEdges(k)[1]
+        return self.getEdges(len(self._counts)-1)[1]
+
+
+class Study(object):
+    """An instance gathers the results of the games of one serve setting.
+
+    INSTANCE ATTRIBUTES:
+        _vxrange [tuple of two floats]: the range of the horizontal serve speed
+        _speeds  [list of floats > 0]: the speed multipliers of the served balls
+        _won     [int >= 0]: the number of games cleared
+        _lost    [int >= 0]: the number of games that ran out of tries
+        _length  [RunningStats]: the ticks each game lasted
+        _losses  [RunningStats]: the tries each game lost
+        _lengths [Histogram]: the ticks each game lasted
+    """
+
+    def getGames(self):
+        return self._length.getCount()
+    def getServeRange(self):
+        return self._vxrange
+    def getServeSpeeds(self):
+        return self._speeds
+
+    def __init__(self,vxrange,speeds,limit):
+        """Initializer for a setting with no games yet.
+
+        Parameter: vxrange, speeds
+        Precondition: Must be as in the initializer of Play
+
+        Parameter: limit
+        Precondition: Must be an int > 0, the most ticks in one game"""
+        self._vxrange = vxrange
+        self._speeds = speeds
+        self._won = 0
+        self._lost = 0
+        self._length = RunningStats()
+        self._losses = RunningStats()
+        self._lengths = Histogram(0,limit,HISTOGRAM_BINS)
+
+    def add(self,result):
+        """Adds the result of one game.
+
+        Parameter: result
+        Precondition: Must be a tuple (ticks,bricks,tries) as from playGame"""
+        ticks, bricks, tries = result
+        if bricks == 0:
+            self._won += 1
+        elif tries == 0:
+            self._lost += 1
+        self._length.add(ticks)
+        self._losses.add(3-tries)
+        self._lengths.add(ticks)
+
+    def report(self):
+        """Returns: the statistics of this setting, as a list of lines."""
+        n = self.getGames()
+        lines = ['serve vx %g to %g, speeds %s: %d games'
+                 % (self._vxrange[0],self._vxrange[1],
+                    ' '.join('%.3g' % speed for speed in self._speeds),n)]
+        for (name,count) in [('cleared',self._won),('lost',self._lost),
+                             ('unfinished',n-self._won-self._lost)]:
+            low, high = wilson(count,n)
+            lines.append('  %-11s %6.2f%%  [%.2f%%, %.2f%%]'
+                         % (name,100.0*count/max(n,1),100*low,100*high))
+        low, high = self._losses.getInterval()
+        lines.append('  tries lost per game  %.3f  [%.3f, %.3f]'
+                     % (self._losses.getMean(),low,high))
+        minutes = n*self._length.getMean()/(60.0*PHYSICS_RATE)
+        lines.append('  tries lost per minute of play  %.3f'
+                     % (n*self._losses.getMean()/max(minutes,1e-9)))
+        low, high = self._length.getInterval()
+        lines.append('  ticks per game  %.0f  [%.0f, %.0f], sd %.0f'
+                     % (self._length.getMean(),low,high,self._length.getDeviation()))
+        lines.append('  ticks quantiles (binned)  10%%: <=%.0f  50%%: <=%.0f  90%%: <=%.0f'
+                     % tuple(self._lengths.getQuantile(q) for q in (0.1,0.5,0.9)))
+        counts = self._lengths.getCounts()
+        most = max(max(counts),1)
+        for k in range(len(counts)):
+            low, high = self._lengths.getEdges(k)
+            lines.append('  %7.0f-%-7.0f %-*s %d' % (low,high,HISTOGRAM_WIDTH,
+                                                    '#'*(HISTOGRAM_WIDTH*counts[k]//most),
+                                                    counts[k]))
+        return lines
+
+
+def playChunk(task):
+    """Returns: the tuple (setting,results) after playing one chunk of games.
+
+    This is what the worker processes run, so it is a function of the module
+    (which can be sent to another process) and takes one tuple.  The seeds
+    of the games are made here from the seed of the chunk, so the tasks are
+    small however many games are in them.
+
+    Parameter: task
+    Precondition: Must be a tuple (setting,seed,games,level,controller,limit,
+        speeds,vxrange,batch): the position of the setting in the study, the
+        seed of the chunk, the number of games, the level, a key of
+        CONTROLLERS, the most ticks in a game, the serve setting (as in Play),
+        and True to play the chunk at once with a BatchPlay"""
+    setting, seed, games, level, controller, limit, speeds, vxrange, batch = task
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for game in range(games)]
+    if batch:
+        results = playBatch(level,seeds,BATCH_CONTROLLERS[controller],limit,None,
+                            speeds,vxrange)
+    else:
+        results = [playGame(level,s,CONTROLLERS[controller],limit,CONTINUOUS_COLLISION,
+                            None,speeds,vxrange) for s in seeds]
+    return (setting,results)
+
+
+def main(argv=None):
+    """Runs the study asked for on the command line and prints the report.
+
+    Parameter: argv
+    Precondition: Must be a list of strings (the arguments after the program
+        name), or None to use sys.argv"""
+    parser = argparse.ArgumentParser(description='Play many seeded games of Breakout '
+                                     'for each serve setting and report statistics.')
+    parser.add_argument('--games',type=int,default=1000,
+                        help='the number of games for each setting (default 1000)')
+    parser.add_argument('--level',type=int,choices=[1,2],default=1,
+                        help='the level of every game (default 1)')
+    parser.add_argument('--seed',type=int,default=RANDOM_SEED,
+                        help='the seed of the study (default: picked at random)')
+    parser.add_argument('--controller',choices=sorted(CONTROLLERS),default='tracking',
+                        help='what moves the paddle (default tracking)')
+    parser.add_argument('--limit',type=int,default=SIMULATION_TICK_LIMIT,
+                        help='the most ticks in one game (default %d)' % SIMULATION_TICK_LIMIT)
+    parser.add_argument('--vx-min',type=float,default=SERVE_VX_MIN,
+                        help='the smallest horizontal serve speed (default %g)' % SERVE_VX_MIN)
+    parser.add_argument('--vx-max',type=float,nargs='+',default=[SERVE_VX_MAX],
+                        help='one or more largest horizontal serve speeds '
+                        '(default %g)' % SERVE_VX_MAX)
+    parser.add_argument('--speed-scale',type=float,nargs='+',default=[1.0],
+                        help='one or more factors on the serve speeds of the level '
+                        '(default 1)')
+    parser.add_argument('--chunk',type=int,default=64,
+                        help='the number of games in one task (default 64)')
+    parser.add_argument('--processes',type=int,default=multiprocessing.cpu_count(),
+                        help='the number of worker processes, 0 to play in this '
+                        'process (default: one per CPU)')
+    parser.add_argument('--no-batch',action='store_true',
+                        help='play each game with its own Play instead of a BatchPlay')
+    args = parser.parse_args(argv)
+    if args.games < 1 or args.chunk < 1:
+        parser.error('--games and --chunk must be positive')
+    if min(args.vx_max) < args.vx_min or args.vx_min < 0:
+        parser.error('every --vx-max must be at least --vx-min, which must be >= 0')
+
+    seed = args.seed
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    studies = []
+    for (vxmax,scale) in itertools.product(args.vx_max,args.speed_scale):
+        speeds = [speed*scale for speed in SERVE_SPEEDS[args.level-1]]
+        studies.append(Study((args.vx_min,vxmax),speeds,args.limit))
+
+    # Every setting plays the same chunk seeds, so it sees the same serves
+    rng = random.Random(seed)
+    tasks = []
+    for start in range(0,args.games,args.chunk):
+        chunkseed = rng.getrandbits(32)
+        for setting in range(len(studies)):
+            study = studies[setting]
+            tasks.append((setting,chunkseed,min(args.chunk,args.games-start),args.level,
+                          args.controller,args.limit,study.getServeSpeeds(),study.getServeRange(),
+                          not args.no_batch))
+
+    begin = clock()
+    pool = None
+    if args.processes > 0:
+        pool = multiprocessing.Pool(args.processes)
+        finished = pool.imap_unordered(playChunk,tasks)
+    else:
+        finished = (playChunk(task) for task in tasks)
+    try:
+        for (setting,results) in finished:
+            for result in results:
+                studies[setting].add(result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = max(clock()-begin,1e-9)
+
+    print('%d settings x %d games of level %d with the %s controller, seed %d'
+          % (len(studies),args.games,args.level,args.controller,seed))
+    print('%.1f s, %.1f games/sec, %d processes'
+          % (elapsed,len(studies)*args.games/elapsed,args.processes))
+    for study in studies:
+        print()
+        for line in study.report():
+            print(line)
+
+
+# Application code
+if __name__ == '__main__':
+    main()
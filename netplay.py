@@ -0,0 +1,677 @@
+# netplay.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Head-to-head Breakout over the network, with rollback
+
+In a Match, two players each have their own Play, served the same way.  Every
+NETPLAY_ATTACK bricks one player breaks brings back the lowest broken brick on the
+board of the other, and the first to clear their board (or the last to lose all their
+tries) wins.  Each machine plays both boards.
+
+Nobody waits for the network: the local paddle moves on the tick its key is pressed,
+as in local play.  The input of the other player is predicted (they keep doing what
+they did at the last tick heard from), and a RollbackEngine keeps a snapshot of the
+match (see Play.snapshot) at every tick since the last one whose real input has
+arrived.  When a real input arrives that differs from the prediction, the engine
+restores the snapshot of that tick and plays the ticks since again, in the same frame.
+At most NETPLAY_ROLLBACK_TICKS ticks are played ahead of the real input, so that is
+also the most ticks ever played again.
+
+The inputs go over UDP.  Each packet holds every local input the other side has not
+acknowledged yet, so a lost packet is made up by the next one.  A Link can also delay
+and drop its packets on purpose, to test the engine on loopback:
+
+    python netplay.py --frames 1200 --delay 0.08 --jitter 0.02 --loss 0.1
+
+plays both players in two processes over 127.0.0.1 and checks that they played the
+same match, tick for tick.  To play one side of a match against another machine, use
+--player, --port and --peer."""
+from __future__ import print_function
+import argparse
+import hashlib
+import heapq
+import multiprocessing
+import random
+import socket
+import struct
+import time
+from timeit import default_timer as clock
+import numpy as np
+from constants import *
+from play import *
+from controllers import *
+from recording import KEY_LEFT, KEY_RIGHT
+from simulate import CONTROLLERS
+
+
+#: the first bytes of every packet
+NETPLAY_MAGIC = b'BRKN'
+#: the layout of the start of a packet: the magic, the number of ticks in a row
+#: whose input the sender has from the receiver (an acknowledgement), the first
+#: tick whose input follows, and the number of inputs, one byte each
+NETPLAY_PACKET = struct.Struct('<4sIIB')
+#: the most inputs in one packet
+NETPLAY_MAX_INPUTS = 255
+#: the layout of the start of a snapshot of a Match: the ticks played, the
+#: bricks broken by each player, and the length of the snapshot of each Play
+MATCH_SNAPSHOT = struct.Struct('<QIIII')
+
+
+class KeyBits(object):
+    """An instance is the input of one player at one tick, as the bits of
+    packKeys in recording.py, answering is_key_down like the GInput of game2d.
+
+    INSTANCE ATTRIBUTES:
+        bits [int >= 0]: KEY_LEFT and KEY_RIGHT, or'ed
+    """
+
+    def __init__(self,bits=0):
+        """Initializer to make the input with the given bits.
+
+        Parameter: bits
+        Precondition: Must be an int >= 0"""
+        self.bits = bits
+
+    def is_key_down(self,key):
+        """Returns: True if key is down in bits.
+
+        Parameter: key
+        Precondition: Must be a string, the name of a key"""
+        if key == 'left':
+            return bool(self.bits & KEY_LEFT)
+        if key == 'right':
+            return bool(self.bits & KEY_RIGHT)
+        return False
+
+
+def keyBits(keys):
+    """Returns: the bits (KEY_LEFT and KEY_RIGHT) of the paddle keys down in keys.
+
+    Parameter: keys
+    Precondition: Must answer is_key_down, like a GInput or a controller"""
+    bits = 0
+    if keys.is_key_down('left'):
+        bits |= KEY_LEFT
+    if keys.is_key_down('right'):
+        bits |= KEY_RIGHT
+    return bits
+
+
+class Match(object):
+    """An instance is a game of two players, each with their own Play.
+
+    A lost ball is served again at once, as in simulate.py.  A player is done
+    once their board is clear or they have no tries left, and the match is
+    over once a player is done.
+
+    INSTANCE ATTRIBUTES:
+        _games  [list of two Plays]: the board of each player
+        _broken [list of two ints >= 0]: the bricks broken by each player
+        _ticks  [int >= 0]: the number of ticks played
+        _input  [KeyBits]: reused for the input of each player
+    """
+
+    def getGame(self,player):
+        return self._games[player]
+    def getBroken(self,player):
+        return self._broken[player]
+    def getTicks(self):
+        return self._ticks
+
+    def __init__(self,level,seed,continuous=CONTINUOUS_COLLISION):
+        """Initializer to start a match, with the balls served.
+
+        Parameter: level
+        Precondition: Must be an int (either 1 or 2)
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, the seed of both boards
+
+        Parameter: continuous
+        Precondition: Must be a bool, whether the boards use continuous collision"""
+        self._games = [Play(level,continuous,seed=seed),Play(level,continuous,seed=seed)]
+        for game in self._games:
+            game.serveBall()
+        self._broken = [0,0]
+        self._ticks = 0
+        self._input = KeyBits()
+
+    def getWinner(self):
+        """Returns: None while the match is on; once it is over, the player who
+        won (0 or 1), or -1 if both were done at the same tick and neither
+        cleared their board alone."""
+        done = [game.getBrickLength() == 0 or game.getTries() == 0 for game in self._games]
+        if not (done[0] or done[1]):
+            return None
+        cleared = [game.getBrickLength() == 0 for game in self._games]
+        if cleared[0] != cleared[1]:
+            return 0 if cleared[0] else 1
+        if done[0] != done[1]:
+            return 1 if done[0] else 0
+        return -1
+
+    def tick(self,inputs):
+        """Plays one tick of both boards, unless the match is over.
+
+        Parameter: inputs
+        Precondition: Must be a pair of ints, the bits of the input of each
+            player (KEY_LEFT and KEY_RIGHT)"""
+        if self.getWinner() is not None:
+            return
+        for player in range(2):
+            game = self._games[player]
+            before = game.getBrickLength()
+            self._input.bits = inputs[player]
+            game.updatePaddle(self._input)
+            game.updateBall()
+            if game.getStatus() == 'oops' and game.getTries() > 0:
+                game.setStatus(None)
+                game.serveBall()
+            broken = max(before-game.getBrickLength(),0)
+            attacks = ((self._broken[player]+broken)//NETPLAY_ATTACK
+                       - self._broken[player]//NETPLAY_ATTACK)
+            self._broken[player] += broken
+            for k in range(attacks):
+                self._attack(self._games[1-player])
+        self._ticks += 1
+
+    def _attack(self,game):
+        """Helper method for tick that brings back the lowest broken brick of
+        game, if it has one."""
+        field = game.getField()
+        dead = np.flatnonzero(~field.getAliveMask())
+        if dead.size > 0:
+            field.revive(int(dead[-1]))
+
+    def snapshot(self):
+        """Returns: the whole state of this match as a bytes string, which
+        restore puts back exactly: MATCH_SNAPSHOT and then the snapshot of
+        each board."""
+        games = [game.snapshot() for game in self._games]
+        return b''.join((MATCH_SNAPSHOT.pack(self._ticks,self._broken[0],self._broken[1],
+                                             len(games[0]),len(games[1])),
+                         games[0],games[1]))
+
+    def restore(self,data):
+        """Puts back the state of a match from a snapshot.  The Plays are
+        reused, so whatever shows them still can.
+
+        Raises ValueError if data is not a whole snapshot of a match with as
+        many rows and columns of bricks.
+
+        Parameter: data
+        Precondition: Must be a bytes string, as returned by snapshot"""
+        if len(data) < MATCH_SNAPSHOT.size:
+            raise ValueError('snapshot is too short')
+        (ticks,broken0,broken1,size0,size1) = MATCH_SNAPSHOT.unpack_from(data)
+        pos = MATCH_SNAPSHOT.size
+        if len(data) != pos+size0+size1:
+            raise ValueError('snapshot is not of the right length')
+        self._games[0].restore(data[pos:pos+size0])
+        self._games[1].restore(data[pos+size0:])
+        self._ticks = ticks
+        self._broken = [broken0,broken1]
+
+
+class Link(object):
+    """An instance sends and receives the packets of one player over UDP.
+
+    It can also hold each packet it sends for delay seconds (plus up to
+    jitter more, at random), and drop the fraction loss of them, to test
+    a RollbackEngine on a good network.  Held packets go out in poll.
+    A server (see server.py) has no one peer, and says where each packet goes.
+
+    INSTANCE ATTRIBUTES:
+        _socket [socket]: the non-blocking UDP socket of this player
+        _peer   [tuple (host,port) or None]: the address of the other player
+        _delay  [float >= 0]: the time each packet is held, in seconds
+        _jitter [float >= 0]: the most extra time a packet is held, in seconds
+        _loss   [float in 0..1]: the fraction of packets dropped
+        _rng    [random.Random]: picks the packets dropped and the jitter
+        _held   [list of tuples (time,count,data,address)]: a heap of the
+                packets held, by the time they go out
+        _count  [int >= 0]: the number of packets held so far, so that packets
+                held until the same time go out in order
+        _sent, _dropped [ints >= 0]: the number of packets sent and dropped
+        _bytes  [int >= 0]: the number of bytes sent
+    """
+
+    def getSent(self):
+        return self._sent
+    def getDropped(self):
+        return self._dropped
+    def getBytes(self):
+        return self._bytes
+
+    def __init__(self,port,peer,delay=0.0,jitter=0.0,loss=0.0,seed=None,host='127.0.0.1'):
+        """Initializer to open the socket of a player.
+
+        Parameter: port
+        Precondition: Must be an int, the UDP port of this player
+
+        Parameter: peer
+        Precondition: Must be a tuple (host,port), the address of the other
+            player, or None if every send gives the address
+
+        Parameter: delay, jitter, loss
+        Precondition: Must be floats >= 0 (loss at most 1)
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, or None to pick one at random
+
+        Parameter: host
+        Precondition: Must be a string, the address to listen on"""
+        self._socket = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+        self._socket.bind((host,port))
+        self._socket.setblocking(False)
+        self._peer = peer
+        self._delay = delay
+        self._jitter = jitter
+        self._loss = loss
+        self._rng = random.Random(seed)
+        self._held = []
+        self._count = 0
+        self._sent = 0
+        self._dropped = 0
+        self._bytes = 0
+
+    def send(self,data,address=None):
+        """Sends a packet to the other player (or holds or drops it).
+
+        Parameter: data
+        Precondition: Must be a bytes string
+
+        Parameter: address
+        Precondition: Must be a tuple (host,port), or None for the other player"""
+        if address is None:
+            address = self._peer
+        if self._loss > 0 and self._rng.random() < self._loss:
+            self._dropped += 1
+            return
+        if self._delay > 0 or self._jitter > 0:
+            due = clock()+self._delay+self._rng.uniform(0,self._jitter)
+            heapq.heappush(self._held,(due,self._count,data,address))
+            self._count += 1
+        else:
+            self._put(data,address)
+        self.poll()
+
+    def poll(self):
+        """Sends the held packets that are due."""
+        now = clock()
+        while len(self._held) > 0 and self._held[0][0] <= now:
+            (due,count,data,address) = heapq.heappop(self._held)
+            self._put(data,address)
+
+    def receive(self):
+        """Returns: the list of packets that have arrived, oldest first."""
+        return [data for (data,address) in self.receiveFrom()]
+
+    def receiveFrom(self):
+        """Returns: the list of tuples (data,address) of the packets that have
+        arrived, oldest first, with the address each came from."""
+        packets = []
+        while True:
+            try:
+                packets.append(self._socket.recvfrom(65536))
+            except socket.error:
+                return packets
+
+    def close(self):
+        """Closes the socket; held packets are dropped."""
+        self._socket.close()
+
+    def _put(self,data,address):
+        """Helper method to send data to address now."""
+        try:
+            self._socket.sendto(data,address)
+            self._sent += 1
+            self._bytes += len(data)
+        except socket.error:
+            # the other player is not listening (yet); UDP may lose packets anyway
+            self._dropped += 1
+
+
+class RollbackEngine(object):
+    """An instance plays one side of a Match over a Link.
+
+    Tick t of the match is played with the input of both players at tick t.
+    The local input is known at once; the remote input of a tick that has
+    not arrived is predicted as the last one that has.  _snapshots keeps the
+    match at the start of every tick from _confirmed on, so that when a
+    remote input differs from its prediction, the match goes back to that
+    tick and the ticks since are played again.
+
+    INSTANCE ATTRIBUTES:
+        _match     [Match]: the match, played up to tick _frame
+        _player    [0 or 1]: the local player
+        _link      [Link]: where the packets go
+        _frame     [int >= 0]: the number of ticks played
+        _confirmed [int >= 0]: the number of ticks played with the real input
+                   of both players; it is at most _frame
+        _local     [dictionary]: each key is a tick from _forgot to _frame-1
+                   and each value is its local input
+        _remote    [dictionary]: each key is a tick at or after _confirmed whose
+                   remote input has arrived, and each value is that input
+        _received  [int >= 0]: the number of ticks in a row, from tick 0, whose
+                   remote input has arrived
+        _last      [int]: the remote input of tick _received-1, or 0 if none
+        _acked     [int >= 0]: the number of ticks in a row whose local input
+                   the other player has
+        _forgot    [int >= 0]: the number of ticks in a row whose local input
+                   has been taken out of _local
+        _used      [dictionary]: each key is a tick from _confirmed to _frame-1
+                   and each value is the remote input it was played with
+        _snapshots [dictionary]: each key is a tick from _confirmed to _frame
+                   and each value is the snapshot of the match at its start
+        _checksum  [hashlib md5]: of the snapshots after each confirmed tick,
+                   so two players that played the same match have the same one
+        _rollbacks [int >= 0]: the number of times the match went back
+        _replayed  [int >= 0]: the number of ticks played again
+        _stalls    [int >= 0]: the number of frames no tick was played in,
+                   since it was NETPLAY_ROLLBACK_TICKS ahead
+    """
+
+    def getMatch(self):
+        return self._match
+    def getPlayer(self):
+        return self._player
+    def getFrame(self):
+        return self._frame
+    def getConfirmed(self):
+        return self._confirmed
+    def getChecksum(self):
+        return self._checksum.hexdigest()
+    def getRollbacks(self):
+        return self._rollbacks
+    def getReplayed(self):
+        return self._replayed
+    def getStalls(self):
+        return self._stalls
+
+    def __init__(self,match,player,link):
+        """Initializer to play a match from its start.
+
+        Parameter: match
+        Precondition: Must be a Match, at the same tick as that of the other player
+
+        Parameter: player
+        Precondition: Must be 0 or 1, the local player
+
+        Parameter: link
+        Precondition: Must be a Link to the other player"""
+        self._match = match
+        self._player = player
+        self._link = link
+        self._frame = 0
+        self._confirmed = 0
+        self._local = {}
+        self._remote = {}
+        self._received = 0
+        self._last = 0
+        self._acked = 0
+        self._forgot = 0
+        self._used = {}
+        self._snapshots = {0: match.snapshot()}
+        self._checksum = hashlib.md5()
+        self._rollbacks = 0
+        self._replayed = 0
+        self._stalls = 0
+
+    def update(self,bits):
+        """Returns: True if a tick was played.
+
+        Once a frame: takes in the packets that arrived (going back if an
+        input was mispredicted), plays the next tick with the local input
+        bits unless it is too far ahead, and sends the local inputs the other
+        player does not have yet.
+
+        Parameter: bits
+        Precondition: Must be an int, the bits of the local input at this tick,
+            or None to only keep up with the network and play no tick"""
+        self._receive()
+        played = False
+        if bits is not None:
+            if self._frame-self._confirmed < NETPLAY_ROLLBACK_TICKS:
+                self._local[self._frame] = bits
+                self._play(self._frame)
+                self._frame += 1
+                played = True
+            else:
+                self._stalls += 1
+        self._send()
+        self._link.poll()
+        return played
+
+    def _receive(self):
+        """Helper method for update that takes in the packets that arrived,
+        and plays the mispredicted ticks again."""
+        wrong = None
+        for data in self._link.receive():
+            if len(data) < NETPLAY_PACKET.size:
+                continue
+            (magic,ack,first,count) = NETPLAY_PACKET.unpack_from(data)
+            if magic != NETPLAY_MAGIC or len(data) != NETPLAY_PACKET.size+count:
+                continue
+            self._acked = max(self._acked,ack)
+            inputs = bytearray(data[NETPLAY_PACKET.size:])
+            for k in range(count):
+                tick = first+k
+                if tick < self._received or tick in self._remote:
+                    continue
+                self._remote[tick] = inputs[k]
+                if tick < self._frame and self._used[tick] != inputs[k]:
+                    if wrong is None or tick < wrong:
+                        wrong = tick
+            while self._received in self._remote:
+                self._last = self._remote[self._received]
+                self._received += 1
+        if wrong is not None:
+            self._rollback(wrong)
+        self._confirm()
+        # a local input is needed until it is acknowledged and confirmed
+        while self._forgot < min(self._acked,self._confirmed):
+            del self._local[self._forgot]
+            self._forgot += 1
+
+    def _rollback(self,tick):
+        """Helper method to go back to the start of tick and play every tick
+        since again, with the inputs known now."""
+        self._rollbacks += 1
+        self._match.restore(self._snapshots[tick])
+        for t in range(tick,self._frame):
+            self._play(t)
+            self._replayed += 1
+
+    def _play(self,tick):
+        """Helper method to play tick, with the local input and the remote one
+        (or its prediction), and keep the snapshot of the match after it."""
+        remote = self._remote.get(tick,self._last)
+        self._used[tick] = remote
+        inputs = [0,0]
+        inputs[self._player] = self._local[tick]
+        inputs[1-self._player] = remote
+        self._match.tick(inputs)
+        self._snapshots[tick+1] = self._match.snapshot()
+
+    def _confirm(self):
+        """Helper method to move _confirmed up to the ticks whose remote
+        input has arrived, and forget what is not needed for them anymore."""
+        while self._confirmed < min(self._received,self._frame):
+            tick = self._confirmed
+            self._checksum.update(self._snapshots[tick+1])
+            del self._snapshots[tick]
+            del self._used[tick]
+            del self._remote[tick]
+            self._confirmed += 1
+
+    def _send(self):
+        """Helper method to send the local inputs the other player does not
+        have yet (the oldest NETPLAY_MAX_INPUTS of them)."""
+        first = self._acked
+        count = min(self._frame-first,NETPLAY_MAX_INPUTS)
+        inputs = bytearray([self._local[t] for t in range(first,first+count)])
+        self._link.send(NETPLAY_PACKET.pack(NETPLAY_MAGIC,self._received,first,count)
+                        +bytes(inputs))
+
+
+def runPlayer(player,frames,level,seed,port,peer,controller='autopilot',delay=0.0,
+              jitter=0.0,loss=0.0,timeout=None):
+    """Returns: a dictionary of how one side of a match went, after playing
+    frames ticks of it at PHYSICS_RATE frames per second.
+
+    The local paddle is moved by a controller from CONTROLLERS, on the local
+    board.  After the last tick, this side keeps answering the other for
+    NETPLAY_LINGER seconds, or until every tick is confirmed.
+
+    Parameter: player
+    Precondition: Must be 0 or 1, the local player
+
+    Parameter: frames
+    Precondition: Must be an int > 0, the number of ticks to play
+
+    Parameter: level, seed
+    Precondition: Must be as in Match (and the same for both players)
+
+    Parameter: port, peer
+    Precondition: Must be as in Link
+
+    Parameter: controller
+    Precondition: Must be a key of CONTROLLERS
+
+    Parameter: delay, jitter, loss
+    Precondition: Must be as in Link
+
+    Parameter: timeout
+    Precondition: Must be a float > 0, the most seconds to play, or None for
+        no limit"""
+    link = Link(port,peer,delay,jitter,loss,seed+player)
+    match = Match(level,seed)
+    engine = RollbackEngine(match,player,link)
+    keys = CONTROLLERS[controller](match.getGame(player))
+    worst = 0.0
+    late = 0
+    start = clock()
+    due = start
+    try:
+        while engine.getConfirmed() < frames:
+            now = clock()
+            if timeout is not None and now-start > timeout:
+                break
+            if now < due:
+                time.sleep(due-now)
+            due += PHYSICS_TICK
+            if engine.getFrame() >= frames:
+                if now-start > frames*PHYSICS_TICK+NETPLAY_LINGER:
+                    break
+                engine.update(None)
+                continue
+            began = clock()
+            if engine.update(keyBits(keys)):
+                keys.tick()
+            spent = clock()-began
+            worst = max(worst,spent)
+            if spent > PHYSICS_TICK:
+                late += 1
+        # keep acknowledging for a while, so the other player can finish
+        linger = clock()+NETPLAY_LINGER
+        while clock() < linger:
+            engine.update(None)
+            time.sleep(PHYSICS_TICK)
+    finally:
+        link.close()
+    return {'player': player, 'frames': engine.getFrame(), 'confirmed': engine.getConfirmed(),
+            'checksum': engine.getChecksum(), 'winner': match.getWinner(),
+            'broken': match.getBroken(player), 'rollbacks': engine.getRollbacks(),
+            'replayed': engine.getReplayed(), 'stalls': engine.getStalls(),
+            'worst': worst, 'late': late, 'sent': link.getSent(),
+            'dropped': link.getDropped()}
+
+
+def _runPlayer(queue,args):
+    """Runs runPlayer with the tuple args in a process of its own, and puts
+    what it returns in queue."""
+    queue.put(runPlayer(*args))
+
+
+def main(argv=None):
+    """Plays a match over loopback with two processes and checks that both
+    played the same, or plays one side of a match with --peer.
+
+    Parameter: argv
+    Precondition: Must be a list of strings (the arguments after the program
+        name), or None to use sys.argv"""
+    parser = argparse.ArgumentParser(description='Play head-to-head Breakout over UDP '
+                                     'with rollback, or test it over loopback.')
+    parser.add_argument('--frames',type=int,default=1200,
+                        help='the number of ticks to play (default 1200, 20 seconds)')
+    parser.add_argument('--level',type=int,choices=[1,2],default=1,
+                        help='the level of both boards (default 1)')
+    parser.add_argument('--seed',type=int,default=RANDOM_SEED,
+                        help='the seed of both boards (default: picked at random; '
+                        'both players must use the same one)')
+    parser.add_argument('--controller',choices=sorted(CONTROLLERS),default='autopilot',
+                        help='what moves the local paddles (default autopilot)')
+    parser.add_argument('--delay',type=float,default=0.0,
+                        help='the time each packet is held, in seconds (default 0)')
+    parser.add_argument('--jitter',type=float,default=0.0,
+                        help='the most extra time a packet is held, in seconds (default 0)')
+    parser.add_argument('--loss',type=float,default=0.0,
+                        help='the fraction of packets dropped (default 0)')
+    parser.add_argument('--port',type=int,default=NETPLAY_PORT,
+                        help='the UDP port of the first player; the second uses the '
+                        'next one, unless --peer is given (default %d)' % NETPLAY_PORT)
+    parser.add_argument('--player',type=int,choices=[0,1],default=0,
+                        help='the local player, with --peer (default 0)')
+    parser.add_argument('--peer',default=None,metavar='HOST:PORT',
+                        help='play only the local player, against the one at HOST:PORT')
+    args = parser.parse_args(argv)
+    if args.frames < 1 or min(args.delay,args.jitter,args.loss) < 0 or args.loss > 1:
+        parser.error('--frames must be positive and --delay, --jitter and --loss '
+                     'must not be negative')
+    seed = args.seed
+    if seed is None:
+        if args.peer is not None:
+            parser.error('both players must be given the same --seed')
+        seed = random.SystemRandom().getrandbits(32)
+
+    if args.peer is not None:
+        (host,port) = args.peer.rsplit(':',1)
+        results = [runPlayer(args.player,args.frames,args.level,seed,args.port,
+                             (host,int(port)),args.controller,args.delay,args.jitter,
+                             args.loss)]
+    else:
+        queue = multiprocessing.Queue()
+        timeout = args.frames*PHYSICS_TICK*4+10
+        processes = []
+        for player in range(2):
+            peer = ('127.0.0.1',args.port+1-player)
+            task = (player,args.frames,args.level,seed,args.port+player,peer,
+                    args.controller,args.delay,args.jitter,args.loss,timeout)
+            processes.append(multiprocessing.Process(target=_runPlayer,args=(queue,task)))
+        for process in processes:
+            process.start()
+        results = sorted([queue.get() for process in processes],key=lambda r: r['player'])
+        for process in processes:
+            process.join()
+
+    print('match of level %d, seed %d, %d ticks; delay %g s, jitter %g s, loss %g'
+          % (args.level,seed,args.frames,args.delay,args.jitter,args.loss))
+    for r in results:
+        print('player %d: %d ticks played, %d confirmed, %d bricks broken, winner %s'
+              % (r['player'],r['frames'],r['confirmed'],r['broken'],r['winner']))
+        print('    %d rollbacks, %d ticks played again, %d stalls; worst frame %.2f ms, '
+              '%d over %.1f ms' % (r['rollbacks'],r['replayed'],r['stalls'],r['worst']*1000,
+                                   r['late'],PHYSICS_TICK*1000))
+        print('    %d packets sent, %d dropped; checksum %s'
+              % (r['sent'],r['dropped'],r['checksum']))
+    if len(results) == 2:
+        same = (results[0]['confirmed'] == results[1]['confirmed']
+                and results[0]['checksum'] == results[1]['checksum'])
+        print('both players %s' % ('played the same match' if same
+                                   else 'DID NOT play the same match'))
+
+
+# Application code
+if __name__ == '__main__':
+    main()
@@ -8,16 +8,54 @@ Instances of Play represent a single game.  If you want to restart a new game, y
 expected to make a new instance of Play.
 
 The subcontroller Play manages the paddle, ball, and bricks.  These are model objects.  
-Their classes are defined in models.py.
+Their classes are defined in models.py.  Like the models, Play does not import game2d,
+so games can be simulated without Kivy; sprites.py draws a Play when there is a window.
 
 Most of your work on this assignment will be in either this module or models.py.
 Whether a helper method belongs in this module or models.py is often a complicated
 issue.  If you do not know, ask on Piazza and we will answer."""
+import random
+import struct
+import numpy as np
 from constants import *
-from game2d import *
 from models import *
 
 
+#: the version of the snapshots written by Play.snapshot
+PLAY_SNAPSHOT_VERSION = 1
+#: the layout of the start of a snapshot of a Play: the version, level, flags,
+#: tries, rows and columns of bricks, number of balls and of serve speeds, seed,
+#: paddle x and serve range, all little-endian
+PLAY_SNAPSHOT = struct.Struct('<BBBBHHHHQddd')
+#: the layout of the state of a random.Random: the 625 words of its Mersenne
+#: Twister, whether it keeps a gaussian, and the gaussian
+RNG_STATE = struct.Struct('<625IBd')
+#: the flags of a snapshot: continuous collision and status 'oops'
+SNAPSHOT_CONTINUOUS = 1
+SNAPSHOT_OOPS = 2
+
+
+def packRandom(rng):
+    """Returns: the state of rng as a bytes string, packed with RNG_STATE.
+
+    Parameter: rng
+    Precondition: Must be a random.Random"""
+    (version,state,gauss) = rng.getstate()
+    return RNG_STATE.pack(*(state+(gauss is not None,gauss or 0.0)))
+
+
+def unpackRandom(rng,data):
+    """Puts the state packed by packRandom back into rng.
+
+    Parameter: rng
+    Precondition: Must be a random.Random
+
+    Parameter: data
+    Precondition: Must be a bytes string, as returned by packRandom"""
+    words = RNG_STATE.unpack(data)
+    rng.setstate((rng.VERSION,words[:625],words[626] if words[625] else None))
+
+
 # PRIMARY RULE: Play can only access attributes in models.py via getters/setters
 # Play is NOT allowed to access anything in breakout.py (Subcontrollers are not
 # permitted to access anything in their parent. To see why, take CS 3152)
@@ -33,19 +71,43 @@ class Play(object):
     
     INSTANCE ATTRIBUTES:
         _paddle [Paddle]: the paddle to play with 
-        _bricks [list of Bricks]: the list of bricks still remaining 
-        _ball   [Ball, or None if waiting for a serve]:  the ball to animate
+        _field  [BrickField]: the bricks, including which ones still remain
+        _bx, _by   [float arrays]: the center of each ball in play
+        _bvx, _bvy [float arrays]: the velocity of each ball in play
+        _bspeed [float array]: the speed multiplier of each ball in play
+        _radius [float > 0]: the radius of every ball
         _tries  [int >= 0]: the number of tries left
     
         _status [string 'oops', or None if ball in play]: whether or not ball went off screen
         _storebrick [stores how many bricks there are at beginning]
         _level [int, either 1 or 2]: level of the game
-        _ball2 [Ball, or None if in Level 1 or waiting for serve]: second ball to animate
+        _speeds [nonempty list of floats > 0]: the speed multipliers of the
+                balls served at once, SERVE_SPEEDS for the level unless given
+        _vxrange [tuple of two floats]: the range (vxmin,vxmax) of the
+                horizontal speed of a served ball
+        _continuous [bool]: whether balls are swept along their move (continuous
+                collision) rather than tested for overlap once per frame
+        _seed [int]: the seed of _rng
+        _rng  [random.Random]: the random numbers of this game, used for every
+                serve; two games with the same seed and the same input move
+                exactly the same way
+        _rngstate [bytes string, or None]: the state of _rng packed with
+                RNG_STATE for snapshot, or None if _rng was used since
+        _rngstale [bool]: True if _rngstate was restored but not yet put into
+                _rng; that is done when _rng is next used (see _getRng)
         
     """
     
     def getLevel(self):
         return self._level
+    def isContinuous(self):
+        return self._continuous
+    def getSeed(self):
+        return self._seed
+    def getServeSpeeds(self):
+        return self._speeds
+    def getServeRange(self):
+        return self._vxrange
     def getStoredBricks(self):
         return self._storebrick
     def getStatus(self):
@@ -54,38 +116,140 @@ class Play(object):
         self._status = new
     def getTries(self):
         return self._tries
+    def getBallCount(self):
+        return self._bx.size
     def getBrickLength(self):
-        return len(self._bricks)
+        return self._field.getAliveCount()
+    def getField(self):
+        return self._field
+    def getPaddle(self):
+        return self._paddle
+    def getBallPositions(self):
+        """Returns: the arrays (xs,ys) of the centers of the balls in play.
+        They are the game's own arrays, so they must not be changed."""
+        return (self._bx,self._by)
+    def getBallVelocities(self):
+        """Returns: the arrays (vxs,vys,speeds) of the velocities and speed
+        multipliers of the balls in play, in the order of getBallPositions.
+        They are the game's own arrays, so they must not be changed."""
+        return (self._bvx,self._bvy,self._bspeed)
+    def getRadius(self):
+        return self._radius
     
-    def __init__(self, level):
-        """Initializer to create paddles and bricks.
+    def __init__(self, level, continuous=CONTINUOUS_COLLISION, seed=None, speeds=None,
+                 vxrange=(SERVE_VX_MIN,SERVE_VX_MAX)):
+        """Initializer to create paddles and the field of bricks.
         
         Parameter: level
-        Precondition: Must be an int (either 1 or 2)."""
-        bricklist = []
-        row = 1
-        column = 1
-        while (column <= BRICKS_IN_ROW+1) and (row <= BRICK_ROWS):
-            if column == BRICKS_IN_ROW+1:
-                column = 1
-                row = row + 1
-            else:
-                remainder = row%10
-                curlinecolor = BRICK_COLORS[remainder-1]
-                curfillcolor = curlinecolor
-                curleft = BRICK_SEP_H/2.0 + BRICK_WIDTH*(column-1) + BRICK_SEP_H*(column-1)
-                curtop = GAME_HEIGHT-BRICK_Y_OFFSET - BRICK_HEIGHT*(row-1) - BRICK_SEP_V*(row-1)
-                newbrick = Brick(curtop,curleft,curlinecolor,curfillcolor)
-                column = column + 1
-                bricklist.append(newbrick)
-        self._bricks = bricklist
+        Precondition: Must be an int (either 1 or 2).
+        
+        Parameter: continuous
+        Precondition: Must be a bool, True to sweep the balls along their
+            move each frame instead of testing for overlap.
+        
+        Parameter: seed
+        Precondition: Must be an int >= 0, or None to pick one at random
+            (getSeed returns the one picked, so the game can be replayed).
+        
+        Parameter: speeds
+        Precondition: Must be a nonempty list of floats > 0, the speed
+            multipliers of the balls served at once, or None for SERVE_SPEEDS
+            of the level.
+        
+        Parameter: vxrange
+        Precondition: Must be a tuple (vxmin,vxmax) of floats, with
+            0 <= vxmin <= vxmax, the range of the horizontal serve speed."""
+        self._field = BrickField(BRICK_ROWS,BRICKS_IN_ROW)
         self._paddle = Paddle(GAME_WIDTH/2.0)
-        self._ball = None
-        self._ball2 = None
+        self._bx = np.zeros(0)
+        self._by = np.zeros(0)
+        self._bvx = np.zeros(0)
+        self._bvy = np.zeros(0)
+        self._bspeed = np.zeros(0)
+        self._radius = BALL_DIAMETER/2.0
         self._tries = 3
         self._status = None
-        self._storebrick = len(bricklist)
+        self._storebrick = self._field.getCount()
+        self._level = level
+        if speeds is None:
+            speeds = SERVE_SPEEDS[level-1]
+        self._speeds = list(speeds)
+        self._vxrange = tuple(vxrange)
+        self._continuous = continuous
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self._rngstate = None
+        self._rngstale = False
+    
+    def snapshot(self):
+        """Returns: the whole state of this game as a bytes string, which
+        restore puts back exactly.
+
+        The snapshot is PLAY_SNAPSHOT, then the positions, velocities and
+        speed multipliers of the balls and the serve speeds (as little-endian
+        doubles), the state of _rng (RNG_STATE), and one bit per brick (1 if
+        it is alive).  Nothing is pickled, so it takes a few microseconds.
+        Most of it is _rng, which is 2.5 KB; it is only packed again after a
+        serve, since nothing else uses it."""
+        if self._rngstate is None:
+            self._rngstate = packRandom(self._rng)
+        flags = 0
+        if self._continuous:
+            flags |= SNAPSHOT_CONTINUOUS
+        if self._status == 'oops':
+            flags |= SNAPSHOT_OOPS
+        head = PLAY_SNAPSHOT.pack(PLAY_SNAPSHOT_VERSION,self._level,flags,self._tries,
+                                  self._field.getRows(),self._field.getColumns(),
+                                  self._bx.size,len(self._speeds),self._seed,
+                                  self._paddle.getX(),self._vxrange[0],self._vxrange[1])
+        balls = np.concatenate((self._bx,self._by,self._bvx,self._bvy,self._bspeed))
+        return b''.join((head,balls.astype('<f8').tobytes(),
+                         struct.pack('<%dd' % len(self._speeds),*self._speeds),
+                         self._rngstate,np.packbits(self._field.getAliveMask()).tobytes()))
+
+    def restore(self,data):
+        """Puts back the state of a game from a snapshot, so that this game
+        goes on exactly as that one would have.  The snapshot may be of any
+        game with as many rows and columns of bricks, whatever its level.
+
+        Raises ValueError if data is not a whole snapshot of such a game.
+
+        Parameter: data
+        Precondition: Must be a bytes string, as returned by snapshot"""
+        if len(data) < PLAY_SNAPSHOT.size:
+            raise ValueError('snapshot is too short')
+        (version,level,flags,tries,rows,columns,balls,speeds,seed,paddle,
+         vxmin,vxmax) = PLAY_SNAPSHOT.unpack_from(data)
+        if version != PLAY_SNAPSHOT_VERSION:
+            raise ValueError('not a snapshot of version %d' % PLAY_SNAPSHOT_VERSION)
+        if rows != self._field.getRows() or columns != self._field.getColumns():
+            raise ValueError('snapshot is of %d x %d bricks' % (columns,rows))
+        pos = PLAY_SNAPSHOT.size
+        bricks = pos+8*(5*balls+speeds)+RNG_STATE.size
+        if len(data) != bricks+(rows*columns+7)//8:
+            raise ValueError('snapshot is not of the right length')
+        arrays = np.frombuffer(data,dtype='<f8',count=5*balls,offset=pos).astype(float)
+        self._bx = arrays[:balls]
+        self._by = arrays[balls:2*balls]
+        self._bvx = arrays[2*balls:3*balls]
+        self._bvy = arrays[3*balls:4*balls]
+        self._bspeed = arrays[4*balls:]
+        pos += 40*balls
+        self._speeds = list(struct.unpack_from('<%dd' % speeds,data,pos))
+        pos += 8*speeds
+        self._rngstate = data[pos:bricks]
+        self._rngstale = True
+        alive = np.unpackbits(np.frombuffer(data,dtype=np.uint8,offset=bricks))
+        self._field.setAliveMask(alive[:rows*columns])
+        self._paddle.setX(paddle)
+        self._tries = tries
+        self._status = 'oops' if flags & SNAPSHOT_OOPS else None
         self._level = level
+        self._vxrange = (vxmin,vxmax)
+        self._continuous = bool(flags & SNAPSHOT_CONTINUOUS)
+        self._seed = seed
     
     def updatePaddle(self,input):
         """Helper method called by Breakout to update position
@@ -114,88 +278,366 @@ class Play(object):
             self._paddle.setX(start_pos + da)
         
     def updateBall(self):
-        """Method to update the position of the ball.
-        Different actions are taken if there are 2 balls
-        or only 1 ball (determined by level 1 or level 2).
-        Checks if ball goes offscreen."""
-        self._updateSingleBall(self._ball)
-        if self._ball2 is not None:
-            self._updateSingleBall(self._ball2)
-        self._checkLostBall()    
+        """Method to update the position of every ball in play.
+        Balls are swept along their move if _continuous is True.
+        Otherwise, if there are at least VECTOR_MIN_BALLS balls, they are
+        all moved at once with NumPy (see _updateAllBalls); with fewer
+        balls, plain floats are faster, so they are moved one at a time
+        (see _updateSingleBall). Both give exactly the same result.
+        Bricks hit in this frame are removed after every ball has moved,
+        so two balls hitting the same brick both bounce.
+        Checks if balls go offscreen."""
+        if self._continuous:
+            for i in range(self._bx.size):
+                self._sweepSingleBall(i)
+        else:
+            if self._bx.size >= VECTOR_MIN_BALLS:
+                kills = self._updateAllBalls()
+            else:
+                kills = []
+                for i in range(self._bx.size):
+                    self._updateSingleBall(i,kills)
+            for x in kills:
+                self._field.kill(x)
+        self._checkLostBall()
     
-    def _updateSingleBall(self,ball):
+    def _updateSingleBall(self,i,kills):
         """Helper method to update a ball. Ball bounces off of top, left,
         and right of screen. Bounce means the vertical velocity is negated.
-        If ball bounces off of bricks, the brick is removed from the list and
-        disappears from the screen.
-        If Level 1, the ball moves by adding the current velocity onto the x
-        and y positions.
-        If Level 2, the balls move slightly slower by adding a the fraction
-        of the current velocity onto the x and y positions.
-        If one of the balls goes offscreen in Level 2, the other ball
-        increases in speed (the same speed as Level 1).
-        
-        Parameter: ball
-        Precondition: must be type Ball() from Models.py"""
-        if (ball.getRight() >= GAME_WIDTH) or (ball.getLeft() <= 0):
-            ball.setxvel(-ball.getxvel())
-        elif (ball.getTop() >= GAME_HEIGHT):
-            ball.setyvel(-ball.getyvel())
-        if self._paddle.collides(ball):
-            ball.setyvel(-ball.getyvel())
-        for x in self._bricks:
-            if x.brickCollides(ball):
-                ball.setyvel(-ball.getyvel())
-                self._bricks.remove(x)
-        if self._level == 1:
-            ball.setX(ball.getX() + ball.getxvel())
-            ball.setY(ball.getY() + ball.getyvel())
-        elif self._level == 2:
-            if ball == self._ball:
-                if ball.getCheck() == 'no':
-                    ball.setX(ball.getX() + ball.getxvel()/1.25)
-                    ball.setY(ball.getY() + ball.getyvel()/1.25)
-                else:
-                    ball.setX(ball.getX() + ball.getxvel())
-                    ball.setY(ball.getY() + ball.getyvel())
-            if ball == self._ball2:
-                if ball.getCheck() == 'no':      
-                    ball.setX(ball.getX() + ball.getxvel()/2)
-                    ball.setY(ball.getY() + ball.getyvel()/2)
-                else:
-                    ball.setX(ball.getX() + ball.getxvel())
-                    ball.setY(ball.getY() + ball.getyvel())
-            
+        The ball bounces off the face of the paddle or brick that it touches:
+        vx is negated for a side and vy for the top or bottom, and the ball
+        is pushed back out (see _bounce).
+        If ball bounces off of bricks, the brick is added to kills so that
+        it is removed from the field and disappears from the screen. Only
+        the bricks in the grid cells under the ball are checked. Hitting
+        several bricks at once still bounces the ball only once.
+        The ball moves by adding the current velocity, times the speed
+        multiplier of the ball, onto the x and y positions. In Level 2 the
+        balls are served slower, and speed up when one goes offscreen
+        (see serveBall and _checkLostBall).
+        
+        Parameter: i
+        Precondition: must be an int, the position of the ball in the arrays
+        
+        Parameter: kills
+        Precondition: must be a list of the bricks hit so far this frame"""
+        r = self._radius
+        x = self._bx.item(i)
+        y = self._by.item(i)
+        vx = self._bvx.item(i)
+        vy = self._bvy.item(i)
+        if (x+r >= GAME_WIDTH) or (x-r <= 0):
+            vx = -vx
+        elif (y+r >= GAME_HEIGHT):
+            vy = -vy
+        left, bottom, right, top = self._paddle.getEdges()
+        contact = circleRectContact(x,y,r,left,bottom,right,top)
+        if contact is not None:
+            x,y,vx,vy = self._bounce(x,y,vx,vy,[(None,)+contact])
+        contacts = self._field.findContacts(x,y,r)
+        if len(contacts) > 0:
+            x,y,vx,vy = self._bounce(x,y,vx,vy,contacts)
+            for c in contacts:
+                kills.append(c[0])
+        speed = self._bspeed.item(i)
+        self._bx[i] = x + vx*speed
+        self._by[i] = y + vy*speed
+        self._bvx[i] = vx
+        self._bvy[i] = vy
+
+    def _bounce(self,x,y,vx,vy,contacts):
+        """Returns: the position and velocity (x,y,vx,vy) of a ball after it
+        bounces off the faces it is touching.
+        If the ball is moving into a face, the velocity across the face is
+        negated (vx for a side, vy for the top or bottom), but each velocity
+        is negated at most once however many faces there are. The ball is
+        pushed out by the deepest contact along each axis, so it no longer
+        overlaps.
+        
+        Parameter: x, y, vx, vy
+        Precondition: must be floats, the position and velocity of the ball
+        
+        Parameter: contacts
+        Precondition: must be a list of tuples (i,nx,ny,depth) as from
+            BrickField.findContacts"""
+        flipx = False
+        flipy = False
+        pushx = 0.0
+        pushy = 0.0
+        for (i,nx,ny,depth) in contacts:
+            if nx != 0:
+                flipx = flipx or vx*nx < 0
+                if depth > abs(pushx):
+                    pushx = nx*depth
+            else:
+                flipy = flipy or vy*ny < 0
+                if depth > abs(pushy):
+                    pushy = ny*depth
+        if flipx:
+            vx = -vx
+        if flipy:
+            vy = -vy
+        return (x+pushx,y+pushy,vx,vy)
+
+    def _updateAllBalls(self):
+        """Helper method to update every ball at once with NumPy.
+        Follows exactly the same rules, in the same order, as
+        _updateSingleBall, but on whole arrays: the walls, then the paddle,
+        then the bricks, which are looked up for all balls at once with
+        BrickField.findContactsMany.  The balls bounce with bounceMany.
+        
+        Returns: array of the bricks hit this frame (possibly repeated)."""
+        r = self._radius
+        x = self._bx
+        y = self._by
+        side = (x+r >= GAME_WIDTH) | (x-r <= 0)
+        vx = np.where(side,-self._bvx,self._bvx)
+        vy = np.where(~side & (y+r >= GAME_HEIGHT),-self._bvy,self._bvy)
+        left, bottom, right, top = self._paddle.getEdges()
+        hit,nx,ny,depth = circleRectContacts(x,y,r,left,bottom,right,top)
+        balls = np.flatnonzero(hit)
+        x,y,vx,vy = bounceMany(x,y,vx,vy,balls,nx[balls],ny[balls],depth[balls])
+        balls,ids,nx,ny,depth = self._field.findContactsMany(x,y,r)
+        x,y,vx,vy = bounceMany(x,y,vx,vy,balls,nx,ny,depth)
+        self._bx = x + vx*self._bspeed
+        self._by = y + vy*self._bspeed
+        self._bvx = vx
+        self._bvy = vy
+        return ids
+
+    def _sweepSingleBall(self,i):
+        """Helper method to update a ball with continuous collision.
+        Rather than checking for overlap and then moving, the ball is swept
+        along its whole move for this frame. It stops at the earliest impact
+        with a wall, the paddle or a brick, bounces off the face it hit
+        (destroying the brick, if any), and then continues with the rest of
+        the move. At most MAX_IMPACTS impacts are handled in one frame.
+        Because nothing is skipped between frames, a fast ball cannot pass
+        through a brick or the paddle. A ball the paddle has moved into
+        before the sweep hits it at the start of the move, like a ball
+        already past a wall (see _sweepWalls): it is pushed out of the
+        paddle and bounces off the face it is in.
+        Balls move at the same speeds as in _updateSingleBall.
+        
+        Parameter: i
+        Precondition: must be an int, the position of the ball in the arrays"""
+        r = self._radius
+        speed = self._bspeed.item(i)
+        x = self._bx.item(i)
+        y = self._by.item(i)
+        vx = self._bvx.item(i)
+        vy = self._bvy.item(i)
+        left, bottom, right, top = self._paddle.getEdges()
+        contact = circleRectContact(x,y,r,left,bottom,right,top)
+        if contact is not None:
+            # The sweep only finds the paddle if the ball starts outside it
+            nx,ny,depth = contact
+            x += nx*depth
+            y += ny*depth
+            if nx != 0:
+                vx = nx*abs(vx)
+            if ny != 0:
+                vy = ny*abs(vy)
+        rest = 1.0
+        for n in range(MAX_IMPACTS):
+            dx = vx*speed*rest
+            dy = vy*speed*rest
+            hit = self._field.sweep(x,y,dx,dy,r)
+            left, bottom, right, top = self._paddle.getEdges()
+            other = sweepCircleRect(x,y,dx,dy,r,left,bottom,right,top)
+            if other is not None and (hit is None or other[0] < hit[0]):
+                hit = other+(None,)
+            other = self._sweepWalls(x,y,dx,dy,r)
+            if other is not None and (hit is None or other[0] < hit[0]):
+                hit = other
+            if hit is None:
+                x += dx
+                y += dy
+                break
+            t,nx,ny,brick = hit
+            x += dx*t
+            y += dy*t
+            if nx != 0:
+                vx = nx*abs(vx)
+            if ny != 0:
+                vy = ny*abs(vy)
+            if brick is not None:
+                self._field.kill(brick)
+            rest *= 1-t
+        self._bx[i] = x
+        self._by[i] = y
+        self._bvx[i] = vx
+        self._bvy[i] = vy
+
+    def _sweepWalls(self,x,y,dx,dy,r):
+        """Returns: the first impact of a ball moving from (x,y) by (dx,dy)
+        with the left, right or top of the screen as a tuple (t,nx,ny,None),
+        or None if it does not reach one during the move. A ball that is
+        already past a wall and still moving out hits it at t=0.
+        
+        Parameter x, y: The starting center of the ball
+        Precondition: ints or floats
+        
+        Parameter dx, dy: The motion of the ball
+        Precondition: ints or floats
+        
+        Parameter r: The radius of the ball
+        Precondition: int or float > 0"""
+        best = None
+        if dx < 0:
+            best = ((r-x)/dx,1,0,None)
+        elif dx > 0:
+            best = ((GAME_WIDTH-r-x)/dx,-1,0,None)
+        if best is not None and best[0] > 1:
+            best = None
+        if dy > 0:
+            t = (GAME_HEIGHT-r-y)/dy
+            if t <= 1 and (best is None or t < best[0]):
+                best = (t,0,-1,None)
+        if best is not None and best[0] < 0:
+            best = (0.0,)+best[1:]
+        return best
+
+    def predictPath(self,i,events=RAYCAST_EVENTS,ticks=RAYCAST_TICKS):
+        """Returns: the list of the next contacts of ball i, as from raycast.
+        
+        Parameter: i
+        Precondition: must be an int, the position of the ball in the arrays
+        
+        Parameter: events, ticks
+        Precondition: as in raycast"""
+        speed = self._bspeed.item(i)
+        return self.raycast(self._bx.item(i),self._by.item(i),self._bvx.item(i)*speed,
+                            self._bvy.item(i)*speed,events,ticks)
+    
+    def raycast(self,x,y,vx,vy,events=RAYCAST_EVENTS,ticks=RAYCAST_TICKS):
+        """Returns: the list of the next contacts of a ball starting at (x,y),
+        in order, without moving anything.
+        
+        Each contact is a tuple (t,kind,x,y,brick): t is the number of ticks
+        from now (a float), (x,y) is the center of the ball at the contact,
+        and kind is 'wall' (the left, right or top of the screen), 'brick'
+        (then brick is its index, and None otherwise), 'paddle', or 'line'
+        when the ball comes down past the top of the paddle without hitting
+        it, which ends the path.  The path also ends after the given number
+        of contacts or ticks.
+        
+        Rather than stepping tick by tick, the ball is swept in one straight
+        move to the next wall, and the bricks and paddle are only searched
+        along that move (see BrickField.sweep), so a query costs a few sweeps
+        per contact.  Bricks hit on the way are treated as destroyed for the
+        rest of the path, as they will be. The path follows the rules of
+        continuous collision (see _sweepSingleBall) and assumes the paddle
+        stays where it is; with discrete collision the contacts may come up
+        to a tick later, since the ball moves a whole tick at a time.
+        
+        Parameter: x, y
+        Precondition: must be floats, the center of the ball
+        
+        Parameter: vx, vy
+        Precondition: must be floats, the distance the ball moves in a tick
+            (its velocity times its speed multiplier)
+        
+        Parameter: events
+        Precondition: must be an int >= 0, the most contacts to find
+        
+        Parameter: ticks
+        Precondition: must be a float >= 0, how far ahead to look"""
+        r = self._radius
+        left, bottom, right, top = self._paddle.getEdges()
+        line = top+r
+        broken = set()
+        path = []
+        now = 0.0
+        while len(path) < events and now < ticks:
+            rest = ticks-now
+            dx = vx*rest
+            dy = vy*rest
+            hit = self._sweepWalls(x,y,dx,dy,r)
+            kind = 'wall'
+            if dy < 0 and y+dy < line <= y:
+                t = (line-y)/dy
+                if hit is None or t < hit[0]:
+                    hit = (t,0,0,None)
+                    kind = 'line'
+            end = 1.0 if hit is None else hit[0]
+            # The bricks and the paddle only need to be searched up to the
+            # next wall, which keeps the box of candidate bricks small
+            other = self._field.sweep(x,y,dx*end,dy*end,r,broken)
+            if other is not None:
+                hit = (other[0]*end,)+other[1:]
+                kind = 'brick'
+            other = sweepCircleRect(x,y,dx*end,dy*end,r,left,bottom,right,top)
+            if other is not None and (kind != 'brick' or other[0]*end < hit[0]):
+                hit = (other[0]*end,other[1],other[2],None)
+                kind = 'paddle'
+            if hit is None:
+                break
+            t,nx,ny,brick = hit
+            x += dx*t
+            y += dy*t
+            now += rest*t
+            path.append((now,kind,x,y,brick))
+            if kind == 'line':
+                break
+            if nx != 0:
+                vx = nx*abs(vx)
+            if ny != 0:
+                vy = ny*abs(vy)
+            if brick is not None:
+                broken.add(brick)
+        return path
+    
     def _checkLostBall(self):
-        """Helper method to check if ball has gone offscreen.
-        In level 1, one ball going off results in losing a try.
-        In level 2, both balls must go offscreen to lose a try."""
-        if (self._ball.getTop() <=0) and self._level == 1:
+        """Helper method to check if balls have gone offscreen.
+        A ball that goes offscreen is taken out of play, and every ball
+        still in play speeds up to BALL_SPEEDUP. Once every ball is
+        offscreen, a try is lost. So in level 1, one ball going off results
+        in losing a try, and in level 2 both balls must go offscreen.
+        With fewer than VECTOR_MIN_BALLS balls, the common case (none lost)
+        is checked on plain floats, which is faster than with NumPy."""
+        if self._by.size < VECTOR_MIN_BALLS:
+            ys = self._by.tolist()
+            if len(ys) == 0 or min(ys)+self._radius > 0:
+                return
+        kept = self._by+self._radius > 0
+        if kept.all():
+            return
+        self._bx = self._bx[kept]
+        self._by = self._by[kept]
+        self._bvx = self._bvx[kept]
+        self._bvy = self._bvy[kept]
+        self._bspeed = np.zeros(self._bx.size)+BALL_SPEEDUP
+        if self._bx.size == 0:
             self._tries -= 1
             self._status = 'oops'
-        if self._level == 2:
-            if (self._ball.getTop() <=0) or (self._ball2.getTop()<=0):
-                self._ball.setCheck('yes')
-                self._ball2.setCheck('yes')
-            if (self._ball.getTop() <=0) and (self._ball2.getTop() <=0):
-                self._tries -= 1
-                self._status = 'oops'         
         
     def serveBall(self):
-        """'Serves' or creates a new ball. 1 ball is served if
-        in Level 1, but 2 are served in Level 2."""
-        if self._level < 2:
-            self._ball = Ball()
-        if self._level == 2:
-            self._ball = Ball()
-            self._ball2 = Ball()
-        
-    def draw(self, view):
-        """Draw method to draw bricks, paddle, balls."""
-        for x in self._bricks:
-            x.draw(view)
-        self._paddle.draw(view)
-        if self._ball is not None:
-            self._ball.draw(view)
-        if self._ball2 is not None:
-            self._ball2.draw(view)
+        """'Serves' or creates new balls, one for each speed in _speeds,
+        which is SERVE_SPEEDS for this level unless others were given.
+        So 1 ball is served in Level 1, but 2 slower ones are served in
+        Level 2."""
+        for speed in self._speeds:
+            self.addBall(speed)
+    
+    def addBall(self,speed=1.0):
+        """Puts one more ball in play, for modes with many balls at once.
+        The new Ball picks the serve velocity, which is copied into the arrays.
+        
+        Parameter: speed
+        Precondition: float > 0, the speed multiplier of the new ball"""
+        ball = Ball(self._getRng(),speed,self._vxrange[0],self._vxrange[1])
+        self._bx = np.append(self._bx,ball.getX())
+        self._by = np.append(self._by,ball.getY())
+        self._bvx = np.append(self._bvx,ball.getxvel())
+        self._bvy = np.append(self._bvy,ball.getyvel())
+        self._bspeed = np.append(self._bspeed,ball.getSpeed())
+    
+    def _getRng(self):
+        """Returns: _rng, about to be used, with the state of the last restore
+        put into it if that was not done yet."""
+        if self._rngstale:
+            unpackRandom(self._rng,self._rngstate)
+            self._rngstale = False
+        self._rngstate = None
+        return self._rng
@@ -0,0 +1,268 @@
+# recording.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Input recording for Breakout
+
+Breakout only asks its input a few questions each physics tick: is 'left' down, is
+'right' down, and is any key down (to move on from a message).  Since a run is also
+seeded (see RANDOM_SEED), those answers are all that is needed to play it again
+exactly.  This module writes them to a small binary file, and reads them back.
+
+Each tick is packed into one byte of bits (see packKeys).  The bits only change when
+the player presses or releases a key, so the ticks are stored as runs: a byte of
+bits and then the number of ticks it lasted, as a varint (7 bits per byte, with the
+high bit set on every byte but the last).  An hour of play is a few thousand runs,
+which is a few kilobytes.  The file starts with a header:
+
+    magic    4 bytes, RECORD_MAGIC
+    version  1 byte, RECORD_VERSION
+    seed     8 bytes, the seed of the run
+    columns  2 bytes, BRICKS_IN_ROW
+    rows     2 bytes, BRICK_ROWS
+    rate     2 bytes, PHYSICS_RATE
+    flags    1 byte, RECORD_CONTINUOUS and RECORD_AUTOPILOT
+
+with every number little-endian.  Like Play, this module does not import game2d."""
+import bisect
+import struct
+from constants import *
+
+
+#: the first bytes of every recording
+RECORD_MAGIC = b'BRKR'
+#: the version of the format written by InputRecorder
+RECORD_VERSION = 1
+#: the layout of the header of a recording
+RECORD_HEADER = struct.Struct('<4sBQHHHB')
+#: the header flag for a run with continuous collision
+RECORD_CONTINUOUS = 1
+#: the header flag for a run played by the autopilot
+RECORD_AUTOPILOT = 2
+#: how many bytes an InputRecorder collects before writing them to its stream
+RECORD_BLOCK = 4096
+
+#: the bits of a recorded tick: the paddle keys, any key (after the time scale
+#: keys are taken out, as Breakout counts them), the time scale keys, and
+#: whether the mouse or a finger is down
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_ANY = 4
+KEY_SLOWER = 8
+KEY_FASTER = 16
+KEY_TOUCH = 32
+
+
+def packKeys(keys,count,keyboard):
+    """Returns: the bits of one tick of input, as an int.
+
+    Parameter: keys
+    Precondition: Must be what Breakout asks about the paddle keys (the GInput,
+        or a controller from controllers.py)
+
+    Parameter: count
+    Precondition: Must be an int >= 0, the number of keys Breakout counted as
+        held this tick
+
+    Parameter: keyboard
+    Precondition: Must be the GInput of the application"""
+    bits = 0
+    if keys.is_key_down('left'):
+        bits |= KEY_LEFT
+    if keys.is_key_down('right'):
+        bits |= KEY_RIGHT
+    if count > 0:
+        bits |= KEY_ANY
+    if keyboard.is_key_down(TIME_SCALE_KEYS[0]):
+        bits |= KEY_SLOWER
+    if keyboard.is_key_down(TIME_SCALE_KEYS[1]):
+        bits |= KEY_FASTER
+    if keyboard.is_touch_down():
+        bits |= KEY_TOUCH
+    return bits
+
+
+def _putVarint(buffer,n):
+    """Adds the int n >= 0 to the bytearray buffer as a varint."""
+    while n >= 0x80:
+        buffer.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buffer.append(n)
+
+
+def _getVarint(data,pos):
+    """Returns: the tuple (n,pos) of the varint at position pos of the bytearray
+    data and the position just after it.
+
+    Raises ValueError if data ends in the middle of it."""
+    n = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('recording ends in the middle of a run')
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (n,pos)
+        shift += 7
+
+
+class InputRecorder(object):
+    """An instance writes the input of a run to a stream, one tick at a time.
+
+    Recording a tick costs a comparison and an addition unless the input
+    changed, and the stream is only written a block at a time.
+
+    INSTANCE ATTRIBUTES:
+        _stream [binary file, or None once closed]: where the recording goes
+        _buffer [bytearray]: the bytes not yet written to _stream
+        _bits   [int, or None before the first tick]: the bits of the current run
+        _count  [int >= 0]: the number of ticks in the current run
+        _ticks  [int >= 0]: the number of ticks recorded
+    """
+
+    def getTicks(self):
+        return self._ticks
+
+    def __init__(self,stream,seed,continuous=CONTINUOUS_COLLISION,autopilot=AUTOPILOT):
+        """Initializer to start a recording with its header.
+
+        Parameter: stream
+        Precondition: Must be a file (or similar) open for writing bytes; the
+            recorder closes it in close
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, the seed of the run
+
+        Parameter: continuous, autopilot
+        Precondition: Must be bools, whether the run uses continuous collision
+            and whether the autopilot plays it"""
+        flags = 0
+        if continuous:
+            flags |= RECORD_CONTINUOUS
+        if autopilot:
+            flags |= RECORD_AUTOPILOT
+        self._stream = stream
+        self._buffer = bytearray(RECORD_HEADER.pack(RECORD_MAGIC,RECORD_VERSION,seed,
+                                                    BRICKS_IN_ROW,BRICK_ROWS,PHYSICS_RATE,
+                                                    flags))
+        self._bits = None
+        self._count = 0
+        self._ticks = 0
+
+    def record(self,bits):
+        """Adds one tick of input to the recording.
+
+        Parameter: bits
+        Precondition: Must be an int from 0 to 255, as from packKeys"""
+        self._ticks += 1
+        if bits == self._bits:
+            self._count += 1
+            return
+        self._endRun()
+        self._bits = bits
+        self._count = 1
+
+    def close(self):
+        """Writes the rest of the recording and closes the stream.  Nothing
+        more may be recorded."""
+        if self._stream is None:
+            return
+        self._endRun()
+        self._stream.write(bytes(self._buffer))
+        self._stream.close()
+        self._stream = None
+
+    def _endRun(self):
+        """Helper method to add the current run to _buffer, and to write
+        _buffer once it holds a block."""
+        if self._count == 0:
+            return
+        self._buffer.append(self._bits)
+        _putVarint(self._buffer,self._count)
+        self._count = 0
+        if len(self._buffer) >= RECORD_BLOCK:
+            self._stream.write(bytes(self._buffer))
+            del self._buffer[:]
+
+
+class InputRecording(object):
+    """An instance is a recording read back, with the input of any tick.
+
+    INSTANCE ATTRIBUTES:
+        _seed    [int >= 0]: the seed of the run
+        _columns [int > 0]: BRICKS_IN_ROW in the run
+        _rows    [int > 0]: BRICK_ROWS in the run
+        _rate    [int > 0]: PHYSICS_RATE in the run
+        _flags   [int >= 0]: RECORD_CONTINUOUS and RECORD_AUTOPILOT, or'ed
+        _bits    [list of ints]: the bits of each run
+        _starts  [list of ints]: the first tick of each run (in order)
+        _ticks   [int >= 0]: the number of ticks recorded
+    """
+
+    def getSeed(self):
+        return self._seed
+    def getColumns(self):
+        return self._columns
+    def getRows(self):
+        return self._rows
+    def getRate(self):
+        return self._rate
+    def isContinuous(self):
+        return bool(self._flags & RECORD_CONTINUOUS)
+    def isAutopilot(self):
+        return bool(self._flags & RECORD_AUTOPILOT)
+    def getTicks(self):
+        return self._ticks
+    def getRuns(self):
+        return len(self._bits)
+
+    def __init__(self,data):
+        """Initializer to read a recording.
+
+        Raises ValueError if data is not a whole recording of this version.
+
+        Parameter: data
+        Precondition: Must be a bytes string, as written by InputRecorder"""
+        data = bytearray(data)
+        if len(data) < RECORD_HEADER.size:
+            raise ValueError('recording is too short')
+        (magic,version,self._seed,self._columns,self._rows,self._rate,
+         self._flags) = RECORD_HEADER.unpack(bytes(data[:RECORD_HEADER.size]))
+        if magic != RECORD_MAGIC or version != RECORD_VERSION:
+            raise ValueError('not a recording of version %d' % RECORD_VERSION)
+        self._bits = []
+        self._starts = []
+        self._ticks = 0
+        pos = RECORD_HEADER.size
+        while pos < len(data):
+            bits = data[pos]
+            (count,pos) = _getVarint(data,pos+1)
+            self._bits.append(bits)
+            self._starts.append(self._ticks)
+            self._ticks += count
+
+    def getBits(self,tick):
+        """Returns: the bits of the given tick, as from packKeys.
+
+        Parameter: tick
+        Precondition: Must be an int with 0 <= tick < getTicks()"""
+        return self._bits[bisect.bisect_right(self._starts,tick)-1]
+
+    def isConfigured(self):
+        """Returns: True if the brick and physics constants are those of the
+        recorded run, so it plays the same here."""
+        return (self._columns == BRICKS_IN_ROW and self._rows == BRICK_ROWS
+                and self._rate == PHYSICS_RATE)
+
+
+def loadRecording(filename):
+    """Returns: the InputRecording in the file filename.
+
+    Parameter: filename
+    Precondition: Must be the name of a file written by an InputRecorder"""
+    stream = open(filename,'rb')
+    try:
+        return InputRecording(stream.read())
+    finally:
+        stream.close()
@@ -0,0 +1,262 @@
+# replay.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Replays of recorded runs of Breakout
+
+A recording (see recording.py) holds the seed of a run and the input of every physics
+tick, and a Session plays a run from exactly those, so a run can be played again
+without a window, as fast as the computer allows:
+
+    python replay.py run.rec
+
+plays it to the end and prints how it ended, with a hash of the state of every tick
+(two replays with the same hash played the same).  With --seek N it also jumps to
+tick N, and with --check it makes sure the jump lands in the same state as playing
+there tick by tick:
+
+    python replay.py run.rec --seek 100000 --check
+
+Jumping is fast because a ReplayPlayer keeps a checkpoint (a snapshot of the whole
+session, see Session.snapshot) every REPLAY_CHECKPOINT_TICKS ticks as it plays.  A seek starts from the
+last checkpoint at or before the tick and plays the rest, which is never more than
+REPLAY_CHECKPOINT_TICKS ticks.
+
+To watch a recording instead, at any time scale, use
+
+    python breakout.py --replay run.rec"""
+from __future__ import print_function
+import argparse
+import hashlib
+from timeit import default_timer as clock
+from constants import *
+from recording import *
+from session import *
+
+
+class ReplayInput(object):
+    """An instance answers the questions Session asks its input from a
+    recording, one tick at a time, as the GInput of game2d would have.
+
+    Only the paddle keys and whether any key is down are recorded, so no
+    other key is ever down.  After the last recorded tick no key is down.
+
+    INSTANCE ATTRIBUTES:
+        key_count  [int, 0 or 1]: 1 if any key was down at the current tick
+        _recording [InputRecording]: the recording read from
+        _tick      [int >= 0]: the current tick
+        _bits      [int]: the bits of the current tick (see packKeys), or 0
+                   after the last tick
+    """
+
+    def getTick(self):
+        return self._tick
+
+    def __init__(self,recording,tick=0):
+        """Initializer to read recording from the given tick.
+
+        Parameter: recording
+        Precondition: Must be an InputRecording
+
+        Parameter: tick
+        Precondition: Must be an int >= 0"""
+        self._recording = recording
+        self.setTick(tick)
+
+    def setTick(self,tick):
+        """Moves to the given tick.
+
+        Parameter: tick
+        Precondition: Must be an int >= 0"""
+        self._tick = tick
+        self._bits = 0
+        if tick < self._recording.getTicks():
+            self._bits = self._recording.getBits(tick)
+        self.key_count = 1 if self._bits & KEY_ANY else 0
+
+    def tick(self):
+        """Moves on to the next tick."""
+        self.setTick(self._tick+1)
+
+    def isOver(self):
+        """Returns: True if the current tick is past the end of the recording."""
+        return self._tick >= self._recording.getTicks()
+
+    def is_key_down(self,key):
+        """Returns: True if key was down at the current tick.
+
+        Parameter: key
+        Precondition: Must be a string, the name of a key"""
+        if key == 'left':
+            return bool(self._bits & KEY_LEFT)
+        if key == 'right':
+            return bool(self._bits & KEY_RIGHT)
+        return False
+
+
+class ReplayPlayer(object):
+    """An instance plays a recording through a Session, and can seek to any tick.
+
+    As it plays, it takes a snapshot of the session every _interval ticks.
+    Seeking to a tick restores the last snapshot at or before it (unless the
+    session is already between that one and the tick) and plays on from
+    there.  The snapshots are only taken the first time a tick is played,
+    so seeking back
+    and forth costs nothing more, but seeking past every tick played so far
+    must play the ticks in between (see prepare).
+
+    INSTANCE ATTRIBUTES:
+        _recording   [InputRecording]: the recording played
+        _interval    [int > 0]: the number of ticks between checkpoints
+        _session     [Session]: the run, played up to tick getTick()
+        _input       [ReplayInput]: the input of the next tick, kept at the
+                     same tick as _session
+        _checkpoints [list of bytes strings]: checkpoint k is a snapshot of
+                     _session at tick k*_interval, for every such tick played
+                     so far
+    """
+
+    def getRecording(self):
+        return self._recording
+    def getSession(self):
+        return self._session
+    def getTick(self):
+        return self._session.getTicks()
+    def getCheckpoints(self):
+        return len(self._checkpoints)
+
+    def __init__(self,recording,interval=REPLAY_CHECKPOINT_TICKS):
+        """Initializer to start a replay at tick 0.
+
+        Raises ValueError if recording was made with other brick or physics
+        constants, since it would not play the same.
+
+        Parameter: recording
+        Precondition: Must be an InputRecording
+
+        Parameter: interval
+        Precondition: Must be an int > 0, the number of ticks between checkpoints"""
+        if not recording.isConfigured():
+            raise ValueError('recording is of %d x %d bricks at %d ticks per second'
+                             % (recording.getColumns(),recording.getRows(),
+                                recording.getRate()))
+        self._recording = recording
+        self._interval = interval
+        self._session = Session(recording.getSeed(),recording.isContinuous())
+        self._input = ReplayInput(recording)
+        self._checkpoints = [self._session.snapshot()]
+
+    def isOver(self):
+        """Returns: True if every recorded tick has been played."""
+        return self._input.isOver()
+
+    def step(self):
+        """Returns: the state that the next tick was played in, after playing it."""
+        state = self._session.tick(self._input,self._input.key_count)
+        self._input.tick()
+        tick = self._session.getTicks()
+        if tick == len(self._checkpoints)*self._interval:
+            self._checkpoints.append(self._session.snapshot())
+        return state
+
+    def prepare(self):
+        """Plays every recorded tick not yet played, so that every checkpoint
+        is made, and then goes back to the current tick.  After this, a seek
+        to any recorded tick plays at most _interval ticks."""
+        tick = self.getTick()
+        self.seek(self._recording.getTicks())
+        self.seek(tick)
+
+    def seek(self,tick):
+        """Moves the replay to the given tick, so that the next tick played
+        is that one.
+
+        Parameter: tick
+        Precondition: Must be an int >= 0"""
+        k = min(tick//self._interval,len(self._checkpoints)-1)
+        if not (k*self._interval <= self.getTick() <= tick):
+            self._session.restore(self._checkpoints[k])
+            self._input.setTick(k*self._interval)
+        while self.getTick() < tick:
+            self.step()
+
+
+def sessionState(session):
+    """Returns: the state of session as a tuple: its state and number of ticks,
+    and the balls, paddle, bricks and tries of its game, if it has one.
+
+    Parameter: session
+    Precondition: Must be a Session"""
+    game = session.getGame()
+    if game is None:
+        return (session.getState(),session.getTicks())
+    xs, ys = game.getBallPositions()
+    return (session.getState(),session.getTicks(),tuple(xs.tolist()),tuple(ys.tolist()),
+            game.getPaddle().getX(),game.getBrickLength(),game.getTries())
+
+
+def main(argv=None):
+    """Replays the recording named on the command line and prints how it
+    went, and checks and times a seek if one is asked for.
+
+    Parameter: argv
+    Precondition: Must be a list of strings (the arguments after the program
+        name), or None to use sys.argv"""
+    parser = argparse.ArgumentParser(description='Replay a recorded run of Breakout '
+                                     'without a window.')
+    parser.add_argument('file',help='the recording, as written by breakout.py --record')
+    parser.add_argument('--seek',type=int,default=None,metavar='TICK',
+                        help='after playing, jump to this tick and time it')
+    parser.add_argument('--check',action='store_true',
+                        help='check that the jump lands in the same state as '
+                        'playing to the tick from the start')
+    parser.add_argument('--interval',type=int,default=REPLAY_CHECKPOINT_TICKS,
+                        help='the number of ticks between checkpoints '
+                        '(default %d)' % REPLAY_CHECKPOINT_TICKS)
+    args = parser.parse_args(argv)
+    if args.interval < 1 or (args.seek is not None and args.seek < 0):
+        parser.error('--interval must be positive and --seek must not be negative')
+
+    recording = loadRecording(args.file)
+    try:
+        player = ReplayPlayer(recording,args.interval)
+    except ValueError as e:
+        parser.error('%s; run it with the same BRICKS_IN_ROW and BRICK_ROWS' % e)
+
+    digest = hashlib.md5()
+    states = []
+    start = clock()
+    while not player.isOver():
+        player.step()
+        state = sessionState(player.getSession())
+        digest.update(repr(state).encode())
+        if args.check and player.getTick() == args.seek:
+            states.append(state)
+    elapsed = max(clock()-start,1e-9)
+    session = player.getSession()
+    print('%d ticks (%d runs) of seed %d%s' % (recording.getTicks(),recording.getRuns(),
+          recording.getSeed(),', on autopilot' if recording.isAutopilot() else ''))
+    print('played in %.3f s: %.0f ticks/sec, %d checkpoints'
+          % (elapsed,player.getTick()/elapsed,player.getCheckpoints()))
+    print('ended in state %d, level %d, game %d' % (session.getState(),
+          session.getLevel(),session.getGameNumber()))
+    print('state hash %s' % digest.hexdigest())
+
+    if args.seek is not None:
+        start = clock()
+        player.seek(args.seek)
+        elapsed = clock()-start
+        print('seek to tick %d in %.1f ms' % (args.seek,elapsed*1000))
+        if args.check:
+            if len(states) == 0:
+                # the tick is past the end (or is 0): play there from the start
+                linear = ReplayPlayer(recording,args.interval)
+                while linear.getTick() < args.seek:
+                    linear.step()
+                states.append(sessionState(linear.getSession()))
+            same = sessionState(player.getSession()) == states[0]
+            print('seek %s playing there' % ('matches' if same else 'DOES NOT match'))
+
+
+# Application code
+if __name__ == '__main__':
+    main()
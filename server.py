@@ -0,0 +1,739 @@
+# server.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""A game server for Breakout, for tournaments played over the network
+
+The server plays a game (a Play) for every client at PHYSICS_RATE ticks a second.
+A client only sends the keys its player holds down, and shows the state the server
+sends back, so nobody can play any other game than the server does.
+
+Each tick, the server sends every client the state of its game: the paddle, the balls,
+the bricks and the tries.  Rather than all of it, the state is sent as the change
+from the last state the client acknowledged: the bricks broken since (one index each,
+and usually none), and how far the paddle and each ball moved, in 1/16 of a pixel.
+A packet is then about 30 bytes, under 2 KB/s per client.  A client that has not
+acknowledged anything in the last SERVER_HISTORY_TICKS ticks (or just joined) gets a
+whole state, which also only takes about 40 bytes plus a bit a brick.  Every packet
+carries a checksum of the whole state, so a client knows it put the state together
+right.
+
+To test it on this computer, with two clients and packets lost on the way:
+
+    python server.py --clients 2 --frames 1800 --loss 0.1
+
+runs the server and the clients in processes of their own, and checks that each
+client ends with the state its game has on the server.  To only run a server, or
+only a client of a server that is running already, use --serve or --connect."""
+from __future__ import print_function
+import argparse
+import multiprocessing
+import random
+import struct
+import time
+import zlib
+from timeit import default_timer as clock
+import numpy as np
+from constants import *
+from play import *
+from recording import KEY_LEFT, KEY_RIGHT
+from netplay import KeyBits, Link
+
+
+#: the first bytes of a packet from the server
+STATE_MAGIC = b'BRKS'
+#: the first bytes of a packet from a client
+INPUT_MAGIC = b'BRKC'
+#: the layout of the start of a packet from the server: the magic, the tick
+#: of the state, the tick of the state it is the change from (or NO_TICK),
+#: the checksum of the state (see FrameState.checksum), flags (STATE_FULL and
+#: STATE_FINAL), the tries left, the number of balls, and the number of
+#: bricks that changed
+STATE_PACKET = struct.Struct('<4sIIIBBBB')
+#: the layout of a packet from a client: the magic, the tick of the last
+#: state it has (or NO_TICK), and the keys held down (KEY_LEFT and KEY_RIGHT)
+INPUT_PACKET = struct.Struct('<4sIB')
+#: the layout of a position, or of how far it moved
+POSITION = struct.Struct('<h')
+#: the layout of the index of a brick that changed
+BRICK_INDEX = struct.Struct('<H')
+#: a tick that means no state at all
+NO_TICK = 0xFFFFFFFF
+#: in the flags of a packet from the server, the state is whole, not a change
+STATE_FULL = 1
+#: in the flags of a packet from the server, the server has stopped
+STATE_FINAL = 2
+#: the most bricks a change can list; past that the whole state is sent
+MAX_CHANGES = 255
+#: positions are kept within this many units (of 1/SERVER_POSITION_SCALE of a
+#: pixel) of 0, so that how far one moved always fits in a POSITION
+POSITION_LIMIT = 16383
+
+
+class FrameState(object):
+    """An instance is the state of a game at a tick, as a client sees it.
+
+    Positions are whole numbers of 1/SERVER_POSITION_SCALE of a pixel, so
+    the server and the client have exactly the same numbers.
+
+    INSTANCE ATTRIBUTES:
+        _tick   [int >= 0]: the tick of the state
+        _paddle [int]: the x coordinate of the center of the paddle
+        _balls  [int16 array of shape (n,2)]: the (x,y) of the center of each ball
+        _alive  [bool array]: which bricks are alive
+        _tries  [int >= 0]: the tries left
+    """
+
+    def getTick(self):
+        return self._tick
+    def getPaddle(self):
+        return self._paddle
+    def getBalls(self):
+        return self._balls
+    def getAliveMask(self):
+        return self._alive
+    def getTries(self):
+        return self._tries
+
+    def __init__(self,tick,paddle,balls,alive,tries):
+        """Initializer to make a state out of its parts.
+
+        Parameter: tick, paddle, tries
+        Precondition: Must be ints, as the attributes
+
+        Parameter: balls
+        Precondition: Must be an int16 array of shape (n,2)
+
+        Parameter: alive
+        Precondition: Must be a bool array, which must not be changed after"""
+        self._tick = tick
+        self._paddle = paddle
+        self._balls = balls
+        self._alive = alive
+        self._tries = tries
+
+    def getPaddleX(self):
+        """Returns: the x coordinate of the center of the paddle, in pixels."""
+        return self._paddle/float(SERVER_POSITION_SCALE)
+
+    def getBallPositions(self):
+        """Returns: the arrays (xs,ys) of the centers of the balls, in pixels."""
+        balls = self._balls/float(SERVER_POSITION_SCALE)
+        return (balls[:,0],balls[:,1])
+
+    def getBrickLength(self):
+        """Returns: the number of bricks alive."""
+        return int(np.count_nonzero(self._alive))
+
+    def checksum(self):
+        """Returns: the CRC-32 of the whole state but its tick."""
+        data = b''.join((POSITION.pack(self._paddle),struct.pack('<B',self._tries),
+                         self._balls.astype('<i2').tobytes(),np.packbits(self._alive).tobytes()))
+        return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def _quantize(values):
+    """Returns: the array values, in pixels, as whole numbers of
+    1/SERVER_POSITION_SCALE of a pixel within POSITION_LIMIT of 0."""
+    return np.clip(np.rint(np.asarray(values)*SERVER_POSITION_SCALE),
+                   -POSITION_LIMIT,POSITION_LIMIT).astype(np.int16)
+
+
+def captureState(game,tick,last=None):
+    """Returns: the FrameState of game at tick.
+
+    Parameter: game
+    Precondition: Must be a Play
+
+    Parameter: tick
+    Precondition: Must be an int >= 0
+
+    Parameter: last
+    Precondition: Must be the FrameState of game at an earlier tick, whose
+        bricks array is shared if no brick changed since, or None"""
+    alive = game.getField().getAliveMask()
+    if last is not None and np.array_equal(last.getAliveMask(),alive):
+        alive = last.getAliveMask()
+    else:
+        alive = alive.copy()
+    xs, ys = game.getBallPositions()
+    balls = _quantize(np.column_stack((xs,ys)).reshape(-1,2))
+    return FrameState(tick,int(_quantize(game.getPaddle().getX())),balls,alive,
+                      game.getTries())
+
+
+def encodeState(state,base=None,flags=0):
+    """Returns: the packet that sends state to a client that has base.
+
+    It holds how far the paddle and the balls moved since base (ball k from
+    ball k of base, or from 0 if base had fewer balls) and the indices of the
+    bricks that changed.  Without a base, or if too many bricks changed, the
+    positions are sent from 0 and all the bricks as one bit each.
+
+    Parameter: state
+    Precondition: Must be a FrameState
+
+    Parameter: base
+    Precondition: Must be a FrameState with as many bricks, or None
+
+    Parameter: flags
+    Precondition: Must be an int, STATE_FINAL or 0"""
+    changed = None
+    if base is not None:
+        changed = np.flatnonzero(state.getAliveMask() != base.getAliveMask())
+        if changed.size > MAX_CHANGES:
+            base = None
+    balls = state.getBalls().astype(np.int32)
+    paddle = state.getPaddle()
+    if base is None:
+        flags |= STATE_FULL
+        bricks = np.packbits(state.getAliveMask()).tobytes()
+        count = 0
+    else:
+        old = base.getBalls()
+        shared = min(len(old),len(balls))
+        balls[:shared] -= old[:shared]
+        paddle -= base.getPaddle()
+        bricks = changed.astype('<u2').tobytes()
+        count = changed.size
+    head = STATE_PACKET.pack(STATE_MAGIC,state.getTick(),
+                             NO_TICK if base is None else base.getTick(),
+                             state.checksum(),flags,state.getTries(),len(balls),count)
+    return b''.join((head,POSITION.pack(paddle),balls.astype('<i2').tobytes(),bricks))
+
+
+def decodeState(data,bases,bricks):
+    """Returns: the tuple (state,flags) of the packet data from the server.
+
+    Raises ValueError if data is not a packet from the server, if its base is
+    not in bases, or if the state put together does not match its checksum.
+
+    Parameter: data
+    Precondition: Must be a bytes string
+
+    Parameter: bases
+    Precondition: Must be a dictionary of FrameStates, by their ticks
+
+    Parameter: bricks
+    Precondition: Must be an int > 0, the number of bricks in a game"""
+    if len(data) < STATE_PACKET.size:
+        raise ValueError('packet is too short')
+    (magic,tick,base,checksum,flags,tries,count,changes) = STATE_PACKET.unpack_from(data)
+    if magic != STATE_MAGIC:
+        raise ValueError('packet is not from the server')
+    pos = STATE_PACKET.size
+    size = POSITION.size*(1+2*count)
+    if flags & STATE_FULL:
+        size += (bricks+7)//8
+    else:
+        size += BRICK_INDEX.size*changes
+    if len(data) != pos+size:
+        raise ValueError('packet is not of the right length')
+    paddle = POSITION.unpack_from(data,pos)[0]
+    pos += POSITION.size
+    balls = np.frombuffer(data,'<i2',2*count,pos).astype(np.int32).reshape(count,2)
+    pos += 2*count*POSITION.size
+    if flags & STATE_FULL:
+        alive = np.unpackbits(np.frombuffer(data,np.uint8,offset=pos))[:bricks].astype(bool)
+    else:
+        if base not in bases:
+            raise ValueError('state %d is gone' % base)
+        old = bases[base]
+        shared = min(len(old.getBalls()),count)
+        balls[:shared] += old.getBalls()[:shared]
+        paddle += old.getPaddle()
+        alive = old.getAliveMask()
+        if changes > 0:
+            indices = np.frombuffer(data,'<u2',changes,pos)
+            if indices.max() >= alive.size:
+                raise ValueError('brick %d is not in the game' % indices.max())
+            alive = alive.copy()
+            alive[indices] ^= True
+    if abs(paddle) > POSITION_LIMIT or (count > 0 and np.abs(balls).max() > POSITION_LIMIT):
+        raise ValueError('state %d is off the screen' % tick)
+    state = FrameState(tick,paddle,balls.astype(np.int16),alive,tries)
+    if state.checksum() != checksum:
+        raise ValueError('state %d does not match its checksum' % tick)
+    return (state,flags)
+
+
+class ClientSlot(object):
+    """An instance is a client of a GameServer, and its game.
+
+    INSTANCE ATTRIBUTES:
+        _game    [Play]: the game of the client
+        _bits    [int]: the keys the client holds down (KEY_LEFT and KEY_RIGHT)
+        _acked   [int]: the tick of the last state the client has, or NO_TICK
+        _states  [dictionary]: each key is a tick of the last
+                 SERVER_HISTORY_TICKS and each value is the state sent then
+        _last    [FrameState or None]: the last state sent
+        _heard   [float]: the clock() time the client was last heard from
+        _sent    [int >= 0]: the number of packets sent to the client
+        _full    [int >= 0]: how many of them held the whole state
+        _bytes   [int >= 0]: the number of bytes sent to the client
+    """
+
+    def getGame(self):
+        return self._game
+    def getLast(self):
+        return self._last
+    def getSent(self):
+        return self._sent
+    def getFull(self):
+        return self._full
+    def getBytes(self):
+        return self._bytes
+
+    def __init__(self,game,now):
+        """Initializer to start the client at clock() time now.
+
+        Parameter: game
+        Precondition: Must be a Play, with the ball served
+
+        Parameter: now
+        Precondition: Must be a float"""
+        self._game = game
+        self._bits = 0
+        self._acked = NO_TICK
+        self._states = {}
+        self._last = None
+        self._heard = now
+        self._sent = 0
+        self._full = 0
+        self._bytes = 0
+
+    def hear(self,ack,bits,now):
+        """Takes in a packet from the client.  A packet that acknowledges an
+        older state than one before it came late, and is ignored.
+
+        Parameter: ack
+        Precondition: Must be an int, the tick of the last state the client
+            has, or NO_TICK
+
+        Parameter: bits
+        Precondition: Must be an int, the keys the client holds down
+
+        Parameter: now
+        Precondition: Must be a float, the clock() time"""
+        if ack != NO_TICK and self._acked != NO_TICK and ack < self._acked:
+            return
+        if ack == NO_TICK or ack in self._states:
+            self._acked = ack
+        self._bits = bits
+        self._heard = now
+
+    def isQuiet(self,now):
+        """Returns: True if the client has not been heard from for SERVER_TIMEOUT
+        seconds at clock() time now.
+
+        Parameter: now
+        Precondition: Must be a float"""
+        return now-self._heard > SERVER_TIMEOUT
+
+    def play(self,keys):
+        """Plays a tick of the game with the keys of the client, serving again
+        when the ball is lost, unless the game is over.
+
+        Parameter: keys
+        Precondition: Must be a KeyBits, which is reused"""
+        game = self._game
+        if game.getBrickLength() == 0 or game.getTries() == 0:
+            return
+        keys.bits = self._bits
+        game.updatePaddle(keys)
+        game.updateBall()
+        if game.getStatus() == 'oops' and game.getTries() > 0:
+            game.setStatus(None)
+            game.serveBall()
+
+    def packet(self,tick,flags=0):
+        """Returns: the packet that sends the state of the game at tick, as the
+        change from the last state the client acknowledged.
+
+        Parameter: tick
+        Precondition: Must be an int >= 0, the tick of the server
+
+        Parameter: flags
+        Precondition: Must be an int, STATE_FINAL or 0"""
+        if self._last is None or self._last.getTick() != tick:
+            self._last = captureState(self._game,tick,self._last)
+            self._states[tick] = self._last
+            self._states.pop(tick-SERVER_HISTORY_TICKS,None)
+        data = encodeState(self._last,self._states.get(self._acked),flags)
+        self._sent += 1
+        self._bytes += len(data)
+        if STATE_PACKET.unpack_from(data)[4] & STATE_FULL:
+            self._full += 1
+        return data
+
+
+class GameServer(object):
+    """An instance plays the game of every client that sends it input, and
+    sends each client the state of its game every tick.
+
+    Every game is a Play of the same level and seed, started when its
+    client is first heard from.  A client not heard from for SERVER_TIMEOUT
+    seconds is forgotten, with its game.
+
+    INSTANCE ATTRIBUTES:
+        _link       [Link]: where the packets go, with no one peer
+        _level      [int]: the level of the games (1 or 2)
+        _seed       [int >= 0]: the seed of the games
+        _continuous [bool]: whether the games use continuous collision
+        _tick       [int >= 0]: the number of ticks played
+        _clients    [dictionary]: each key is the address (host,port) of a
+                    client and each value is its ClientSlot
+        _keys       [KeyBits]: reused for the keys of each client
+    """
+
+    def getTick(self):
+        return self._tick
+    def getClients(self):
+        return self._clients
+
+    def __init__(self,link,level,seed,continuous=CONTINUOUS_COLLISION):
+        """Initializer to start a server with no clients.
+
+        Parameter: link
+        Precondition: Must be a Link with no peer
+
+        Parameter: level
+        Precondition: Must be an int (either 1 or 2)
+
+        Parameter: seed
+        Precondition: Must be an int >= 0
+
+        Parameter: continuous
+        Precondition: Must be a bool"""
+        self._link = link
+        self._level = level
+        self._seed = seed
+        self._continuous = continuous
+        self._tick = 0
+        self._clients = {}
+        self._keys = KeyBits()
+
+    def update(self,final=False):
+        """Takes in the packets of the clients, plays a tick of every game,
+        and sends every client its state.
+
+        Parameter: final
+        Precondition: Must be a bool, True to play no tick and send the last
+            states again, marked STATE_FINAL"""
+        now = clock()
+        for (data,address) in self._link.receiveFrom():
+            if len(data) != INPUT_PACKET.size:
+                continue
+            (magic,ack,bits) = INPUT_PACKET.unpack(data)
+            if magic != INPUT_MAGIC:
+                continue
+            if address not in self._clients:
+                game = Play(self._level,self._continuous,seed=self._seed)
+                game.serveBall()
+                self._clients[address] = ClientSlot(game,now)
+            self._clients[address].hear(ack,bits,now)
+        for address in [a for a in self._clients if self._clients[a].isQuiet(now)]:
+            del self._clients[address]
+        if not final:
+            for slot in self._clients.values():
+                slot.play(self._keys)
+            self._tick += 1
+        flags = STATE_FINAL if final else 0
+        for address in self._clients:
+            self._link.send(self._clients[address].packet(self._tick,flags),address)
+        self._link.poll()
+
+
+class GameClient(object):
+    """An instance is a client of a GameServer: it sends the keys held down
+    and puts together the states the server sends back.
+
+    INSTANCE ATTRIBUTES:
+        _link   [Link]: where the packets go, with the server as the peer
+        _bricks [int > 0]: the number of bricks in a game
+        _states [dictionary]: each key is a tick of the last
+                SERVER_HISTORY_TICKS before that of _state and each value is
+                the state then, as the server may send a change from any of them
+        _state  [FrameState or None]: the latest state, or None before the first
+        _final  [bool]: True once the server has stopped
+        _full   [int >= 0]: the number of whole states taken in
+        _deltas [int >= 0]: the number of changes taken in
+        _errors [int >= 0]: the number of packets that could not be taken in
+    """
+
+    def getState(self):
+        return self._state
+    def isFinal(self):
+        return self._final
+    def getFull(self):
+        return self._full
+    def getDeltas(self):
+        return self._deltas
+    def getErrors(self):
+        return self._errors
+
+    def __init__(self,link):
+        """Initializer to start a client with no state.
+
+        Parameter: link
+        Precondition: Must be a Link to the server"""
+        self._link = link
+        self._bricks = BRICKS_IN_ROW*BRICK_ROWS
+        self._states = {}
+        self._state = None
+        self._final = False
+        self._full = 0
+        self._deltas = 0
+        self._errors = 0
+
+    def update(self,bits):
+        """Takes in the states the server sent, and sends it the keys held down
+        and the tick of the latest state.
+
+        Parameter: bits
+        Precondition: Must be an int, the keys held down (KEY_LEFT and KEY_RIGHT)"""
+        for data in self._link.receive():
+            try:
+                (state,flags) = decodeState(data,self._states,self._bricks)
+            except ValueError:
+                self._errors += 1
+                continue
+            if flags & STATE_FULL:
+                self._full += 1
+            else:
+                self._deltas += 1
+            self._final = self._final or bool(flags & STATE_FINAL)
+            tick = state.getTick()
+            self._states[tick] = state
+            if self._state is None or tick > self._state.getTick():
+                self._state = state
+                for old in [t for t in self._states if t <= tick-SERVER_HISTORY_TICKS]:
+                    del self._states[old]
+        ack = NO_TICK if self._state is None else self._state.getTick()
+        self._link.send(INPUT_PACKET.pack(INPUT_MAGIC,ack,bits))
+        self._link.poll()
+
+
+def chaseBits(state):
+    """Returns: the keys that move the paddle of state under its lowest ball,
+    or no keys if there is no ball.
+
+    Parameter: state
+    Precondition: Must be a FrameState, or None"""
+    if state is None or len(state.getBalls()) == 0:
+        return 0
+    xs, ys = state.getBallPositions()
+    target = xs[np.argmin(ys)]
+    paddle = state.getPaddleX()
+    if target < paddle-PADDLE_WIDTH/4.0:
+        return KEY_LEFT
+    if target > paddle+PADDLE_WIDTH/4.0:
+        return KEY_RIGHT
+    return 0
+
+
+def runServer(frames,level,seed,port=SERVER_PORT,delay=0.0,jitter=0.0,loss=0.0,
+              linger=1.0):
+    """Returns: a dictionary of how the server went, after playing frames
+    ticks at PHYSICS_RATE ticks per second, and then sending the last states
+    again for linger seconds.
+
+    Parameter: frames
+    Precondition: Must be an int > 0, or None to play until stopped
+
+    Parameter: level, seed
+    Precondition: Must be as in GameServer
+
+    Parameter: port
+    Precondition: Must be an int, the UDP port of the server
+
+    Parameter: delay, jitter, loss
+    Precondition: Must be as in Link, for the packets the server sends
+
+    Parameter: linger
+    Precondition: Must be a float >= 0"""
+    link = Link(port,None,delay,jitter,loss,seed)
+    server = GameServer(link,level,seed)
+    worst = 0.0
+    spent = 0.0
+    clients = {}
+    due = clock()
+    try:
+        while frames is None or server.getTick() < frames:
+            now = clock()
+            if now < due:
+                time.sleep(due-now)
+            due += PHYSICS_TICK
+            began = clock()
+            server.update()
+            took = clock()-began
+            worst = max(worst,took)
+            spent += took
+            clients.update(server.getClients())
+        stop = clock()+linger
+        while clock() < stop:
+            server.update(True)
+            clients.update(server.getClients())
+            time.sleep(PHYSICS_TICK)
+    finally:
+        link.close()
+    results = []
+    for address in sorted(clients):
+        slot = clients[address]
+        state = slot.getLast()
+        results.append({'port': address[1], 'sent': slot.getSent(), 'full': slot.getFull(),
+                        'bytes': slot.getBytes(), 'tick': state.getTick(),
+                        'checksum': state.checksum(), 'bricks': state.getBrickLength(),
+                        'tries': state.getTries()})
+    return {'ticks': server.getTick(), 'worst': worst,
+            'mean': spent/max(server.getTick(),1), 'clients': results}
+
+
+def runClient(port,server,delay=0.0,jitter=0.0,loss=0.0,seed=None,timeout=None):
+    """Returns: a dictionary of how a client went, which plays by following the
+    lowest ball (see chaseBits) until the server stops or is not heard from
+    for SERVER_TIMEOUT seconds.
+
+    Parameter: port
+    Precondition: Must be an int, the UDP port of the client
+
+    Parameter: server
+    Precondition: Must be a tuple (host,port), the address of the server
+
+    Parameter: delay, jitter, loss, seed
+    Precondition: Must be as in Link, for the packets the client sends
+
+    Parameter: timeout
+    Precondition: Must be a float > 0, the most seconds to run, or None for
+        no limit"""
+    link = Link(port,server,delay,jitter,loss,seed)
+    client = GameClient(link)
+    start = clock()
+    heard = start
+    due = start
+    tick = None
+    try:
+        while not client.isFinal():
+            now = clock()
+            if timeout is not None and now-start > timeout:
+                break
+            if now-heard > SERVER_TIMEOUT:
+                break
+            if now < due:
+                time.sleep(due-now)
+            due += PHYSICS_TICK
+            client.update(chaseBits(client.getState()))
+            state = client.getState()
+            if state is not None and state.getTick() != tick:
+                tick = state.getTick()
+                heard = clock()
+    finally:
+        link.close()
+    state = client.getState()
+    return {'port': port, 'final': client.isFinal(), 'full': client.getFull(),
+            'deltas': client.getDeltas(), 'errors': client.getErrors(),
+            'tick': None if state is None else state.getTick(),
+            'checksum': None if state is None else state.checksum(),
+            'sent': link.getSent(), 'dropped': link.getDropped()}
+
+
+def _runTask(queue,function,args):
+    """Runs function with the tuple args in a process of its own, and puts
+    the tuple (function name,what it returns) in queue."""
+    queue.put((function.__name__,function(*args)))
+
+
+def main(argv=None):
+    """Runs a server and clients on this computer and checks that each client
+    ends with the state the server has for it, or runs only a server or only
+    a client.
+
+    Parameter: argv
+    Precondition: Must be a list of strings (the arguments after the program
+        name), or None to use sys.argv"""
+    parser = argparse.ArgumentParser(description='Run a Breakout game server, or test '
+                                     'one with clients on this computer.')
+    parser.add_argument('--frames',type=int,default=1800,
+                        help='the number of ticks the server plays (default 1800, '
+                        '30 seconds)')
+    parser.add_argument('--clients',type=int,default=2,
+                        help='the number of clients in the test (default 2)')
+    parser.add_argument('--level',type=int,choices=[1,2],default=1,
+                        help='the level of the games (default 1)')
+    parser.add_argument('--seed',type=int,default=RANDOM_SEED,
+                        help='the seed of the games (default: picked at random)')
+    parser.add_argument('--delay',type=float,default=0.0,
+                        help='the time each packet is held, in seconds (default 0)')
+    parser.add_argument('--jitter',type=float,default=0.0,
+                        help='the most extra time a packet is held, in seconds (default 0)')
+    parser.add_argument('--loss',type=float,default=0.0,
+                        help='the fraction of packets dropped (default 0)')
+    parser.add_argument('--port',type=int,default=SERVER_PORT,
+                        help='the UDP port of the server; clients in the test use '
+                        'the ones after it (default %d)' % SERVER_PORT)
+    parser.add_argument('--serve',action='store_true',
+                        help='only run the server, for --frames ticks')
+    parser.add_argument('--connect',default=None,metavar='HOST:PORT',
+                        help='only run a client, on --port, of the server at HOST:PORT')
+    args = parser.parse_args(argv)
+    if (args.frames < 1 or args.clients < 1 or min(args.delay,args.jitter,args.loss) < 0
+        or args.loss > 1):
+        parser.error('--frames and --clients must be positive and --delay, --jitter '
+                     'and --loss must not be negative')
+    seed = args.seed
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    network = (args.delay,args.jitter,args.loss)
+
+    if args.connect is not None:
+        (host,port) = args.connect.rsplit(':',1)
+        c = runClient(args.port,(host,int(port)),*network)
+        print('client: state of tick %s, %d whole and %d changes taken in, %d bad'
+              % (c['tick'],c['full'],c['deltas'],c['errors']))
+        return
+    if args.serve:
+        results = runServer(args.frames,args.level,seed,args.port,*network)
+        clients = []
+    else:
+        queue = multiprocessing.Queue()
+        tasks = [(runServer,(args.frames,args.level,seed,args.port)+network)]
+        for k in range(args.clients):
+            tasks.append((runClient,(args.port+1+k,('127.0.0.1',args.port))+network
+                          +(seed+1+k,args.frames*PHYSICS_TICK*2+SERVER_TIMEOUT*2)))
+        processes = [multiprocessing.Process(target=_runTask,args=(queue,f,a))
+                     for (f,a) in tasks]
+        for process in processes:
+            process.start()
+            time.sleep(0.1)   # so the server is listening before the clients
+        finished = [queue.get() for process in processes]
+        for process in processes:
+            process.join()
+        results = [r for (name,r) in finished if name == 'runServer'][0]
+        clients = sorted([r for (name,r) in finished if name == 'runClient'],
+                         key=lambda r: r['port'])
+
+    seconds = results['ticks']*PHYSICS_TICK
+    print('server: %d ticks of level %d, seed %d; delay %g s, jitter %g s, loss %g'
+          % (results['ticks'],args.level,seed,args.delay,args.jitter,args.loss))
+    print('    worst tick %.2f ms, mean %.3f ms, of %.1f ms'
+          % (results['worst']*1000,results['mean']*1000,PHYSICS_TICK*1000))
+    ends = {}
+    for r in results['clients']:
+        ends[r['port']] = r
+        print('client on port %d: %d packets, %d whole, %.0f bytes each, %.2f KB/s '
+              '(%.2f KB/s with UDP/IP headers); %d bricks, %d tries'
+              % (r['port'],r['sent'],r['full'],r['bytes']/float(max(r['sent'],1)),
+                 r['bytes']/seconds/1000,(r['bytes']+28*r['sent'])/seconds/1000,
+                 r['bricks'],r['tries']))
+    for c in clients:
+        end = ends.get(c['port'])
+        same = (end is not None and c['tick'] == end['tick']
+                and c['checksum'] == end['checksum'])
+        print('client on port %d: %d whole and %d changes taken in, %d bad; '
+              'final state %s the server'
+              % (c['port'],c['full'],c['deltas'],c['errors'],
+                 'matches' if same else 'DOES NOT match'))
+
+
+# Application code
+if __name__ == '__main__':
+    main()
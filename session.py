@@ -0,0 +1,254 @@
+# session.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Subcontroller module for a whole run of Breakout
+
+This module contains Session, the part of the state machine of Breakout that decides
+what happens in the game: when a new Play starts, when the countdown ends and the
+ball is served, when a lost ball or a finished game waits for a key, and when the run
+moves on to Level 2.  Breakout keeps a Session and only adds the messages, scoreboard
+and sprites that show it.
+
+Like Play, Session does not import game2d, so a whole run can be played again without
+a window, for example from a recording (see replay.py)."""
+import random
+import struct
+from constants import *
+from play import *
+
+
+#: the version of the snapshots written by Session.snapshot
+SESSION_SNAPSHOT_VERSION = 1
+#: the layout of the start of a snapshot of a Session: the version, state, game
+#: number, level, flags, keys held at the last tick, timer, ticks and seed, all
+#: little-endian
+SESSION_SNAPSHOT = struct.Struct('<BBBBBHIQQ')
+#: the flags of a snapshot: continuous collision, and whether there is a game
+SESSION_CONTINUOUS = 1
+SESSION_GAME = 2
+
+
+class Session(object):
+    """An instance is a whole run of Breakout, played one physics tick at a time.
+
+    Each tick, the state may change (see _determineState), and then the game
+    is played for that state (see tick).  The input of a tick is only used
+    for the paddle keys and the number of keys held, so a run with the same
+    seed and the same input plays the same.
+
+    INSTANCE ATTRIBUTES:
+        _seed     [int >= 0]: the seed of the run
+        _continuous [bool]: whether the games use continuous collision
+        _rng      [random.Random]: seeded with _seed; it picks the seed of
+                  each new Play
+        _state    [one of the STATE constants]: the current state of the run
+        _game     [Play, or None if there is no game yet]: the current game
+        _timer    [int >= 0]: the number of countdown ticks played; the
+                  countdown only shows 3-2-1 while it is at most 180
+        _gamenum  [int <= 5]: the number of games finished in this level
+        _levelinput [int, either 1 or 2]: the level of the next Play
+        _lastkeys [int]: the number of keys held at the last tick
+        _ticks    [int >= 0]: the number of ticks played
+        _rngstate [bytes string, or None]: the state of _rng packed for
+                  snapshot, or None if _rng was used since (as in Play)
+        _rngstale [bool]: True if _rngstate was restored but not yet put
+                  into _rng; that is done when _rng is next used
+    """
+
+    def getSeed(self):
+        return self._seed
+    def isContinuous(self):
+        return self._continuous
+    def getState(self):
+        return self._state
+    def getGame(self):
+        return self._game
+    def getTimer(self):
+        return self._timer
+    def getGameNumber(self):
+        return self._gamenum
+    def getLevel(self):
+        return self._levelinput
+    def getTicks(self):
+        return self._ticks
+
+    def __init__(self,seed,continuous=CONTINUOUS_COLLISION):
+        """Initializer to start a run in STATE_INACTIVE.
+
+        Parameter: seed
+        Precondition: Must be an int >= 0, the seed of the run
+
+        Parameter: continuous
+        Precondition: Must be a bool, whether the games use continuous collision"""
+        self._seed = seed
+        self._continuous = continuous
+        self._rng = random.Random(seed)
+        self._rngstate = None
+        self._rngstale = False
+        self._state = STATE_INACTIVE
+        self._ticks = 0
+        self._reset()
+
+    def tick(self,input,count):
+        """Returns: the state that this tick was played in, after playing it.
+
+        First the state is changed if necessary (see _determineState).  Then:
+        in STATE_INACTIVE the run starts over (but not the random numbers); in
+        STATE_NEWGAME a new Play starts and the countdown begins; in
+        STATE_COUNTDOWN the paddle moves, and once the countdown is over the
+        ball is served; in STATE_ACTIVE the paddle and ball move; and in
+        STATE_LEVEL2 the next games are set to Level 2.
+
+        Parameter: input
+        Precondition: Must answer is_key_down(key), like the GInput of game2d
+
+        Parameter: count
+        Precondition: Must be an int >= 0, the number of keys held this tick"""
+        self._determineState(count)
+        state = self._state
+        if state == STATE_INACTIVE:
+            self._reset()
+        elif state == STATE_NEWGAME:
+            self._game = Play(self._levelinput,self._continuous,
+                              seed=self._getRng().getrandbits(32))
+            self._state = STATE_COUNTDOWN
+        elif state == STATE_COUNTDOWN:
+            self._timer += 1
+            self._game.updatePaddle(input)
+            if self._timer > 180:
+                self._game.serveBall()
+                self._state = STATE_ACTIVE
+        elif state == STATE_ACTIVE:
+            self._game.updatePaddle(input)
+            self._game.updateBall()
+        elif state == STATE_COMPLETE:
+            if self._gamenum == 5 and self._levelinput == 2:
+                self._timer = 0
+        elif state == STATE_LEVEL2:
+            self._levelinput = 2
+            self._gamenum = 0
+            self._timer = 0
+        self._ticks += 1
+        return state
+
+    def snapshot(self):
+        """Returns: the whole state of this run as a bytes string, which
+        restore puts back exactly.
+
+        The snapshot is SESSION_SNAPSHOT, then the state of _rng (RNG_STATE in
+        play.py), then the snapshot of the game if there is one (see
+        Play.snapshot).  Like that of a game, it takes a few microseconds."""
+        if self._rngstate is None:
+            self._rngstate = packRandom(self._rng)
+        flags = 0
+        if self._continuous:
+            flags |= SESSION_CONTINUOUS
+        if self._game is not None:
+            flags |= SESSION_GAME
+        head = SESSION_SNAPSHOT.pack(SESSION_SNAPSHOT_VERSION,self._state,self._gamenum,
+                                     self._levelinput,flags,self._lastkeys,self._timer,
+                                     self._ticks,self._seed)
+        if self._game is None:
+            return head+self._rngstate
+        return b''.join((head,self._rngstate,self._game.snapshot()))
+
+    def restore(self,data):
+        """Puts back the state of a run from a snapshot, so that this run goes
+        on exactly as that one would have.  The game of this run, if it has
+        one, is reused (see Play.restore), so whatever shows it still can.
+
+        Raises ValueError if data is not a whole snapshot of a run with as
+        many rows and columns of bricks.
+
+        Parameter: data
+        Precondition: Must be a bytes string, as returned by snapshot"""
+        pos = SESSION_SNAPSHOT.size+RNG_STATE.size
+        if len(data) < pos:
+            raise ValueError('snapshot is too short')
+        (version,state,gamenum,levelinput,flags,lastkeys,timer,ticks,
+         seed) = SESSION_SNAPSHOT.unpack_from(data)
+        if version != SESSION_SNAPSHOT_VERSION:
+            raise ValueError('not a snapshot of version %d' % SESSION_SNAPSHOT_VERSION)
+        if flags & SESSION_GAME:
+            game = self._game
+            if game is None:
+                game = Play(levelinput,bool(flags & SESSION_CONTINUOUS),seed=0)
+            game.restore(data[pos:])
+            self._game = game
+        elif len(data) != pos:
+            raise ValueError('snapshot is not of the right length')
+        else:
+            self._game = None
+        self._rngstate = data[SESSION_SNAPSHOT.size:pos]
+        self._rngstale = True
+        self._state = state
+        self._gamenum = gamenum
+        self._levelinput = levelinput
+        self._continuous = bool(flags & SESSION_CONTINUOUS)
+        self._lastkeys = lastkeys
+        self._timer = timer
+        self._ticks = ticks
+        self._seed = seed
+
+    def _getRng(self):
+        """Returns: _rng, about to be used, with the state of the last restore
+        put into it if that was not done yet."""
+        if self._rngstale:
+            unpackRandom(self._rng,self._rngstate)
+            self._rngstale = False
+        self._rngstate = None
+        return self._rng
+
+    def _reset(self):
+        """Helper method to start the run over at Level 1, with no game."""
+        self._game = None
+        self._timer = 0
+        self._gamenum = 0
+        self._levelinput = 1
+        self._lastkeys = 0
+
+    def _determineState(self,count):
+        """Helper method for tick that changes the state if necessary.
+        A key press is a tick with keys held after a tick with none.
+        If state is INACTIVE and a key is pressed, it moves to NEWGAME.
+        If state is ACTIVE, ball goes off screen, and there are tries left,
+            it moves to PAUSED.
+        If state is PAUSED and a key is pressed, it moves to COUNTDOWN.
+        If state is ACTIVE, ball goes off screen, and there are no tries
+            left, state goes to COMPLETE.
+        If state is ACTIVE and all the bricks are eliminated, it moves to
+            state COMPLETE.
+        If state is COMPLETE, a key is pressed, and the player has not
+            yet reached the limit of 5 games, it moves to NEWGAME.
+        If state is COMPLETE, a key is pressed, and the player has
+             reached the limit of 5 games, it moves to LEVEL2 (or back to
+             INACTIVE after Level 2).
+        If state is LEVEL2 and a key is pressed, the state moves to NEWGAME.
+
+        Parameter: count
+        Precondition: Must be an int >= 0, the number of keys held this tick"""
+        change = count > 0 and self._lastkeys == 0
+        if change and (self._state == STATE_INACTIVE):
+            self._state = STATE_NEWGAME
+        self._lastkeys = count
+        if self._state == STATE_ACTIVE:
+            if (self._game.getStatus() == 'oops') and (self._game.getTries() != 0):
+                self._state = STATE_PAUSED
+                self._game.setStatus(None)
+            elif (self._game.getStatus() == 'oops') and (self._game.getTries() == 0):
+                self._gamenum += 1
+                self._state = STATE_COMPLETE
+        elif self._state == STATE_COMPLETE and change:
+            if self._gamenum < 5:
+                self._state = STATE_NEWGAME
+            elif self._levelinput == 1:
+                self._state = STATE_LEVEL2
+            else:
+                self._state = STATE_INACTIVE
+        elif self._state == STATE_LEVEL2 and change:
+            self._state = STATE_NEWGAME
+        if self._state == STATE_PAUSED and change:
+            self._state = STATE_COUNTDOWN
+        if self._state == STATE_ACTIVE and self._game.getBrickLength() == 0:
+            self._gamenum += 1
+            self._state = STATE_COMPLETE
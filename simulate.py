@@ -0,0 +1,229 @@
+# simulate.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Headless runner for Breakout
+
+This module plays games of Breakout with no window, as fast as the computer can, with
+the paddle moved by one of the controllers in controllers.py.  It drives Play exactly
+as Breakout does during STATE_ACTIVE (updatePaddle, then updateBall, once per physics
+tick), except that a lost ball is served again at once instead of after a key press.
+
+When it is done, it reports how many physics ticks and games it ran per second, and
+how the time was split between the phases of a tick.  Run it as
+
+    python simulate.py --games 100 --level 2 --seed 12345
+
+or as 'python . --headless' with the same options.  With --batch K, the games are
+played K at a time in lockstep by a BatchPlay, which is much faster for many games.
+Try --help for the rest."""
+from __future__ import print_function
+import argparse
+import random
+from timeit import default_timer as clock
+from constants import *
+from play import *
+from batchplay import *
+from controllers import *
+
+
+#: the controllers that can be chosen with --controller
+CONTROLLERS = {'tracking': TrackingController, 'scripted': ScriptedController,
+               'autopilot': AutopilotController}
+
+#: the controllers of CONTROLLERS, for a BatchPlay
+BATCH_CONTROLLERS = {'tracking': BatchTrackingController, 'scripted': ScriptedController,
+                     'autopilot': BatchAutopilotController}
+
+#: the phases of a physics tick that are timed, in the order they are reported:
+#: moving the paddle (with its controller), moving the balls (with every
+#: collision), and serving again after a lost ball
+PHASES = ['paddle','ball','serve']
+
+
+def playGame(level,seed,controller=TrackingController,limit=SIMULATION_TICK_LIMIT,
+             continuous=CONTINUOUS_COLLISION,timing=None,speeds=None,
+             vxrange=(SERVE_VX_MIN,SERVE_VX_MAX)):
+    """Returns: the tuple (ticks,bricks,tries) after playing one game to the end.
+
+    ticks is the number of physics ticks played, bricks the number of bricks
+    left and tries the number of tries left.  So the game was won if bricks is
+    0, lost if tries is 0, and it was stopped at the limit otherwise.
+
+    Parameter: level
+    Precondition: Must be an int (either 1 or 2)
+
+    Parameter: seed
+    Precondition: Must be an int >= 0, the seed of the Play
+
+    Parameter: controller
+    Precondition: Must be a class from controllers.py (or one like them)
+
+    Parameter: limit
+    Precondition: Must be an int > 0, the most ticks to play
+
+    Parameter: continuous
+    Precondition: Must be a bool, passed to Play
+
+    Parameter: timing
+    Precondition: Must be None, or a dictionary with a float for each of
+        PHASES; the seconds spent in each phase are added to it
+
+    Parameter: speeds, vxrange
+    Precondition: Must be as in the initializer of Play"""
+    game = Play(level,continuous,seed,speeds,vxrange)
+    input = controller(game)
+    game.serveBall()
+    ticks = 0
+    while ticks < limit and game.getTries() > 0 and game.getBrickLength() > 0:
+        if timing is None:
+            game.updatePaddle(input)
+            input.tick()
+            game.updateBall()
+            if game.getStatus() == 'oops' and game.getTries() > 0:
+                game.setStatus(None)
+                game.serveBall()
+        else:
+            time0 = clock()
+            game.updatePaddle(input)
+            input.tick()
+            time1 = clock()
+            game.updateBall()
+            time2 = clock()
+            if game.getStatus() == 'oops' and game.getTries() > 0:
+                game.setStatus(None)
+                game.serveBall()
+            time3 = clock()
+            timing['paddle'] += time1-time0
+            timing['ball'] += time2-time1
+            timing['serve'] += time3-time2
+        ticks += 1
+    return (ticks,game.getBrickLength(),game.getTries())
+
+
+def playBatch(level,seeds,controller=BatchTrackingController,limit=SIMULATION_TICK_LIMIT,
+              timing=None,speeds=None,vxrange=(SERVE_VX_MIN,SERVE_VX_MAX)):
+    """Returns: a list with the tuple (ticks,bricks,tries) of each game, after
+    playing the games to the end all at once with a BatchPlay.
+
+    The tuples are as in playGame, and they are exactly what playGame gives
+    with the same seeds (and the matching controller from CONTROLLERS).
+
+    Parameter: level
+    Precondition: Must be an int (either 1 or 2)
+
+    Parameter: seeds
+    Precondition: Must be a nonempty list of ints >= 0, the seed of each game
+
+    Parameter: controller
+    Precondition: Must be a class from BATCH_CONTROLLERS (or one like them)
+
+    Parameter: limit
+    Precondition: Must be an int > 0, the most ticks to play
+
+    Parameter: timing
+    Precondition: Must be None, or a dictionary as in playGame
+
+    Parameter: speeds, vxrange
+    Precondition: Must be as in the initializer of Play"""
+    batch = BatchPlay(level,seeds,limit,speeds,vxrange)
+    input = controller(batch)
+    while not batch.isFinished():
+        if timing is None:
+            batch.step(input)
+        else:
+            time0 = clock()
+            batch.updatePaddles(input)
+            input.tick()
+            time1 = clock()
+            batch.updateBalls()
+            time2 = clock()
+            batch.endTick()
+            time3 = clock()
+            timing['paddle'] += time1-time0
+            timing['ball'] += time2-time1
+            timing['serve'] += time3-time2
+    ticks = batch.getTicks()
+    bricks = batch.getBrickCounts()
+    tries = batch.getTries()
+    return [(ticks.item(g),bricks.item(g),tries.item(g)) for g in range(len(seeds))]
+
+
+def main(argv=None):
+    """Plays the games asked for on the command line and prints the report.
+
+    Parameter: argv
+    Precondition: Must be a list of strings (the arguments after the program
+        name), or None to use sys.argv"""
+    parser = argparse.ArgumentParser(description='Play Breakout without a window, '
+                                     'as fast as possible.')
+    parser.add_argument('--headless',action='store_true',help=argparse.SUPPRESS)
+    parser.add_argument('--games',type=int,default=100,
+                        help='the number of games to play (default 100)')
+    parser.add_argument('--level',type=int,choices=[1,2],default=1,
+                        help='the level of every game (default 1)')
+    parser.add_argument('--seed',type=int,default=RANDOM_SEED,
+                        help='the seed of the run; each game gets its own seed '
+                        'from it (default: picked at random)')
+    parser.add_argument('--controller',choices=sorted(CONTROLLERS),default='tracking',
+                        help='what moves the paddle (default tracking)')
+    parser.add_argument('--limit',type=int,default=SIMULATION_TICK_LIMIT,
+                        help='the most ticks in one game (default %d)' % SIMULATION_TICK_LIMIT)
+    parser.add_argument('--continuous',action='store_true',
+                        help='use continuous collision')
+    parser.add_argument('--batch',type=int,default=0,metavar='K',
+                        help='play K games at a time with a BatchPlay '
+                        '(not with --continuous)')
+    parser.add_argument('--no-timing',action='store_true',
+                        help='do not time the phases of each tick')
+    args = parser.parse_args(argv)
+    if args.batch > 0 and args.continuous:
+        parser.error('--batch cannot be used with --continuous')
+
+    seed = args.seed
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    rng = random.Random(seed)
+    timing = None
+    if not args.no_timing:
+        timing = dict((phase,0.0) for phase in PHASES)
+
+    ticks = 0
+    won = 0
+    lost = 0
+    start = clock()
+    played = 0
+    while played < args.games:
+        seeds = [rng.getrandbits(32) for game in range(min(max(args.batch,1),
+                                                            args.games-played))]
+        if args.batch > 0:
+            results = playBatch(args.level,seeds,BATCH_CONTROLLERS[args.controller],
+                                args.limit,timing)
+        else:
+            results = [playGame(args.level,seeds[0],CONTROLLERS[args.controller],
+                                args.limit,args.continuous,timing)]
+        played += len(seeds)
+        for result in results:
+            ticks += result[0]
+            if result[1] == 0:
+                won += 1
+            elif result[2] == 0:
+                lost += 1
+    elapsed = max(clock()-start,1e-9)
+
+    print('%d games of level %d with the %s controller, seed %d'
+          % (args.games,args.level,args.controller,seed))
+    print('won %d, lost %d, stopped at the limit %d'
+          % (won,lost,args.games-won-lost))
+    print('%d ticks in %.3f s: %.0f ticks/sec, %.2f games/sec'
+          % (ticks,elapsed,ticks/elapsed,args.games/elapsed))
+    if timing is not None:
+        print('%-8s %10s %10s %7s' % ('phase','seconds','us/tick','share'))
+        for phase in PHASES:
+            print('%-8s %10.3f %10.2f %6.1f%%'
+                  % (phase,timing[phase],1e6*timing[phase]/max(ticks,1),
+                     100.0*timing[phase]/elapsed))
+
+
+# Application code
+if __name__ == '__main__':
+    main()
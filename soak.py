@@ -0,0 +1,260 @@
+# soak.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Soak test for Breakout
+
+This module plays seeded headless games (see simulate.py) one after another, for as
+many physics ticks as asked, and looks for games that are stuck: the balls settle
+into a loop that never reaches a brick or the bottom, so the game would never end.
+For example
+
+    python soak.py --frames 5000000 --level 1 --dump stuck.txt
+
+Each stuck game is printed with the seed of the game and the tick at which the loop
+was found, and added to the dump file if one is given, so that it can be played
+again on its own with
+
+    python soak.py --game SEED --level 1
+
+A loop is found cheaply (see LoopDetector): the state of the balls and paddle is
+rounded to a grid and hashed every tick, and the hashes of a sliding window of ticks
+are kept, so a state that comes back is noticed at once.  Breaking a brick or losing
+a ball is progress, which starts the window over.  A ball that gets past the top or
+side walls (as it can in a corner) is stuck too, since it never comes back, though
+its state need not repeat."""
+from __future__ import print_function
+import argparse
+import collections
+import random
+from timeit import default_timer as clock
+from constants import *
+from play import *
+from controllers import *
+from simulate import CONTROLLERS
+
+
+class LoopDetector(object):
+    """An instance finds when a sequence of states starts repeating.
+
+    Each state is hashed, and the tick at which each hash was last seen is
+    kept for the last _window ticks (the hashes are also kept in a queue, in
+    order, so the old ones can be dropped in constant time).  When a state
+    comes back after p ticks, and every state after it also comes back after
+    p ticks for p ticks in a row, the states are in a loop of p ticks.
+
+    INSTANCE ATTRIBUTES:
+        _window [int > 0]: the number of ticks remembered, so the longest loop
+                that can be found
+        _recent [deque of tuples (tick,hash)]: the states of the last _window
+                ticks, oldest first
+        _seen   [dictionary]: each key is the hash of a state in _recent and
+                each value is the last tick it was seen at
+        _period [int > 0, or None if the last state was new]: the number of
+                ticks since the last state was seen before
+        _run    [int >= 0]: the number of ticks in a row whose state came back
+                after _period ticks
+    """
+
+    def getPeriod(self):
+        return self._period
+
+    def __init__(self,window=SOAK_WINDOW):
+        """Initializer to make a detector that has seen nothing.
+
+        Parameter: window
+        Precondition: Must be an int > 0, the longest loop to look for"""
+        self._window = window
+        self._recent = collections.deque()
+        self._seen = {}
+        self._period = None
+        self._run = 0
+
+    def reset(self):
+        """Forgets every state seen so far."""
+        self._recent.clear()
+        self._seen.clear()
+        self._period = None
+        self._run = 0
+
+    def add(self,tick,state):
+        """Returns: True if the states up to this one are in a loop.
+
+        Parameter: tick
+        Precondition: Must be an int, larger than at the last call
+
+        Parameter: state
+        Precondition: Must be hashable, and equal for states that are the same"""
+        key = hash(state)
+        last = self._seen.get(key)
+        period = None if last is None else tick-last
+        if period is not None and period == self._period:
+            self._run += 1
+        else:
+            self._period = period
+            self._run = 0 if period is None else 1
+        self._seen[key] = tick
+        self._recent.append((tick,key))
+        while self._recent[0][0] <= tick-self._window:
+            (old,oldkey) = self._recent.popleft()
+            if self._seen.get(oldkey) == old:
+                del self._seen[oldkey]
+        return self._period is not None and self._run >= self._period
+
+
+def gameState(game,quantum=SOAK_QUANTUM):
+    """Returns: the state of the paddle and balls of game as a tuple, with the
+    positions rounded to multiples of quantum.
+
+    Parameter: game
+    Precondition: Must be a Play
+
+    Parameter: quantum
+    Precondition: Must be a float > 0, the size of the grid in pixels"""
+    xs, ys = game.getBallPositions()
+    vxs, vys, speeds = game.getBallVelocities()
+    scale = 1.0/quantum
+    return ((int(round(game.getPaddle().getX()*scale)),)
+            + tuple([int(round(v*scale)) for v in xs.tolist()+ys.tolist()])
+            + tuple(vxs.tolist()) + tuple(vys.tolist()))
+
+
+def isOutside(game):
+    """Returns: True if the center of a ball of game is past the top or side
+    walls.  A ball moves less than its radius in a tick, so one that bounces
+    never gets there.
+
+    Parameter: game
+    Precondition: Must be a Play"""
+    xs, ys = game.getBallPositions()
+    if xs.size == 0:
+        return False
+    return min(xs.tolist()) < 0 or max(xs.tolist()) > GAME_WIDTH or max(ys.tolist()) > GAME_HEIGHT
+
+
+def soakGame(level,seed,controller=AutopilotController,limit=SIMULATION_TICK_LIMIT,
+             window=SOAK_WINDOW,quantum=SOAK_QUANTUM):
+    """Returns: the tuple (ticks,bricks,tries,stuck) after playing one game
+    until it ends or is stuck.
+
+    The game is played as in simulate.playGame.  ticks, bricks and tries are
+    as there, and stuck says why the game is stuck (a loop, with its length in
+    ticks, or a ball outside the walls), or is None if it is not.  A stuck game
+    ends at the tick that is found.
+
+    Parameter: level, seed, controller, limit
+    Precondition: Must be as in simulate.playGame
+
+    Parameter: window
+    Precondition: Must be an int > 0, the longest loop to look for
+
+    Parameter: quantum
+    Precondition: Must be a float > 0, the grid the state is rounded to"""
+    game = Play(level,seed=seed)
+    input = controller(game)
+    detector = LoopDetector(window)
+    game.serveBall()
+    progress = (game.getBrickLength(),game.getTries())
+    ticks = 0
+    while ticks < limit and game.getTries() > 0 and game.getBrickLength() > 0:
+        game.updatePaddle(input)
+        input.tick()
+        game.updateBall()
+        if game.getStatus() == 'oops' and game.getTries() > 0:
+            game.setStatus(None)
+            game.serveBall()
+        ticks += 1
+        if (game.getBrickLength(),game.getTries()) != progress:
+            progress = (game.getBrickLength(),game.getTries())
+            detector.reset()
+        elif detector.add(ticks,gameState(game,quantum)):
+            return (ticks,game.getBrickLength(),game.getTries(),
+                    'loop of %d ticks' % detector.getPeriod())
+        elif isOutside(game):
+            return (ticks,game.getBrickLength(),game.getTries(),'ball outside the walls')
+    return (ticks,game.getBrickLength(),game.getTries(),None)
+
+
+def main(argv=None):
+    """Plays the games asked for on the command line and prints each stuck
+    game and then a summary.
+
+    Parameter: argv
+    Precondition: Must be a list of strings (the arguments after the program
+        name), or None to use sys.argv"""
+    parser = argparse.ArgumentParser(description='Play headless games of Breakout for '
+                                     'a long time and report games that get stuck.')
+    parser.add_argument('--frames',type=int,default=1000000,
+                        help='the number of physics ticks to play in all (default 1000000)')
+    parser.add_argument('--level',type=int,choices=[1,2],default=1,
+                        help='the level of every game (default 1)')
+    parser.add_argument('--seed',type=int,default=RANDOM_SEED,
+                        help='the seed of the run; each game gets its own seed '
+                        'from it (default: picked at random)')
+    parser.add_argument('--game',type=int,default=None,metavar='SEED',
+                        help='play only the game with this seed, as printed for '
+                        'a stuck game')
+    parser.add_argument('--controller',choices=sorted(CONTROLLERS),default='autopilot',
+                        help='what moves the paddle (default autopilot)')
+    parser.add_argument('--limit',type=int,default=SIMULATION_TICK_LIMIT,
+                        help='the most ticks in one game (default %d)' % SIMULATION_TICK_LIMIT)
+    parser.add_argument('--window',type=int,default=SOAK_WINDOW,
+                        help='the longest loop to look for, in ticks '
+                        '(default %d)' % SOAK_WINDOW)
+    parser.add_argument('--quantum',type=float,default=SOAK_QUANTUM,
+                        help='the grid the positions are rounded to, in pixels '
+                        '(default %g)' % SOAK_QUANTUM)
+    parser.add_argument('--dump',default=None,metavar='FILE',
+                        help='add a line to FILE for each stuck game')
+    args = parser.parse_args(argv)
+    if args.frames < 1 or args.window < 1 or args.quantum <= 0:
+        parser.error('--frames, --window and --quantum must be positive')
+
+    seed = args.seed if args.game is None else args.game
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    rng = random.Random(seed)
+    dump = None if args.dump is None else open(args.dump,'a')
+
+    frames = 0
+    games = 0
+    counts = {'won': 0, 'lost': 0, 'stuck': 0, 'limit': 0}
+    start = clock()
+    try:
+        while frames < args.frames:
+            game = args.game if args.game is not None else rng.getrandbits(32)
+            (ticks,bricks,tries,stuck) = soakGame(args.level,game,CONTROLLERS[args.controller],
+                                                   min(args.limit,args.frames-frames),
+                                                   args.window,args.quantum)
+            frames += ticks
+            games += 1
+            if stuck is not None:
+                counts['stuck'] += 1
+                line = ('stuck: level %d seed %d frame %d bricks %d tries %d (%s)'
+                        % (args.level,game,ticks,bricks,tries,stuck))
+                print(line)
+                if dump is not None:
+                    dump.write(line+'\n')
+                    dump.flush()
+            elif bricks == 0:
+                counts['won'] += 1
+            elif tries == 0:
+                counts['lost'] += 1
+            else:
+                counts['limit'] += 1
+            if args.game is not None:
+                break
+    finally:
+        if dump is not None:
+            dump.close()
+    elapsed = max(clock()-start,1e-9)
+
+    print('%d games of level %d with the %s controller, seed %d'
+          % (games,args.level,args.controller,seed))
+    print('won %d, lost %d, stuck %d, stopped at the limit %d'
+          % (counts['won'],counts['lost'],counts['stuck'],counts['limit']))
+    print('%d ticks in %.3f s: %.0f ticks/sec' % (frames,elapsed,frames/elapsed))
+
+
+# Application code
+if __name__ == '__main__':
+    main()
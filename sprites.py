@@ -0,0 +1,135 @@
+# sprites.py
+# Rachel Nash (rsn55) and Jessie Liu (jl2686)
+# November 23, 2016
+"""Drawing module for Breakout
+
+The models in models.py and the subcontroller in play.py do not import game2d, so that
+games can be simulated without Kivy (or a window).  This module is the thin layer
+between them and game2d: it keeps the GObjects that show a game and moves them to
+match the models just before they are drawn.
+
+Only breakout.py, which already needs a window, imports this module."""
+from constants import *
+from game2d import *
+
+
+class Brick(GRectangle):
+    """An instance is the sprite of a single brick.
+
+    The attributes of this class are those inherited from GRectangle.
+    """
+
+    def __init__(self,top,left,alinecolor,afillcolor):
+        """Initializer to create a new Brick.
+
+        Parameter: top
+        Precondition: int or float
+
+        Parameter: left
+        Precondition: int or float
+
+        Parameter: alinecolor
+        Precondition: must be a color from colormodel and the same
+            as 'afillcolor'
+
+        Parameter: afillcolor
+        Precondition: must be a color from colormodel and the same
+            as 'alinecolor'"""
+        assert alinecolor == afillcolor
+        xpoint = left+BRICK_WIDTH/2.0
+        ypoint = top-BRICK_HEIGHT/2.0
+        GRectangle.__init__(self,x=xpoint,y=ypoint,linecolor=alinecolor,fillcolor=afillcolor,
+                            width=BRICK_WIDTH,height=BRICK_HEIGHT)
+
+
+class PlaySprites(object):
+    """An instance draws a single game of breakout.
+
+    It reads the game only through the getters of Play and of its models, so
+    the game does not know that it is being drawn.
+
+    INSTANCE ATTRIBUTES:
+        _game   [Play]: the game to draw
+        _paddle [GRectangle]: the sprite of the paddle
+        _balls  [list of GEllipses]: sprites for the balls; the first
+                getBallCount() of them are drawn, and more are made as needed
+        _bricks [dictionary]: each key is the index of a brick and each value
+                is the Brick that draws it, made the first time it is drawn
+        _lastx  [float array, or None if keep was not called]: the x
+                coordinates of the balls at the last call to keep
+        _lasty  [float array, or None if keep was not called]: the y
+                coordinates of the balls at the last call to keep
+        _lastpaddle [float, or None if keep was not called]: the x coordinate
+                of the paddle at the last call to keep
+    """
+
+    def __init__(self,game):
+        """Initializer to make the sprites of a game.
+
+        Parameter: game
+        Precondition: Must be a Play"""
+        paddle = game.getPaddle()
+        color = colormodel.BLACK
+        self._game = game
+        self._paddle = GRectangle(x=paddle.getX(),y=paddle.getY(),
+                                  width=paddle.getWidth(),height=paddle.getHeight(),
+                                  linecolor=color,fillcolor=color)
+        self._balls = []
+        self._bricks = {}
+        self._lastx = None
+        self._lasty = None
+        self._lastpaddle = None
+
+    def keep(self):
+        """Remembers where the paddle and balls are, before the game moves
+        them, so that draw can show them part of the way to their next place."""
+        xs, ys = self._game.getBallPositions()
+        self._lastx = xs.copy()
+        self._lasty = ys.copy()
+        self._lastpaddle = self._game.getPaddle().getX()
+
+    def draw(self, view, alpha=1.0):
+        """Draws the bricks still alive, the paddle and the balls in play.
+
+        In slow motion a tick lasts several frames, so the paddle and balls
+        are drawn the fraction alpha of the way from where they were at the
+        last call to keep to where they are now, which keeps them moving
+        smoothly.  Balls are drawn where they are if some were served or lost
+        since then.
+
+        Parameter: view
+        Precondition: Must be the GView of the application
+
+        Parameter: alpha
+        Precondition: Must be a float between 0 and 1"""
+        field = self._game.getField()
+        for i in field.getLiveIds():
+            if not field.isAlive(i):
+                continue
+            sprite = self._bricks.get(i)
+            if sprite is None:
+                left, bottom, right, top = field.getEdges(i)
+                color = field.getColor(i)
+                sprite = Brick(top,left,color,color)
+                self._bricks[i] = sprite
+            sprite.draw(view)
+
+        self._paddle.x = self._game.getPaddle().getX()
+        if alpha < 1 and self._lastpaddle is not None:
+            self._paddle.x = self._lastpaddle+alpha*(self._paddle.x-self._lastpaddle)
+        self._paddle.draw(view)
+
+        xs, ys = self._game.getBallPositions()
+        if alpha < 1 and self._lastx is not None and self._lastx.size == xs.size:
+            xs = self._lastx+alpha*(xs-self._lastx)
+            ys = self._lasty+alpha*(ys-self._lasty)
+        while len(self._balls) < xs.size:
+            color = colormodel.BLACK
+            diameter = 2*self._game.getRadius()
+            self._balls.append(GEllipse(width=diameter,height=diameter,
+                                        linecolor=color,fillcolor=color))
+        for i in range(xs.size):
+            ball = self._balls[i]
+            ball.x = xs.item(i)
+            ball.y = ys.item(i)
+            ball.draw(view)